@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecAsync.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Constructs specs without blocking an asyncio event loop
+
+Requires Python 3.5 or later; unlike the remainder of yspec, this module
+is not importable under Python 2.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+import asyncio
+from functools import partial
+from .YSpecConstructor import YSpecResult, construct_one
+
+
+################################## FUNCTIONS ##################################
+def read_source(source_spec):
+    """
+    Reads a source spec infile, if source spec is a path to one
+
+    Arguments:
+      source_spec (str, dict): Source spec, as accepted by
+        :func:`yaml_load`
+
+    Returns:
+      str, dict: Contents of infile if *source_spec* is a path to an
+      infile; otherwise *source_spec* itself
+    """
+    from os.path import isfile
+
+    if isinstance(source_spec, str) and isfile(source_spec):
+        with open(source_spec, "r") as infile:
+            return infile.read()
+    return source_spec
+
+
+def write_text(outfile, text):
+    """
+    Writes text to an outfile
+
+    Arguments:
+      outfile (str): Path to outfile
+      text (str): Text
+    """
+    with open(outfile, "w") as output:
+        output.write(text)
+
+
+def dump_result(result, **kwargs):
+    """
+    Formats a constructed spec as yaml
+
+    Arguments:
+      result (YSpecResult): Constructed spec
+      kwargs (dict): Additional keyword arguments passed to
+        :func:`yaml_dump`
+
+    Returns:
+      str: Formatted spec
+    """
+    from . import yaml_dump
+
+    return yaml_dump(result.spec, provenance=result.provenance, **kwargs)
+
+
+################################### CLASSES ###################################
+class YSpecAsyncConstructor(object):
+    """
+    Constructs specs without blocking an asyncio event loop
+
+    Infiles are read and outfiles written using *io_executor*, while
+    parsing, construction, and formatting, which are limited by
+    processor rather than by input and output, are run using
+    *executor*. With the default executors, both are run within the
+    event loop's thread pool; the loop is not blocked, but because
+    construction holds the interpreter lock, concurrent specs are not
+    constructed in parallel. Using a pool of worker processes (see
+    :meth:`get_process_executor`) constructs specs in parallel.
+
+    Construction of each spec may be limited to a timeout, and may be
+    cancelled by cancelling the awaiting task. A spec whose
+    construction has not yet started is withdrawn from its executor; a
+    spec already being constructed cannot be interrupted, and runs to
+    completion in the background while its result is discarded.
+
+    Attributes:
+      constructor (type): Constructor class
+      executor (Executor): Executor with which specs are constructed
+        and formatted; if None, the event loop's default executor
+      io_executor (Executor): Executor with which files are read and
+        written; if None, the event loop's default executor
+      timeout (float): Default timeout in seconds for construction of
+        each spec; if None, construction is not limited
+      kwargs (dict): Default keyword arguments passed to the
+        constructor for each spec
+    """
+
+    def __init__(self, constructor, executor=None, io_executor=None,
+      timeout=None, **kwargs):
+        """
+        Arguments:
+          constructor (type): Constructor class
+          executor (Executor, optional): Executor with which specs are
+            constructed and formatted
+          io_executor (Executor, optional): Executor with which files
+            are read and written
+          timeout (float, optional): Default timeout in seconds for
+            construction of each spec
+          kwargs (dict): Default keyword arguments passed to the
+            constructor for each spec
+        """
+        self.constructor = constructor
+        self.executor = executor
+        self.io_executor = io_executor
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.kwargs.setdefault("verbose", 0)
+
+        # Compile plan before constructing; forked workers inherit it
+        self.constructor.compile()
+
+    @classmethod
+    def get_process_executor(cls, constructor, workers=None):
+        """
+        Prepares a pool of worker processes for constructing specs
+
+        Each worker compiles the constructor's plan once, and reuses it
+        for every spec it constructs. The constructor class must be
+        importable by the workers.
+
+        Arguments:
+          constructor (type): Constructor class
+          workers (int, optional): Number of worker processes; if None,
+            one worker is started per available processor
+
+        Returns:
+          ProcessPoolExecutor: Pool of worker processes
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        constructor.compile()
+        return ProcessPoolExecutor(max_workers=workers,
+          **constructor.get_pool_kwargs())
+
+    @staticmethod
+    async def run(executor, function, *args, **kwargs):
+        """
+        Runs a function using an executor, without blocking event loop
+
+        Arguments:
+          executor (Executor): Executor; if None, the event loop's
+            default executor
+          function (callable): Function
+          args (tuple): Positional arguments passed to *function*
+          kwargs (dict): Keyword arguments passed to *function*
+
+        Returns:
+          object: Return value of *function*
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor,
+          partial(function, *args, **kwargs))
+
+    async def construct(self, source_spec, timeout=None, **kwargs):
+        """
+        Constructs a single spec
+
+        Arguments:
+          source_spec (str, dict): Source spec; may be a path to a yaml
+            file, a string of yaml, or a dict, as accepted by
+            :func:`yaml_load`
+          timeout (float, optional): Timeout in seconds; if None,
+            :attr:`timeout` is used
+          kwargs (dict): Additional keyword arguments passed to the
+            constructor, overriding :attr:`kwargs`
+
+        Returns:
+          YSpecResult: Constructed spec or error raised during
+          construction
+
+        Raises:
+          asyncio.TimeoutError: Construction did not complete within
+            timeout
+          asyncio.CancelledError: Construction was cancelled
+        """
+        if timeout is None:
+            timeout = self.timeout
+        construct_kwargs = dict(self.kwargs)
+        construct_kwargs.update(kwargs)
+        return await asyncio.wait_for(self.load_and_construct(source_spec,
+          construct_kwargs), timeout)
+
+    async def load_and_construct(self, source_spec, kwargs, index=0):
+        """
+        Reads a source spec, then constructs spec from it
+
+        Source specs that are loaded from a persistent cache are read by
+        the cache, within *executor*.
+
+        Arguments:
+          source_spec (str, dict): Source spec
+          kwargs (dict): Keyword arguments passed to the constructor
+          index (int): Index of source spec within batch
+
+        Returns:
+          YSpecResult: Constructed spec or error raised during
+          construction
+        """
+        if kwargs.get("source_cache") is None:
+            try:
+                source_spec = await self.run(self.io_executor, read_source,
+                  source_spec)
+            except (IOError, OSError) as error:
+                return YSpecResult(index, None, error, None, None)
+        return await self.run(self.executor, construct_one,
+          self.constructor, index, source_spec, kwargs)
+
+    async def construct_many(self, sources, timeout=None, **kwargs):
+        """
+        Constructs specs from many source specs, concurrently
+
+        An error constructing one spec, including exceeding its
+        timeout, is recorded in its result and does not interrupt the
+        remainder of the batch. Cancelling the batch cancels the
+        construction of every spec.
+
+        Arguments:
+          sources (list): Source specs, as accepted by :meth:`construct`
+          timeout (float, optional): Timeout in seconds for each spec;
+            if None, :attr:`timeout` is used
+          kwargs (dict): Additional keyword arguments passed to the
+            constructor for each spec
+
+        Returns:
+          list: :class:`YSpecResult` for each source spec, in input
+          order
+        """
+        if timeout is None:
+            timeout = self.timeout
+        construct_kwargs = dict(self.kwargs)
+        construct_kwargs.update(kwargs)
+
+        async def construct_one_async(index, source_spec):
+            try:
+                return await asyncio.wait_for(self.load_and_construct(
+                  source_spec, construct_kwargs, index), timeout)
+            except asyncio.TimeoutError as error:
+                return YSpecResult(index, None, error, None, None)
+
+        return list(await asyncio.gather(*[construct_one_async(i, s) for
+            i, s in enumerate(sources)]))
+
+    async def dump(self, result, outfile=None, **kwargs):
+        """
+        Formats a constructed spec as yaml, annotated with the origin of
+        each argument, and optionally writes it to an outfile
+
+        Arguments:
+          result (YSpecResult): Constructed spec
+          outfile (str, optional): Path to outfile
+          kwargs (dict): Additional keyword arguments passed to
+            :func:`yaml_dump`
+
+        Returns:
+          str: Formatted spec
+        """
+        text = await self.run(self.executor, dump_result, result, **kwargs)
+        if outfile is not None:
+            await self.run(self.io_executor, write_text, outfile, text)
+        return text
\ No newline at end of file
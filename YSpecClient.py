@@ -0,0 +1,263 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   yspec.YSpecClient.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Submits command lines to a spec construction server
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+if __name__ == "__main__":
+    __package__ = str("yspec")
+    import yspec
+
+
+################################### CLASSES ###################################
+class YSpecClient(object):
+    """
+    Submits command lines to a spec construction server
+
+    Accepts the same command line as :meth:`YSpecConstructor.main`,
+    which is passed unparsed to a :class:`YSpecServer` listening on a
+    Unix domain socket, along with the working directory; the server's
+    output and exit status are then reproduced as this process's own.
+    The client does not load yaml or construct an argument parser, and
+    so starts quickly.
+
+    A server constructs specs as the user that started it, and accepts
+    requests only from that user. The client likewise submits requests
+    only to a socket belonging to, and accessible only by, its own
+    user, so that another user cannot impersonate the server.
+
+    Attributes:
+      socket_env (str): Environment variable from which the path of
+        the server's socket is read, if not provided
+    """
+    socket_env = "YSPEC_SOCKET"
+
+    @classmethod
+    def get_socket_path(cls, socket_path=None):
+        """
+        Determines the path of a server's socket
+
+        Arguments:
+          socket_path (str, optional): Path of socket; if None, read from
+            the environment variable named by :attr:`socket_env`, or
+            placed within a directory of the temporary directory
+            private to this user (see :meth:`get_socket_directory`)
+
+        Returns:
+          str: Path of socket
+        """
+        import os
+
+        if socket_path is not None:
+            return socket_path
+        if os.environ.get(cls.socket_env):
+            return os.environ[cls.socket_env]
+        return os.path.join(cls.get_socket_directory(), "server.sock")
+
+    @staticmethod
+    def get_socket_directory():
+        """
+        Determines the path of the default directory of a server's
+        socket, which is private to this user
+
+        Returns:
+          str: Path of directory
+        """
+        import os
+        from tempfile import gettempdir
+
+        return os.path.join(gettempdir(), "yspec-{0}".format(os.getuid()))
+
+    @staticmethod
+    def is_private(path):
+        """
+        Determines whether a file or directory belongs to this user, and
+        is inaccessible to other users
+
+        Arguments:
+          path (str): Path of file or directory
+
+        Returns:
+          bool: True if *path* belongs to this user, and grants no
+          permissions to its group or to other users
+        """
+        import os
+        import stat
+
+        status = os.stat(path)
+        return (status.st_uid == os.getuid() and
+          not status.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+    @staticmethod
+    def send(connection, message):
+        """
+        Sends a message through a socket, then closes socket for writing
+
+        Arguments:
+          connection (socket): Connected socket
+          message (dict): Message, which must be serializable as json
+        """
+        import json
+        import socket
+
+        connection.sendall(json.dumps(message).encode("utf-8"))
+        connection.shutdown(socket.SHUT_WR)
+
+    @staticmethod
+    def receive(connection):
+        """
+        Receives a message through a socket, until socket is closed for
+        writing by its peer
+
+        Arguments:
+          connection (socket): Connected socket
+
+        Returns:
+          dict: Message
+        """
+        import json
+
+        chunks = []
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks).decode("utf-8"))
+
+    @classmethod
+    def connect(cls, socket_path=None):
+        """
+        Connects to a server
+
+        Arguments:
+          socket_path (str, optional): Path of server's socket
+
+        Returns:
+          socket: Connected socket
+
+        Raises:
+          socket.error: Unable to connect to server, or socket does not
+            belong to this user or is accessible to other users
+        """
+        import socket
+
+        socket_path = cls.get_socket_path(socket_path)
+        try:
+            private = cls.is_private(socket_path)
+        except OSError as error:
+            raise socket.error(str(error))
+        if not private:
+            raise socket.error("socket does not belong to this user, or is "
+              "accessible to other users")
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(socket_path)
+        except socket.error:
+            connection.close()
+            raise
+        return connection
+
+    @classmethod
+    def submit(cls, connection, argv, cwd=None, prog=None, isatty=False):
+        """
+        Submits a command line to a server, and closes connection
+
+        Arguments:
+          connection (socket): Socket connected to server (see
+            :meth:`connect`)
+          argv (list): Command-line arguments, as accepted by
+            :meth:`YSpecConstructor.main`
+          cwd (str, optional): Directory relative to which paths within
+            *argv* are interpreted; if None, the current directory
+          prog (str, optional): Name of program used in usage and help
+            output
+          isatty (bool): Format output as if for a terminal
+
+        Returns:
+          dict: Response, including output to 'stdout' and 'stderr', and
+          exit 'status'
+
+        Raises:
+          socket.error: Connection to server was lost
+          ValueError: Response is malformed
+        """
+        import os
+
+        if cwd is None:
+            cwd = os.getcwd()
+        try:
+            cls.send(connection, dict(argv=list(argv), cwd=cwd, prog=prog,
+              isatty=isatty))
+            return cls.receive(connection)
+        finally:
+            connection.close()
+
+    @classmethod
+    def main(cls, constructor=None, argv=None):
+        """
+        Submits this process's command line to a server, and reproduces
+        its output and exit status
+
+        The path of the server's socket may be given by an initial
+        '-socket PATH' argument, which is not passed to the server.
+
+        Arguments:
+          constructor (type, optional): Constructor class with which to
+            construct spec within this process if server cannot be
+            reached; if None, an error is reported instead. Once a
+            request has been submitted, a failure is always reported,
+            since the server may already have constructed the spec
+          argv (list, optional): Command-line arguments; if None, those
+            of this process are used
+        """
+        import os
+        import socket
+        import sys
+
+        if argv is None:
+            argv = sys.argv[1:]
+        argv = list(argv)
+        socket_path = None
+        if len(argv) >= 2 and argv[0] == "-socket":
+            socket_path = argv[1]
+            argv = argv[2:]
+
+        try:
+            connection = cls.connect(socket_path)
+        except socket.error as error:
+            if constructor is not None:
+                return constructor.main(argv)
+            sys.stderr.write("Unable to reach yspec server at {0}: "
+              "{1}\n".format(cls.get_socket_path(socket_path), error))
+            sys.exit(1)
+        try:
+            response = cls.submit(connection, argv,
+              prog=os.path.basename(sys.argv[0]),
+              isatty=sys.stdout.isatty())
+        except (socket.error, ValueError) as error:
+            sys.stderr.write("Request to yspec server at {0} failed: "
+              "{1}\n".format(cls.get_socket_path(socket_path), error))
+            sys.exit(1)
+
+        sys.stdout.write(response.get("stdout", ""))
+        sys.stdout.flush()
+        sys.stderr.write(response.get("stderr", ""))
+        sys.stderr.flush()
+        if response.get("status", 0) != 0:
+            sys.exit(response["status"])
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    YSpecClient.main()
\ No newline at end of file
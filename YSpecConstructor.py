@@ -17,24 +17,117 @@ from __future__ import (absolute_import, division, print_function,
 if __name__ == "__main__":
     __package__ = str("yspec")
     import yspec
+from collections import namedtuple
 from . import YSpecCLTool
+from .plugins import YSpecPluginRegistry
+
+
+################################## FUNCTIONS ##################################
+def initialize_worker(constructor):
+    """
+    Prepares a worker process for construction of many specs
+
+    Compiles the construction plan of the constructor class, so that
+    its configuration is parsed once per worker rather than once per
+    spec
+
+    Arguments:
+      constructor (type): Constructor class
+    """
+    constructor.compile()
+
+
+def construct_one(constructor, index, source_spec, kwargs):
+    """
+    Constructs a single spec, capturing any error that occurs
+
+    Arguments:
+      constructor (type): Constructor class
+      index (int): Index of source spec within batch
+      source_spec (str, dict): Source spec
+      kwargs (dict): Additional keyword arguments passed to constructor
+
+    Returns:
+      YSpecResult: Constructed spec or error
+    """
+    from traceback import format_exc
+
+    try:
+        spec = constructor(source_spec=source_spec, **kwargs)
+        return YSpecResult(index, spec.spec, None, None, spec.provenance)
+    except Exception as error:
+        return YSpecResult(index, None, error, format_exc(), None)
 
 
 ################################### CLASSES ###################################
+class YSpecResult(namedtuple("YSpecResult",
+  ["index", "spec", "error", "traceback", "provenance"])):
+    """
+    Result of constructing one spec within a batch
+
+    Attributes:
+      index (int): Index of source spec within batch
+      spec (CommentedMap): Constructed spec, or None if construction
+        failed
+      error (Exception): Error raised during construction, or None if
+        construction succeeded
+      traceback (str): Formatted traceback of error, if any
+      provenance (YSpecProvenance): Origin of each argument within
+        spec, or None if construction failed
+    """
+
+    @property
+    def ok(self):
+        """bool: Whether construction succeeded"""
+        return self.error is None
+
+
+class YSpecChanges(namedtuple("YSpecChanges", ["paths", "before", "after"])):
+    """
+    Changes to a spec made by rebuilding it from an updated source spec
+
+    Attributes:
+      paths (list): Keys leading to each rebuilt subtree; a single
+        empty tuple if the entire spec was rebuilt
+      before (CommentedMap): Rebuilt subtrees before rebuilding, at
+        their paths within an otherwise empty spec
+      after (CommentedMap): Rebuilt subtrees after rebuilding, at their
+        paths within an otherwise empty spec
+    """
+
+    def diff(self, **kwargs):
+        """
+        Formats changes as a unified diff of the rebuilt subtrees
+
+        Arguments:
+          kwargs (dict): Additional keyword arguments passed to
+            :func:`yaml_dump`
+
+        Returns:
+          str: Unified diff; empty if no subtree changed
+        """
+        from difflib import unified_diff
+        from . import yaml_dump
+
+        kwargs["colored"] = False
+        before = yaml_dump(self.before, **kwargs) if self.before else ""
+        after = yaml_dump(self.after, **kwargs) if self.after else ""
+        return "\n".join(unified_diff(before.split("\n"),
+          after.split("\n"), fromfile="previous", tofile="current",
+          lineterm=""))
+
+
 class YSpecConstructor(YSpecCLTool):
     """
     Constructs yaml-format specification
     """
-    from collections import OrderedDict
-    from .plugins.InitializePlugin import InitializePlugin
-    from .plugins.DefaultsPlugin import DefaultsPlugin
-    from .plugins.PresetsPlugin import PresetsPlugin
-    from .plugins.ManualPlugin import ManualPlugin
-    from .plugins.SortPlugin import SortPlugin
-    available_plugins = OrderedDict(
-      [("initialize", InitializePlugin), ("defaults", DefaultsPlugin),
-          ("presets", PresetsPlugin), ("manual", ManualPlugin),
-          ("sort", SortPlugin)])
+    available_plugins = YSpecPluginRegistry([
+      ("initialize", ".plugins.InitializePlugin:InitializePlugin"),
+      ("defaults", ".plugins.DefaultsPlugin:DefaultsPlugin"),
+      ("presets", ".plugins.PresetsPlugin:PresetsPlugin"),
+      ("manual", ".plugins.ManualPlugin:ManualPlugin"),
+      ("sort", ".plugins.SortPlugin:SortPlugin"),
+      ("fused", ".plugins.FusedPlugin:FusedPlugin")], package=__package__)
     default_plugins = ["initialize", "defaults", "presets", "manual", "sort"]
     indexed_levels = """"""
     plugin_config = dict()
@@ -79,55 +172,581 @@ class YSpecConstructor(YSpecCLTool):
         cls.add_argument(parser, "-spec", required=True, dest="source_spec",
           metavar="SPEC", type=str,
           help="input file from which to load source spec")
+        cls.add_argument(parser, "-cache", dest="source_cache",
+          metavar="DIR", type=str,
+          help="""directory in which to cache parsed source specs, to be
+            reused while their contents are unchanged""")
+        cls.add_argument(parser, "-fused", action="store_true",
+          help="apply default plugins in a single pass over spec")
+        cls.add_argument(parser, "-plain", action="store_true",
+          help="""construct spec as plain data structures without
+            annotation; faster if only the values of the spec are needed""")
+        cls.add_argument(parser, "-watch", action="store_true",
+          help="""watch source spec for changes, rebuilding changed portions
+            of spec and outputting the updated spec""")
+        cls.add_argument(parser, "-diff", action="store_true",
+          help="""when watching source spec, output only the changes to spec
+            rather than the entire updated spec""")
+        cls.add_argument(parser, "-stages", action="store_true",
+          help="""record a snapshot of spec after each plugin; with -vv,
+            output the changes made by each plugin rather than the entire
+            intermediate spec""")
+        cls.add_argument(parser, "-profile", metavar="JSON", type=str,
+          help="""output file to which to write time, calls, and levels
+            visited and created by each plugin""")
+        cls.add_argument(parser, "-cprofile", action="store_true",
+          help="""when profiling, also capture construction using cProfile
+            and include the most costly functions in output""")
         parser.set_defaults(cls=cls)
 
         return parser
 
-    def __init__(self, source_spec=None, plugins=None, **kwargs):
+    @classmethod
+    def compile(cls, recompile=False):
+        """
+        Compiles the static configuration of this class into a plan
+
+        Arguments:
+          recompile (bool): Discard previously compiled plan, if any
+
+        Returns:
+          YSpecPlan: Construction plan, compiled once per class and
+          shared by all constructions
+        """
+        from .YSpecPlan import YSpecPlan
+
+        return YSpecPlan.compile(cls, recompile=recompile)
+
+    def __init__(self, source_spec=None, plugins=None, plan=None,
+      profile=None, **kwargs):
         """
         Arguments:
           source_spec (str): Path to source spec infile
           plugins (list, optional): Sequence of plugins with which to
             prepare spec
+          plan (YSpecPlan, optional): Compiled construction plan; if
+            omitted, the plan compiled for this class is used
+          profile (bool, YSpecProfile, optional): Profile in which to
+            record the cost of loading the source spec and of each
+            plugin; if True, a new profile is created
+          source_cache (str, YSpecSourceCache, optional): Persistent
+            cache, or path to cache directory, from which source spec
+            is loaded if previously parsed
+          fused (bool): If plugins are the default initialize, defaults,
+            presets, manual, and sort plugins, apply them in a single
+            pass using the fused plugin; other plugins are applied in
+            sequence
+          plain (bool): Load source spec and construct spec as plain
+            ordered dicts, without annotation; faster, for when only
+            the values of the spec are needed
+          stages (bool): Record an immutable snapshot of spec after each
+            plugin, from which spec may be formatted, compared, or
+            rolled back; snapshots share unchanged levels
           verbose (int): Level of verbose output
           kwargs (dict): Additional keyword arguments
+
+        Raises:
+          KeyError: A plugin, or the fused plugin if *fused* is set, is
+            not available to this class
+
+        Attributes:
+          spec (CommentedMap): Constructed spec; values are shared with
+            the source spec, presets, and defaults during construction,
+            and are copied once construction is complete
+          provenance (YSpecProvenance): Origin of each argument within
+            spec, rendered into comments by :meth:`dump`
+          shared_values (YSpecSharedValues): Values stored within spec
+            without being copied during construction, and counts of
+            copies avoided and made
+          profile (YSpecProfile): Cost of each stage of construction,
+            or None if not profiling
+          stages (YSpecStages): Snapshot of spec after each plugin, or
+            None if not recording snapshots
         """
+        from collections import OrderedDict
         from ruamel.yaml.comments import CommentedMap
-        from . import yaml_load, yaml_dump
+        from . import yaml_load
+        from .YSpecProfile import YSpecProfile
+        from .YSpecProvenance import YSpecProvenance
+        from .YSpecSharedValues import YSpecSharedValues
+        from .YSpecStages import YSpecStages
 
         # Process arguments
         verbose = kwargs.get("verbose", 1)
-        self.source_spec = yaml_load(source_spec)
+        if profile is True:
+            profile = YSpecProfile()
+        elif profile is False:
+            profile = None
+        self.profile = profile
+        if profile is not None:
+            profile.start("yaml_load")
+        self.source_spec = yaml_load(source_spec,
+          cache=kwargs.get("source_cache"), plain=kwargs.get("plain", False))
+        if profile is not None:
+            profile.stop()
         if plugins is None:
             self.plugins = self.default_plugins
+        else:
+            self.plugins = plugins
+        if kwargs.get("fused", False):
+            fused_plugin = self.available_plugins.get("fused")
+            if fused_plugin is None:
+                raise KeyError("fused")
+            if list(self.plugins) == fused_plugin.fused_plugins:
+                self.plugins = ["fused"]
+        if plan is None:
+            plan = self.compile()
+        self.plan = plan
+        self.kwargs = kwargs
 
         # Prepare spec
-        self.spec = CommentedMap()
+        if kwargs.get("plain", False):
+            self.spec = OrderedDict()
+        else:
+            self.spec = CommentedMap()
+        self.provenance = YSpecProvenance()
+        self.shared_values = YSpecSharedValues()
+        if kwargs.get("stages", False):
+            self.stages = YSpecStages(shared_values=self.shared_values)
+        else:
+            self.stages = None
         for plugin_name in self.plugins:
-            plugin = self.available_plugins[plugin_name](constructor=self,
-              **kwargs)
-            self.spec = plugin(self.spec, self.source_spec, **kwargs)
-            # Output intermediate spec
-            if verbose >= 3:
+            plugin = self.available_plugins.get(plugin_name)
+            if plugin is None:
+                raise KeyError(plugin_name)
+            plugin = plugin(constructor=self, plan=self.plan,
+              provenance=self.provenance, shared_values=self.shared_values,
+              profile=profile, **kwargs)
+            if profile is None:
+                self.spec = plugin(self.spec, self.source_spec, **kwargs)
+            else:
+                profile.start(plugin_name)
+                self.spec = plugin(self.spec, self.source_spec, **kwargs)
+                profile.stop()
+            if self.stages is not None:
+                self.stages.record(plugin_name, self.spec, self.provenance)
+            # Output intermediate spec, or changes made to it
+            if verbose >= 3 and self.stages is not None:
+                print("\nChanges made by {0} plugin:".format(plugin_name))
+                print(self.stages.diff(-1))
+            elif verbose >= 3:
                 print("\nSpec after running {0} plugin:".format(plugin_name))
-                print(yaml_dump(self.spec))
+                print(self.dump())
+
+        # Give each shared value remaining within spec its own copy
+        self.shared_values.release(self.spec)
 
         # Output spec
         if verbose >= 2:
             print("\nFinal spec:")
-            print(yaml_dump(self.spec))
+            print(self.dump())
+
+    def dump(self, **kwargs):
+        """
+        Formats spec as yaml, annotated with the origin of each argument
+
+        Arguments:
+          kwargs (dict): Additional keyword arguments passed to
+            :func:`yaml_dump`
+
+        Returns:
+          str: Formatted spec
+        """
+        from . import yaml_dump
+
+        return yaml_dump(self.spec, provenance=self.provenance, **kwargs)
+
+    def rollback(self, stage):
+        """
+        Restores spec to its snapshot after a stage of construction
+
+        Snapshots of later stages are discarded.
+
+        Arguments:
+          stage (str, int): Name or position of stage
+
+        Returns:
+          CommentedMap: Restored spec
+        """
+        if self.stages is None:
+            raise ValueError("snapshots of stages were not recorded; "
+              "construct spec with 'stages' enabled")
+        self.spec, self.provenance = self.stages.rollback(stage,
+          plain=self.kwargs.get("plain", False))
+        self.shared_values.release(self.spec)
+        return self.spec
+
+    def rebuild(self, source_spec):
+        """
+        Reconstructs spec from an updated source spec, rebuilding only
+        the subtrees whose source has changed
+
+        Each top-level key, and each index of each top-level indexed
+        level, of the updated source spec is compared to the source spec
+        from which the current spec was constructed. The plugins are
+        then run on a source spec reduced to the changed keys and
+        indexes, and the resulting subtrees replace those within the
+        current spec. Plugins are assumed to construct each subtree
+        from its own source, together with the selected presets and the
+        arguments applied to 'all' indexes; if the presets selected for
+        the entire spec change, the entire spec is rebuilt. If snapshots
+        of stages are recorded, the rebuilt spec is recorded as a stage
+        named 'rebuild'.
+
+        Arguments:
+          source_spec (str, dict): Updated source spec
+
+        Returns:
+          YSpecChanges: Paths of rebuilt subtrees, and their contents
+          before and after rebuilding
+        """
+        from ruamel.yaml.comments import CommentedMap
+        from . import index_key, is_index, yaml_load
+        from .YSpecProvenance import YSpecProvenance
+        from .plugins.SortPlugin import SortPlugin
+
+        source_spec = yaml_load(source_spec,
+          cache=self.kwargs.get("source_cache"),
+          plain=self.kwargs.get("plain", False))
+        kwargs = dict(self.kwargs, verbose=0, stages=False)
+        paths = self.find_changes(self.source_spec, source_spec)
+
+        # Reduce source spec to changed keys and indexes, and rebuild
+        if paths is not None:
+            reduced = CommentedMap()
+            if "presets" in source_spec:
+                reduced["presets"] = source_spec["presets"]
+            for path in [p for p in paths if p[0] in source_spec]:
+                key = path[0]
+                if len(path) == 1:
+                    reduced[key] = source_spec[key]
+                    continue
+                if key not in reduced:
+                    reduced[key] = CommentedMap([(k, v) for k, v in
+                        source_spec[key].items() if not is_index(k)])
+                    source_indexes = dict([(index_key(k), k) for k in
+                        source_spec[key] if is_index(k)])
+                if path[1] in source_indexes:
+                    source_index = source_indexes[path[1]]
+                    reduced[key][source_index] = source_spec[key][
+                        source_index]
+            partial = type(self)(source_spec=reduced, plugins=self.plugins,
+              plan=self.plan, **kwargs)
+            if any([len(p) == 2 and (p[0] not in self.spec or p[0] not in
+              partial.spec) for p in paths]):
+                paths = None
+
+        # Selected presets or indexed levels changed; rebuild entire spec
+        if paths is None:
+            rebuilt = type(self)(source_spec=source_spec, plugins=self.plugins,
+              plan=self.plan, **kwargs)
+            changes = YSpecChanges([()], self.provenance.annotate(self.spec),
+              rebuilt.provenance.annotate(rebuilt.spec))
+            self.source_spec = rebuilt.source_spec
+            self.spec = rebuilt.spec
+            self.provenance = rebuilt.provenance
+            self.shared_values = rebuilt.shared_values
+            if self.stages is not None:
+                self.stages.shared_values = self.shared_values
+                self.stages.record("rebuild", self.spec, self.provenance)
+            return changes
+
+        # Determine replacement of each changed subtree
+        if "sort" in self.plugins or "fused" in self.plugins:
+            sort_plugin = SortPlugin(constructor=self, plan=self.plan)
+        else:
+            sort_plugin = None
+        before = CommentedMap()
+        after = CommentedMap()
+        before_provenance = YSpecProvenance()
+        after_provenance = YSpecProvenance()
+        replacements = []
+        for path in paths:
+            level = self.spec
+            partial_level = partial.spec
+            indexed_levels = self.plan.indexed_levels
+            if len(path) == 2:
+                level = level[path[0]]
+                partial_level = partial_level[path[0]]
+                indexed_levels = indexed_levels.get(path[0]) or {}
+            key = path[-1]
+
+            if key in level:
+                self.set_subtree(before, path, level[key])
+            before_provenance.update(self.provenance, path)
+            if key in partial_level:
+                self.set_subtree(after, path, partial_level[key])
+            after_provenance.update(partial.provenance, path)
+            replacements.append((path, level, key, partial_level,
+              indexed_levels))
+
+        # Replace changed subtrees, once all have been determined
+        for path, level, key, partial_level, indexed_levels in replacements:
+            self.provenance.discard(path)
+            if key in partial_level:
+                added = key not in level
+                level[key] = partial_level[key]
+                if added and sort_plugin is not None:
+                    SortPlugin.reorder(level, sort_plugin.sort_keys(level,
+                      indexed_levels))
+            elif key in level:
+                del level[key]
+            self.provenance.update(partial.provenance, path)
+        self.shared_values.values.update(partial.shared_values.values)
+        self.shared_values.avoided += partial.shared_values.avoided
+        self.shared_values.copied += partial.shared_values.copied
+        self.source_spec = source_spec
+
+        if self.stages is not None:
+            self.stages.record("rebuild", self.spec, self.provenance)
+
+        return YSpecChanges(paths, before_provenance.annotate(before),
+          after_provenance.annotate(after))
+
+    def find_changes(self, previous, source_spec):
+        """
+        Identifies the subtrees of a source spec that have changed
+
+        Arguments:
+          previous (dict): Source spec from which current spec was
+            constructed
+          source_spec (dict): Updated source spec
+
+        Returns:
+          list: Keys leading to each changed top-level key, or to each
+          changed index of a top-level indexed level; None if the
+          presets selected for the entire spec have changed
+        """
+        from . import index_key, is_index, is_same
+
+        if not isinstance(previous, dict) or not isinstance(source_spec,
+          dict):
+            return None
+        if not is_same(previous.get("presets"), source_spec.get("presets")):
+            return None
+
+        paths = []
+        for key in list(source_spec) + [k for k in previous if k not in
+          source_spec]:
+            if key == "presets":
+                continue
+            if key not in previous or key not in source_spec:
+                paths.append((key,))
+                continue
+            old_val = previous[key]
+            new_val = source_spec[key]
+            if (key in self.plan.indexed_levels and isinstance(old_val, dict)
+              and isinstance(new_val, dict)):
+                # Arguments applied to all indexes changed
+                if not is_same(
+                  dict([(k, v) for k, v in old_val.items() if not is_index(k)]),
+                  dict([(k, v) for k, v in new_val.items() if
+                      not is_index(k)])):
+                    paths.append((key,))
+                    continue
+                old_indexes = dict([(index_key(k), v) for k, v in
+                    old_val.items() if is_index(k)])
+                new_indexes = dict([(index_key(k), v) for k, v in
+                    new_val.items() if is_index(k)])
+                for index in sorted(set(old_indexes).union(new_indexes)):
+                    if (index not in old_indexes or index not in new_indexes
+                      or not is_same(old_indexes[index], new_indexes[index])):
+                        paths.append((key, index))
+            elif not is_same(old_val, new_val):
+                paths.append((key,))
+        return paths
+
+    @staticmethod
+    def set_subtree(spec, path, value):
+        """
+        Sets a subtree within a sparse spec, initializing levels above it
+
+        Arguments:
+          spec (CommentedMap): Sparse spec
+          path (tuple): Keys leading to subtree
+          value (object): Subtree
+        """
+        from ruamel.yaml.comments import CommentedMap
+
+        for key in path[:-1]:
+            if key not in spec:
+                spec[key] = CommentedMap()
+            spec = spec[key]
+        spec[path[-1]] = value
 
     @classmethod
-    def main(cls):
+    def construct_many(cls, sources, workers=None, **kwargs):
         """
+        Constructs specs from many source specs, in parallel
+
+        Construction is distributed across a pool of worker processes,
+        each of which compiles this class's construction plan once and
+        reuses it for every spec it constructs. An error constructing
+        one spec is recorded in its result and does not interrupt the
+        remainder of the batch.
+
+        Arguments:
+          sources (list): Source specs; each may be a path to a yaml
+            file, a string of yaml, or a dict, as accepted by
+            :func:`yaml_load`
+          workers (int, optional): Number of worker processes; if 1,
+            specs are constructed serially within this process; if
+            None, one worker is started per available processor
+          kwargs (dict): Additional keyword arguments passed to the
+            constructor for each spec
+
+        Returns:
+          list: :class:`YSpecResult` for each source spec, in input
+          order
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        sources = list(sources)
+        kwargs.setdefault("verbose", 0)
+
+        # Compile plan before starting workers; forked workers inherit it
+        cls.compile()
+
+        if workers == 1 or len(sources) <= 1:
+            return [construct_one(cls, i, source_spec, kwargs) for
+                i, source_spec in enumerate(sources)]
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers,
+          **cls.get_pool_kwargs()) as executor:
+            futures = [executor.submit(construct_one, cls, i, source_spec,
+              kwargs) for i, source_spec in enumerate(sources)]
+            for i, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    # Errors transferring spec or result between processes
+                    results.append(YSpecResult(i, None, error, None, None))
+        return results
+
+    @classmethod
+    def watch(cls, source_spec, diff=False, interval=1.0, **kwargs):
+        """
+        Constructs spec, then rebuilds it each time source spec changes
+
+        Only the portions of the spec whose source has changed are
+        rebuilt (see :meth:`rebuild`). Watching continues until
+        interrupted.
+
+        Arguments:
+          source_spec (str): Path to source spec infile
+          diff (bool): After each change, output only the changes to
+            spec, rather than the entire updated spec
+          interval (float): Interval in seconds at which to check source
+            spec infile for changes
+          kwargs (dict): Additional keyword arguments passed to
+            constructor
+
+        Returns:
+          YSpecConstructor: Constructor holding last constructed spec
+        """
+        from os.path import getmtime
+        from time import sleep
+
+        verbose = kwargs.get("verbose", 1)
+        constructor = cls(source_spec=source_spec, **kwargs)
+        mtime = getmtime(source_spec)
+        try:
+            while True:
+                sleep(interval)
+                try:
+                    if getmtime(source_spec) == mtime:
+                        continue
+                    mtime = getmtime(source_spec)
+                    changes = constructor.rebuild(source_spec)
+                except Exception as error:
+                    # Source spec may be incomplete or invalid while edited
+                    if verbose >= 1:
+                        print("\nUnable to rebuild spec: {0}".format(error))
+                    continue
+                if verbose < 1:
+                    continue
+                if diff:
+                    print("\nChanges to spec:")
+                    print(changes.diff())
+                else:
+                    print("\nUpdated spec:")
+                    print(constructor.dump())
+        except KeyboardInterrupt:
+            pass
+        return constructor
+
+    @classmethod
+    def get_pool_kwargs(cls):
+        """
+        Prepares keyword arguments for a pool of worker processes
+
+        Returns:
+          dict: Keyword arguments for :class:`ProcessPoolExecutor`
+        """
+        import sys
+
+        # Worker initializers are not supported prior to Python 3.7
+        if sys.version_info >= (3, 7):
+            return dict(initializer=initialize_worker, initargs=(cls,))
+        return {}
+
+    @classmethod
+    def run(cls, watch=False, profile=None, cprofile=False, diff=False,
+      **kwargs):
+        """
+        Constructs spec as directed by parsed command-line arguments
+
+        Arguments:
+          watch (bool): Watch source spec for changes, rebuilding spec
+            each time it changes (see :meth:`watch`)
+          profile (str, optional): Path to outfile to which to write
+            profile of construction
+          cprofile (bool): When profiling, also capture construction
+            using cProfile
+          diff (bool): When watching, output only the changes to spec
+          kwargs (dict): Additional keyword arguments passed to
+            constructor
+
+        Returns:
+          YSpecConstructor: Constructor holding constructed spec
+        """
+        if watch:
+            return cls.watch(diff=diff, **kwargs)
+        elif profile is not None:
+            from .YSpecProfile import YSpecProfile
+
+            spec = cls(profile=YSpecProfile(cprofile=cprofile), **kwargs)
+            spec.profile.write(profile)
+            if kwargs.get("verbose", 1) >= 1:
+                print(spec.profile.format())
+            return spec
+        else:
+            return cls(**kwargs)
+
+    @classmethod
+    def main(cls, argv=None, parser=None):
+        """
+        Constructs spec as directed by command-line arguments
+
+        Arguments:
+          argv (list, optional): Command-line arguments; if None, those
+            of this process are used
+          parser (ArgumentParser, optional): Argument parser previously
+            prepared using :meth:`construct_argparser`; if None, a new
+            parser is prepared
+
+        Returns:
+          YSpecConstructor: Constructor holding constructed spec
         """
         # Prepare argument parser
-        parser = cls.construct_argparser()
+        if parser is None:
+            parser = cls.construct_argparser()
 
         # Parse arguments
-        kwargs = vars(parser.parse_args())
-        kwargs.pop("cls")(**kwargs)
-
+        kwargs = vars(parser.parse_args(argv))
+        constructor = kwargs.pop("cls")
+        return constructor.run(**kwargs)
 
 #################################### MAIN #####################################
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecHelpFormatter.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Formats command line help, rendering costly descriptions on demand
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from argparse import RawDescriptionHelpFormatter
+
+
+################################### CLASSES ###################################
+class YSpecHelpFormatter(RawDescriptionHelpFormatter):
+    """
+    Formats command line help, rendering costly descriptions on demand
+
+    Descriptions of the parser and of argument groups may be given as
+    functions rather than text; each is called only if help is
+    actually formatted, so that tools whose help is expensive to
+    prepare (e.g. a table of available presets) do not pay that cost
+    on every run. Descriptions are otherwise output verbatim.
+    """
+
+    def add_text(self, text):
+        """
+        Adds text to help, rendering it first if it is a function
+
+        Arguments:
+          text (str, callable): Text, or function returning text
+        """
+        if callable(text):
+            text = text()
+        super(YSpecHelpFormatter, self).add_text(text)
\ No newline at end of file
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecIndexedLevel.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Indexed levels of spec hierarchy, with tables of their indexes
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+import sys
+from bisect import bisect_left
+from collections import OrderedDict
+from ruamel.yaml.comments import CommentedMap
+from ruamel.yaml.representer import RoundTripRepresenter
+from . import index_key, is_index
+from .YSpecYaml import YSpecDumper
+
+
+################################ COMPATIBILITY ################################
+# Dicts retain the order in which keys are inserted as of Python 3.7
+if sys.version_info >= (3, 7):
+    YSpecNodeBase = dict
+else:
+    YSpecNodeBase = OrderedDict
+
+
+################################### CLASSES ###################################
+class YSpecIndexTable(object):
+    """
+    Mixin maintaining a sorted table of the indexes within a level
+
+    Maintains a sorted table of the indexes present within this level
+    as indexes are added and removed, so that plugins need not search
+    and sort the level's keys each time they loop over its indexes.
+
+    Attributes:
+      indexes (list): Indexes present within this level, as ints, in
+        sorted order; shared with callers and must not be modified
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes level and its table of indexes
+
+        Arguments:
+          args (list): Positional arguments passed to mapping class
+          kwargs (dict): Keyword arguments passed to mapping class
+        """
+        self.indexes = []
+        super(YSpecIndexTable, self).__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        """
+        Sets a value within this level, adding key to table of indexes
+        if it is a new index
+
+        Arguments:
+          key (int, str): Key
+          value (object): Value
+        """
+        if is_index(key) and key not in self:
+            index = index_key(key)
+            position = bisect_left(self.indexes, index)
+            if (position == len(self.indexes) or
+              self.indexes[position] != index):
+                self.indexes.insert(position, index)
+        super(YSpecIndexTable, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        """
+        Removes a value from this level, removing key from table of
+        indexes if it is an index
+
+        Arguments:
+          key (int, str): Key
+        """
+        super(YSpecIndexTable, self).__delitem__(key)
+        if is_index(key):
+            self.indexes.remove(index_key(key))
+
+    def clear(self):
+        """
+        Removes all values from this level
+        """
+        super(YSpecIndexTable, self).clear()
+        del self.indexes[:]
+
+    def pop(self, key, *args):
+        """
+        Removes and returns a value from this level
+
+        Arguments:
+          key (int, str): Key
+          args (list): Value returned if key is not present; if omitted,
+            KeyError is raised
+
+        Returns:
+          object: Removed value
+        """
+        if key not in self:
+            if len(args) > 0:
+                return args[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self, last=True):
+        """
+        Removes and returns a (key, value) pair from this level
+
+        Arguments:
+          last (bool): Remove last pair, rather than first
+
+        Returns:
+          tuple: Removed (key, value) pair
+        """
+        if len(self) == 0:
+            raise KeyError("popitem(): level is empty")
+        key = next(reversed(self) if last else iter(self))
+        return key, self.pop(key)
+
+
+class YSpecIndexedLevel(YSpecIndexTable, CommentedMap):
+    """
+    Indexed level of spec hierarchy, with a table of its indexes
+    """
+
+    def clear(self):
+        """
+        Removes all values from this level
+        """
+        super(YSpecIndexedLevel, self).clear()
+        self._ok.clear()
+
+
+class YSpecPlainIndexedLevel(YSpecIndexTable, OrderedDict):
+    """
+    Indexed level of spec hierarchy without annotation, with a table of
+    its indexes
+    """
+
+
+class YSpecIndexNode(YSpecNodeBase):
+    """
+    Compact index of an indexed level of spec hierarchy
+
+    Unlike a CommentedMap, holds no comments, formatting, or other
+    per-level structures, and so occupies a fraction of the memory;
+    used for the indexes of indexed levels whenever the origins of
+    arguments are recorded in a provenance table, or not recorded at
+    all. Index nodes are dicts, and are replaced by CommentedMaps only
+    when a spec is annotated to be dumped (see :meth:`expand`).
+    """
+    __slots__ = ()
+
+    @classmethod
+    def expand(cls, level, memo=None, copy=False):
+        """
+        Replaces index nodes within a level by CommentedMaps, which may
+        be annotated
+
+        Levels containing index nodes are copied rather than modified;
+        levels that do not are returned unchanged, unless *copy* is
+        set.
+
+        Arguments:
+          level (dict): Level
+          memo (dict, optional): Levels already expanded, and the
+            levels themselves, keyed by id of level; levels shared among
+            several places remain shared
+          copy (bool): Copy every level, retaining its comments and
+            formatting, so that the returned levels may be annotated
+            without modifying *level*; values other than levels are not
+            copied
+
+        Returns:
+          dict: *level*, or a copy in which index nodes are replaced
+        """
+        from . import copy_attributes
+
+        if memo is None:
+            memo = {}
+        if id(level) in memo:
+            return memo[id(level)][1]
+
+        items = []
+        changed = copy or isinstance(level, cls)
+        for key, value in level.items():
+            if isinstance(value, dict):
+                expanded = cls.expand(value, memo, copy)
+                if expanded is not value:
+                    changed = True
+                value = expanded
+            items.append((key, value))
+
+        if not changed:
+            expanded = level
+        else:
+            if isinstance(level, cls):
+                expanded = CommentedMap()
+            else:
+                expanded = type(level)()
+            for key, value in items:
+                expanded[key] = value
+            if not isinstance(level, cls):
+                copy_attributes(level, expanded)
+        memo[id(level)] = (level, expanded)
+        return expanded
+
+
+################################ REPRESENTERS #################################
+# yspec's dumper holds its own table of representers, copied from
+# ruamel's; levels are registered with both
+for representer in (RoundTripRepresenter, YSpecDumper):
+    representer.add_representer(YSpecIndexedLevel,
+      RoundTripRepresenter.represent_dict)
+    representer.add_representer(YSpecPlainIndexedLevel,
+      RoundTripRepresenter.represent_dict)
+    representer.add_representer(YSpecIndexNode,
+      RoundTripRepresenter.represent_dict)
\ No newline at end of file
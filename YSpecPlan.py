@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecPlan.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Compiled construction plan for a spec constructor class
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from collections import namedtuple
+
+
+################################### CLASSES ###################################
+class YSpecDefaultsLevel(namedtuple("YSpecDefaultsLevel",
+  ["steps", "sublevels"])):
+    """
+    Default arguments of one level of spec hierarchy, flattened
+
+    Attributes:
+      steps (tuple): Default arguments within this level, excluding
+        indexed levels below it, in order of application; each step is
+        a (path, value, is_level) tuple, in which *path* is a tuple of
+        keys relative to this level and *is_level* indicates that the
+        step initializes a level rather than setting a value
+      sublevels (tuple): Default arguments of indexed levels below this
+        level; each is a (key, :class:`YSpecDefaultsLevel`) tuple
+    """
+
+    @classmethod
+    def compile(cls, defaults, indexed_levels):
+        """
+        Flattens default arguments of one level of spec hierarchy
+
+        Arguments:
+          defaults (dict): Default arguments within this level
+          indexed_levels (dict): Indexed levels below this level
+
+        Returns:
+          YSpecDefaultsLevel: Flattened default arguments
+        """
+        if indexed_levels is None:
+            indexed_levels = {}
+        steps = []
+        sublevels = []
+
+        def flatten(defaults, path):
+            for key, val in defaults.items():
+                # Indexed levels may only occur at the top of this level
+                if len(path) == 0 and key in indexed_levels:
+                    if val is not None:
+                        sublevels.append((key,
+                          cls.compile(val, indexed_levels.get(key))))
+                elif isinstance(val, dict):
+                    steps.append((path + (key,), None, True))
+                    flatten(val, path + (key,))
+                else:
+                    steps.append((path + (key,), val, False))
+
+        if defaults is not None:
+            flatten(defaults, ())
+        return cls(tuple(steps), tuple(sublevels))
+
+
+class YSpecPlan(namedtuple("YSpecPlan",
+  ["indexed_levels", "defaults", "available_presets", "preset_levels",
+      "header", "footer", "ranks"])):
+    """
+    Compiled construction plan for a spec constructor class
+
+    The static configuration of a constructor class (indexed levels,
+    default arguments, available presets, and sort order) is
+    interpreted once, yielding an immutable plan that is shared by
+    every construction using that class; only the source spec varies
+    between constructions. Configuration within the plan is shared and
+    must not be modified.
+
+    Attributes:
+      indexed_levels (dict): Levels of spec hierarchy that include an
+        additional layer of indexes below them
+      defaults (YSpecDefaultsLevel): Flattened default arguments
+      available_presets (dict): Available presets, after inheritance
+        and extension
+      preset_levels (dict): Available presets projected onto each
+        level of spec hierarchy; keys are tuples of the (non-index)
+        keys leading to each level, and values are dicts of presets
+        applicable at that level
+      header (frozenset): Keys sorted to the top of each level
+      footer (frozenset): Keys sorted to the bottom of each level
+      ranks (dict): Rank of each header and footer key within each
+        level, by which keys are sorted
+    """
+    plans = {}
+
+    @classmethod
+    def compile(cls, constructor, recompile=False):
+        """
+        Compiles construction plan for a constructor class
+
+        Arguments:
+          constructor (type, YSpecConstructor): Constructor class (or
+            instance of constructor class)
+          recompile (bool): Discard previously compiled plan, if any
+
+        Returns:
+          YSpecPlan: Construction plan, compiled once per class
+        """
+        from .plugins import YSpecPlugin
+        from .plugins.DefaultsPlugin import DefaultsPlugin
+        from .plugins.PresetsPlugin import PresetsPlugin
+        from .plugins.SortPlugin import SortPlugin
+
+        if not isinstance(constructor, type):
+            constructor = type(constructor)
+        if not recompile and constructor in cls.plans:
+            return cls.plans[constructor]
+
+        indexed_levels = YSpecPlugin.get_config("indexed_levels",
+          constructor=constructor, attr_of_constructor=True)
+        if indexed_levels is None:
+            indexed_levels = {}
+        defaults = YSpecDefaultsLevel.compile(
+          DefaultsPlugin.get_config("defaults", constructor=constructor),
+          indexed_levels)
+        available_presets = PresetsPlugin.initialize_available_presets(
+          constructor=constructor)
+        header = SortPlugin.get_config("header", constructor=constructor)
+        footer = SortPlugin.get_config("footer", constructor=constructor)
+
+        header = frozenset(header if header is not None else [])
+        footer = frozenset(footer if footer is not None else [])
+
+        plan = cls(indexed_levels, defaults, available_presets,
+          cls.project_presets(available_presets), header, footer,
+          SortPlugin.compile_ranks(header, footer))
+        cls.plans[constructor] = plan
+        return plan
+
+    @staticmethod
+    def project_presets(available_presets):
+        """
+        Projects available presets onto each level of spec hierarchy
+
+        Arguments:
+          available_presets (dict): Available presets, after
+            inheritance and extension
+
+        Returns:
+          dict: Available presets applicable at each level; keys are
+          tuples of the keys leading to each level
+        """
+        preset_levels = {}
+        queue = [((), available_presets)]
+        while len(queue) > 0:
+            level_path, level_presets = queue.pop()
+            preset_levels[level_path] = level_presets
+            keys = []
+            for preset in level_presets.values():
+                for key, val in preset.items():
+                    if (isinstance(val, dict) and key not in keys
+                      and not str(key).startswith("_")):
+                        keys.append(key)
+            for key in keys:
+                queue.append((level_path + (key,),
+                  {k: v[key] for k, v in level_presets.items() if key in v}))
+        return preset_levels
\ No newline at end of file
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecProfile.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Records the cost of each stage of spec construction
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+
+################################### CLASSES ###################################
+class YSpecProfile(object):
+    """
+    Records the cost of each stage of spec construction
+
+    For each stage (loading the source spec, and each plugin), records
+    wall time, the number of calls to :meth:`YSpecPlugin.set` and
+    :meth:`YSpecPlugin.initialize`, the number of levels of the spec
+    visited, and the number of levels created. Plugins count through
+    the stage that is currently running, so that plugins run within
+    other plugins (e.g. by the fused plugin) are counted toward the
+    outer stage. Optionally, the entire construction is also captured
+    using cProfile.
+
+    Profiling is opt-in; when a constructor is not given a profile,
+    plugins skip counting entirely.
+
+    Attributes:
+      stages (OrderedDict): Counts of each stage, keyed by name
+      current (dict): Counts of the stage that is currently running
+      profiler (Profile): cProfile profiler, if capturing
+    """
+    counters = ["time", "calls", "set", "initialize", "visited", "created"]
+
+    def __init__(self, cprofile=False):
+        """
+        Initializes empty profile
+
+        Arguments:
+          cprofile (bool): Also capture construction using cProfile
+        """
+        from collections import OrderedDict
+
+        self.stages = OrderedDict()
+        self.current = None
+        self.started = None
+        if cprofile:
+            from cProfile import Profile
+
+            self.profiler = Profile()
+        else:
+            self.profiler = None
+
+    def start(self, name):
+        """
+        Starts recording a stage
+
+        Arguments:
+          name (str): Name of stage; if a stage of this name has been
+            recorded before, counts are added to it
+        """
+        from collections import OrderedDict
+        from timeit import default_timer
+
+        if name not in self.stages:
+            self.stages[name] = OrderedDict([(c, 0) for c in self.counters])
+        self.current = self.stages[name]
+        self.current["calls"] += 1
+        if self.profiler is not None:
+            self.profiler.enable()
+        self.started = default_timer()
+
+    def stop(self):
+        """
+        Stops recording the current stage
+        """
+        from timeit import default_timer
+
+        elapsed = default_timer() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.current["time"] += elapsed
+        self.current = None
+        self.started = None
+
+    def count_set(self):
+        """
+        Counts one value set
+        """
+        if self.current is not None:
+            self.current["set"] += 1
+
+    def count_initialize(self):
+        """
+        Counts one level initialized
+        """
+        if self.current is not None:
+            self.current["initialize"] += 1
+
+    def count_visited(self):
+        """
+        Counts one level visited
+        """
+        if self.current is not None:
+            self.current["visited"] += 1
+
+    def count_created(self):
+        """
+        Counts one level created
+        """
+        if self.current is not None:
+            self.current["created"] += 1
+
+    def get_functions(self, sort="cumulative", limit=30):
+        """
+        Summarizes the functions captured using cProfile
+
+        Arguments:
+          sort (str): Column by which to sort functions; 'cumulative',
+            'total', or 'calls'
+          limit (int): Maximum number of functions to include
+
+        Returns:
+          list: Dict of file, line, function, calls, total time, and
+          cumulative time of each function; empty if not capturing
+        """
+        from pstats import Stats
+
+        if self.profiler is None:
+            return []
+        columns = dict(calls=0, total=2, cumulative=3)
+        stats = Stats(self.profiler).stats
+        functions = sorted(stats.items(),
+          key=lambda item: item[1][columns[sort]], reverse=True)
+        return [dict(file=file_, line=line, function=function,
+          calls=nc, total=tt, cumulative=ct) for
+            (file_, line, function), (cc, nc, tt, ct, callers) in
+            functions[:limit]]
+
+    def report(self, **kwargs):
+        """
+        Prepares profile as a data structure
+
+        Arguments:
+          kwargs (dict): Additional keyword arguments passed to
+            :meth:`get_functions`
+
+        Returns:
+          OrderedDict: Counts of each stage, total counts, and, if
+          capturing, functions captured using cProfile
+        """
+        from collections import OrderedDict
+
+        total = OrderedDict([(c, sum([s[c] for s in self.stages.values()]))
+          for c in self.counters])
+        report = OrderedDict([("stages", self.stages), ("total", total)])
+        if self.profiler is not None:
+            report["functions"] = self.get_functions(**kwargs)
+        return report
+
+    def format(self):
+        """
+        Formats counts of each stage as a table
+
+        Returns:
+          str: Table of counts
+        """
+        report = self.report(limit=0)
+        lines = ["{0:12s} {1:>10s} {2:>10s} {3:>10s} {4:>10s} {5:>10s}".format(
+          "stage", "time (s)", "set", "initialize", "visited", "created")]
+        rows = list(report["stages"].items()) + [("total", report["total"])]
+        for name, stage in rows:
+            lines.append("{0:12s} {1:10.4f} {2:10d} {3:10d} {4:10d} "
+              "{5:10d}".format(name, stage["time"], stage["set"],
+                stage["initialize"], stage["visited"], stage["created"]))
+        return "\n".join(lines)
+
+    def write(self, outfile, **kwargs):
+        """
+        Writes profile to a file as JSON
+
+        Arguments:
+          outfile (str): Path to output file
+          kwargs (dict): Additional keyword arguments passed to
+            :meth:`report`
+        """
+        import json
+        from os.path import expandvars, expanduser
+
+        with open(expandvars(expanduser(outfile)), "w") as out:
+            json.dump(self.report(**kwargs), out, indent=2)
\ No newline at end of file
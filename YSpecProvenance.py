@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecProvenance.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Records the origin of each argument within a spec
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+
+################################### CLASSES ###################################
+class YSpecProvenance(object):
+    """
+    Records the origin of each argument within a spec
+
+    Origins are stored in a side table keyed by the path to each
+    argument, rather than as comments attached to the spec itself;
+    they are rendered into comments only when the spec is dumped. Each
+    origin is a string of the form 'plugin' or 'plugin:detail' (e.g.
+    'presets:preset_1'); identical origins are stored once.
+
+    Attributes:
+      paths (dict): Origin of each argument or level; keys are tuples
+        of the keys leading to each argument
+      origins (dict): Distinct origins, through which identical origin
+        strings are shared
+    """
+
+    def __init__(self):
+        """
+        Initializes empty table
+        """
+        self.paths = {}
+        self.origins = {}
+
+    def __contains__(self, path):
+        """bool: Whether origin of path is known"""
+        return tuple(path) in self.paths
+
+    def __getitem__(self, path):
+        """str: Origin of path"""
+        return self.paths[tuple(path)]
+
+    def __iter__(self):
+        """iterator: Paths whose origins are known"""
+        return iter(self.paths)
+
+    def __len__(self):
+        """int: Number of paths whose origins are known"""
+        return len(self.paths)
+
+    def record(self, path, origin):
+        """
+        Records the origin of an argument or level
+
+        Arguments:
+          path (tuple): Keys leading to argument or level
+          origin (str): Origin of argument or level
+        """
+        self.paths[path] = self.origins.setdefault(origin, origin)
+
+    def discard(self, prefix):
+        """
+        Removes the origins of an argument or level and of all arguments
+        and levels below it
+
+        Arguments:
+          prefix (list, tuple): Keys leading to argument or level
+        """
+        prefix = tuple(prefix)
+        for path in [p for p in self.paths if p[:len(prefix)] == prefix]:
+            del self.paths[path]
+
+    def update(self, other, prefix=None):
+        """
+        Copies origins from another table
+
+        Arguments:
+          other (YSpecProvenance): Table from which to copy origins
+          prefix (list, tuple, optional): Keys leading to argument or
+            level whose origins, and those of the arguments and levels
+            below it, are copied; if None, all origins are copied
+        """
+        for path, origin in other.items(prefix):
+            self.record(path, origin)
+
+    def get(self, path, default=None):
+        """
+        Retrieves the origin of an argument or level
+
+        Arguments:
+          path (list, tuple): Keys leading to argument or level
+          default (object): Value returned if origin is not known
+
+        Returns:
+          str: Origin of argument or level
+        """
+        return self.paths.get(tuple(path), default)
+
+    def items(self, prefix=None):
+        """
+        Lists the origins of arguments and levels below a path
+
+        Arguments:
+          prefix (list, tuple, optional): Keys leading to level below
+            which to list origins; if None, all origins are listed
+
+        Returns:
+          list: (path, origin) pairs, sorted by path
+        """
+        if prefix is None:
+            prefix = ()
+        prefix = tuple(prefix)
+        items = [(path, origin) for path, origin in self.paths.items() if
+            path[:len(prefix)] == prefix]
+        return sorted(items, key=lambda item: [str(k) for k in item[0]])
+
+    def select(self, plugin, detail=None):
+        """
+        Lists the paths of arguments and levels set by a plugin
+
+        Arguments:
+          plugin (str): Name of plugin
+          detail (str, optional): Detail of origin within plugin, such
+            as the name of a preset; if None, all paths set by *plugin*
+            are listed
+
+        Returns:
+          list: Paths, sorted
+        """
+        if detail is None:
+            paths = [path for path, origin in self.paths.items() if
+                origin.split(":", 1)[0] == plugin]
+        else:
+            origin = "{0}:{1}".format(plugin, detail)
+            paths = [path for path, o in self.paths.items() if o == origin]
+        return sorted(paths, key=lambda path: [str(k) for k in path])
+
+    def annotate(self, spec, column=80):
+        """
+        Renders origins into comments within a spec
+
+        The comment of each level is attached to the level itself, and
+        the comment of each other argument to the level containing it;
+        paths no longer present within the spec are skipped. *spec*
+        itself is not modified; comments are added to a transient copy
+        of its levels, in which compact index nodes, which cannot hold
+        comments, are replaced by CommentedMaps (see
+        :meth:`YSpecIndexNode.expand`). Values other than levels are
+        not copied.
+
+        Arguments:
+          spec (CommentedMap): Spec to annotate
+          column (int): Column at which to place comments
+
+        Returns:
+          CommentedMap: Annotated copy of spec; or *spec* itself if it
+          cannot hold comments
+        """
+        from .YSpecIndexedLevel import YSpecIndexNode
+
+        if not hasattr(spec, "yaml_add_eol_comment"):
+            return spec
+        spec = YSpecIndexNode.expand(spec, copy=True)
+        for path, origin in self.paths.items():
+            destination = spec
+            for key in path[:-1]:
+                if not isinstance(destination, dict):
+                    break
+                destination = destination.get(key)
+            if (not isinstance(destination, dict) or
+              path[-1] not in destination):
+                continue
+            value = destination[path[-1]]
+            if isinstance(value, dict):
+                if hasattr(value, "yaml_add_eol_comment"):
+                    value.yaml_add_eol_comment(origin, column=column)
+            elif hasattr(destination, "yaml_add_eol_comment"):
+                destination.yaml_add_eol_comment(origin, path[-1],
+                  column=column)
+        return spec
\ No newline at end of file
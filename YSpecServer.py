@@ -0,0 +1,358 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   yspec.YSpecServer.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Constructs specs on behalf of clients, over a Unix domain socket
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+if __name__ == "__main__":
+    __package__ = str("yspec")
+    import yspec
+from io import StringIO
+from six.moves import socketserver
+from . import YSpecCLTool
+from .YSpecClient import YSpecClient
+
+
+################################### CLASSES ###################################
+class YSpecCapture(StringIO):
+    """
+    Captures output destined for a client's terminal
+
+    Attributes:
+      tty (bool): Whether client's output is a terminal, reported to
+        code that formats output differently for terminals
+    """
+
+    def __init__(self, tty=False):
+        """
+        Arguments:
+          tty (bool): Whether client's output is a terminal
+        """
+        super(YSpecCapture, self).__init__()
+        self.tty = tty
+
+    def isatty(self):
+        """bool: Whether client's output is a terminal"""
+        return self.tty
+
+    def write(self, text):
+        """
+        Writes text, which may be bytes under Python 2
+
+        Arguments:
+          text (str): Text
+
+        Returns:
+          int: Number of characters written
+        """
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        return super(YSpecCapture, self).write(text)
+
+
+class YSpecRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a single client's request
+    """
+
+    def handle(self):
+        """
+        Reads request, and writes response
+        """
+        request = YSpecClient.receive(self.connection)
+        response = self.server.respond(request)
+        YSpecClient.send(self.connection, response)
+
+
+class YSpecServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer,
+  YSpecCLTool):
+    """
+    Constructs specs on behalf of clients, over a Unix domain socket
+
+    Starting the interpreter, importing ruamel, and preparing a
+    constructor's argument parser and construction plan take longer
+    than constructing many small specs. The server does this once, and
+    then listens for command lines submitted by :class:`YSpecClient`,
+    which accepts the same arguments as :meth:`YSpecConstructor.main`.
+    Each request is handled within a process forked from the server,
+    which inherits the prepared constructor and may change directory
+    and redirect output without affecting the server or other
+    requests; its output and exit status are returned to the client.
+
+    Requests are run as the user that started the server, and so are
+    accepted only from that user. The socket is accessible only by
+    that user, and is by default placed within a directory private to
+    that user; where the platform reports the user of a connecting
+    peer, peers belonging to other users are also refused.
+
+    Attributes:
+      constructor (type): Constructor class
+      socket_path (str): Path of socket
+      parser (ArgumentParser): Constructor's argument parser
+      verbose (int): Level of output
+    """
+
+    def __init__(self, constructor, socket_path=None, verbose=1, **kwargs):
+        """
+        Prepares constructor, and binds socket
+
+        A socket left in place by a server that did not exit cleanly is
+        replaced; a socket on which another server is listening is not.
+        If no path is provided, the socket's directory is created if
+        necessary, and must belong to this user and be inaccessible to
+        other users.
+
+        Arguments:
+          constructor (type): Constructor class
+          socket_path (str, optional): Path of socket; if None, the
+            default of :meth:`YSpecClient.get_socket_path` is used
+          verbose (int): Level of output
+          kwargs (dict): Additional keyword arguments
+
+        Raises:
+          socket.error: Another server is listening on socket, or the
+            default directory of socket is accessible to other users
+        """
+        import os
+        import socket
+
+        self.constructor = constructor
+        self.socket_path = YSpecClient.get_socket_path(socket_path)
+        self.verbose = verbose
+
+        # Prepare directory private to this user
+        if self.socket_path == os.path.join(
+          YSpecClient.get_socket_directory(), "server.sock"):
+            directory = YSpecClient.get_socket_directory()
+            if not os.path.isdir(directory):
+                os.mkdir(directory, 0o700)
+            if not YSpecClient.is_private(directory):
+                raise socket.error("{0} does not belong to this user, or is "
+                  "accessible to other users".format(directory))
+
+        # Prepare everything that may be shared by all requests
+        self.constructor.compile()
+        self.parser = self.constructor.construct_argparser()
+
+        # Replace stale socket
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except socket.error:
+                os.unlink(self.socket_path)
+            else:
+                raise socket.error("Another server is listening at "
+                  "{0}".format(self.socket_path))
+            finally:
+                probe.close()
+
+        socketserver.UnixStreamServer.__init__(self, self.socket_path,
+          YSpecRequestHandler)
+
+    def server_bind(self):
+        """
+        Binds socket, making it accessible only by this user
+        """
+        import os
+
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.server_bind(self)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+
+    @staticmethod
+    def get_peer_uid(connection):
+        """
+        Determines the user of a connecting peer
+
+        Arguments:
+          connection (socket): Connection from peer
+
+        Returns:
+          int: User id of peer, or None if not reported by platform
+        """
+        import socket
+        import struct
+
+        if not hasattr(socket, "SO_PEERCRED"):
+            return None
+        credentials = connection.getsockopt(socket.SOL_SOCKET,
+          socket.SO_PEERCRED, struct.calcsize(str("3i")))
+        pid, uid, gid = struct.unpack(str("3i"), credentials)
+        return uid
+
+    def verify_request(self, request, client_address):
+        """
+        Determines whether to handle a request, refusing peers belonging
+        to other users
+
+        Arguments:
+          request (socket): Connection from peer
+          client_address (str): Address of peer
+
+        Returns:
+          bool: True if request is to be handled
+        """
+        import os
+        import sys
+
+        uid = self.get_peer_uid(request)
+        if uid is None or uid == os.getuid():
+            return True
+        if self.verbose >= 1:
+            sys.stderr.write("Refused request from user {0}\n".format(uid))
+        return False
+
+    @classmethod
+    def construct_argparser(cls, **kwargs):
+        """
+        Adds arguments to a nascent argument parser
+
+        Arguments:
+          kwargs (dict): Additional keyword arguments
+
+        Returns:
+          ArgumentParser: Argument parser or subparser
+        """
+        parser = cls.get_argparser(name="YSpecServer",
+          description="construct specs on behalf of clients, over a Unix "
+            "domain socket", **kwargs)
+
+        verbosity = cls.add_mutually_exclusive_argument_group(parser,
+          "verbosity")
+        cls.add_argument(verbosity, "-v", "--verbose", action="count",
+          default=1,
+          help="enable verbose output, may be specified more than once")
+        cls.add_argument(verbosity, "-q", "--quiet", action="store_const",
+          const=0, default=1, dest="verbose", help="disable verbose output")
+        cls.add_argument(parser, "-constructor", type=str,
+          metavar="MODULE:CLASS",
+          default="yspec.YSpecConstructor:YSpecConstructor",
+          help="constructor class with which to construct specs "
+            "(default: %(default)s)")
+        cls.add_argument(parser, "-socket", type=str, dest="socket_path",
+          metavar="PATH",
+          help="""path of socket on which to listen (default: value of
+            ${0}, or a socket within a directory of the temporary
+            directory private to this user)""".format(
+            YSpecClient.socket_env))
+
+        return parser
+
+    @staticmethod
+    def load_constructor(name):
+        """
+        Imports a constructor class
+
+        Arguments:
+          name (str): Module and name of class, separated by ':'
+
+        Returns:
+          type: Constructor class
+        """
+        from importlib import import_module
+
+        module_name, class_name = name.split(":")
+        return getattr(import_module(module_name), class_name)
+
+    def respond(self, request):
+        """
+        Constructs spec as directed by a client's request
+
+        Called within the process forked to handle the request.
+
+        Arguments:
+          request (dict): Request, including command-line arguments
+            'argv', working directory 'cwd', name of program 'prog', and
+            whether client's output is a terminal 'isatty'
+
+        Returns:
+          dict: Response, including output to 'stdout' and 'stderr', and
+          exit 'status'
+        """
+        import os
+        import sys
+        from traceback import format_exc
+
+        stdout = sys.stdout = YSpecCapture(request.get("isatty", False))
+        stderr = sys.stderr = YSpecCapture(request.get("isatty", False))
+        status = 0
+        try:
+            if request.get("cwd") is not None:
+                os.chdir(request["cwd"])
+            if request.get("prog") is not None:
+                self.parser.prog = request["prog"]
+            kwargs = vars(self.parser.parse_args(request.get("argv", [])))
+            if kwargs.get("watch", False):
+                self.parser.error("argument -watch: not supported by server")
+            constructor = kwargs.pop("cls")
+            constructor.run(**kwargs)
+        except SystemExit as exit:
+            # Raised by argument parser after outputting help or errors
+            if exit.code is None:
+                status = 0
+            elif isinstance(exit.code, int):
+                status = exit.code
+            else:
+                print(exit.code, file=sys.stderr)
+                status = 1
+        except Exception:
+            sys.stderr.write(format_exc())
+            status = 1
+        finally:
+            sys.stdout = sys.__stdout__
+            sys.stderr = sys.__stderr__
+
+        return dict(stdout=stdout.getvalue(), stderr=stderr.getvalue(),
+          status=status)
+
+    def serve(self):
+        """
+        Handles requests until interrupted or terminated, then removes
+        socket
+        """
+        import os
+        import signal
+        import sys
+
+        if self.verbose >= 1:
+            print("Constructing specs with {0} at {1}".format(
+              self.constructor.__name__, self.socket_path))
+            sys.stdout.flush()
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    @classmethod
+    def main(cls):
+        """
+        Starts server as directed by command-line arguments
+        """
+        parser = cls.construct_argparser()
+        kwargs = vars(parser.parse_args())
+        constructor = cls.load_constructor(kwargs.pop("constructor"))
+        cls(constructor, **kwargs).serve()
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    YSpecServer.main()
\ No newline at end of file
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecSharedValues.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Tracks values shared between a spec and its sources
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from . import copy_value, is_immutable
+
+
+################################### CLASSES ###################################
+class YSpecSharedValues(object):
+    """
+    Tracks values shared between a spec and its sources
+
+    Rather than copying each value stored within a nascent spec,
+    plugins store the value from the source spec, presets, or defaults
+    itself, and record it here as shared. During construction, a
+    shared value is copied only when it is about to be modified in
+    place, through :meth:`own`; values that are immutable are never
+    copied. Values overwritten before construction completes are thus
+    never copied at all.
+
+    Sharing is limited to a single construction. Defaults and presets
+    are cached for each constructor class and reused by every
+    construction, and one value may be stored at several places within
+    a spec; before a constructed spec is handed to its caller, each
+    shared value remaining within it is replaced by a copy of its own,
+    through :meth:`release`.
+
+    Attributes:
+      values (dict): Shared mutable values, keyed by id
+      avoided (int): Number of copies of mutable values avoided by
+        sharing them
+      copied (int): Number of shared values copied, either before
+        being modified or when released
+    """
+
+    def __init__(self):
+        """
+        Initializes empty table
+        """
+        self.values = {}
+        self.avoided = 0
+        self.copied = 0
+
+    def __contains__(self, value):
+        """bool: Whether value is shared"""
+        return id(value) in self.values
+
+    def __len__(self):
+        """int: Number of shared mutable values"""
+        return len(self.values)
+
+    def share(self, value):
+        """
+        Records that a value is to be stored without being copied
+
+        Arguments:
+          value (object): Value
+
+        Returns:
+          object: *value*
+        """
+        if not is_immutable(value):
+            self.values[id(value)] = value
+            self.avoided += 1
+        return value
+
+    def own(self, destination, key):
+        """
+        Prepares a value within a nascent spec to be modified in place
+
+        If the value is shared, it is replaced within *destination* by
+        a copy, which is not shared.
+
+        Arguments:
+          destination (dict): Level containing value
+          key (str, int): Key of value
+
+        Returns:
+          object: Value, which may be safely modified in place
+        """
+        from copy import deepcopy
+
+        value = destination[key]
+        if id(value) in self.values:
+            value = deepcopy(value)
+            destination[key] = value
+            self.avoided -= 1
+            self.copied += 1
+        return value
+
+    def release(self, level):
+        """
+        Replaces each shared value within a constructed spec with a copy
+
+        Each place at which a shared value is stored receives its own
+        copy, so that the spec may be freely modified in place without
+        affecting other places within it, other specs, or the cached
+        configuration of its constructor class.
+
+        Arguments:
+          level (dict): Constructed spec, or level within it; modified
+            in place
+
+        Returns:
+          dict: *level*
+        """
+        if len(self.values) == 0:
+            return level
+        levels = [level]
+        while len(levels) > 0:
+            sublevel = levels.pop()
+            for key, value in sublevel.items():
+                if id(value) in self.values:
+                    sublevel[key] = copy_value(value)
+                    self.avoided -= 1
+                    self.copied += 1
+                elif isinstance(value, dict):
+                    levels.append(value)
+        return level
\ No newline at end of file
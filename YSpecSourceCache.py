@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecSourceCache.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Persistent cache of parsed yaml source specs
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+
+################################### CLASSES ###################################
+class YSpecSourceCache(object):
+    """
+    Persistent cache of parsed yaml source specs
+
+    Parsing yaml with ruamel's round-trip loader is slow; specs parsed
+    once are stored within a cache directory in pickled form, from
+    which they may be loaded much more quickly. Each entry is keyed by
+    a hash of the file's contents together with the versions of the
+    cache format, Python, and ruamel, so that an edited file, or a
+    change of environment, never yields a stale entry; entries that
+    cannot be read are discarded and the file parsed anew. Entries are
+    written to a temporary file and then renamed into place, so that
+    several processes of one user may safely share one directory.
+
+    Since loading a pickled entry may run arbitrary code, a cache is
+    private to a single user: the directory must belong to the current
+    user and must not be writable by other users, and an entry is
+    loaded only if it belongs to the current user and is not writable
+    by other users; any other entry is parsed anew and replaced.
+
+    Attributes:
+      directory (str): Path to cache directory
+      hits (int): Number of specs loaded from cache
+      misses (int): Number of specs parsed
+    """
+    format_version = 1
+
+    def __init__(self, directory):
+        """
+        Initializes cache, creating directory if necessary
+
+        Arguments:
+          directory (str): Path to cache directory
+
+        Raises:
+          ValueError: Directory belongs to another user, or is writable
+            by other users
+        """
+        from os import makedirs, stat
+        from os.path import expandvars, expanduser, isdir
+
+        self.directory = expandvars(expanduser(directory))
+        if not isdir(self.directory):
+            try:
+                makedirs(self.directory, 0o700)
+            except OSError:
+                # Directory may have been created by another process
+                if not isdir(self.directory):
+                    raise
+        if not self.is_trusted(stat(self.directory)):
+            raise ValueError("yspec source cache directory '{0}' belongs to "
+              "another user, or is writable by other users".format(
+              self.directory))
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self):
+        """str: Versions of cache format, Python, and ruamel"""
+        import sys
+        import ruamel.yaml
+
+        return "yspec-{0}:python-{1}.{2}:ruamel-{3}".format(
+          self.format_version, sys.version_info[0], sys.version_info[1],
+          ruamel.yaml.__version__)
+
+    @staticmethod
+    def is_trusted(status):
+        """
+        Determines whether a file or directory may be trusted, belonging
+        to the current user and not writable by other users
+
+        Arguments:
+          status (stat_result): Status of file or directory
+
+        Returns:
+          bool: True if file or directory may be trusted; always True
+          on platforms without user ids
+        """
+        import os
+        import stat
+
+        if not hasattr(os, "getuid"):
+            return True
+        return (status.st_uid == os.getuid() and
+          not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+    def get_key(self, content):
+        """
+        Calculates key of a source spec
+
+        Arguments:
+          content (bytes): Contents of source spec file
+
+        Returns:
+          str: Hexadecimal hash of contents and versions
+        """
+        from hashlib import sha256
+
+        digest = sha256(self.version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def load(self, infile, plain=False):
+        """
+        Loads a source spec file, from cache if available
+
+        Arguments:
+          infile (str): Path to source spec file
+          plain (bool): Load yaml into plain data structures, without
+            comments
+
+        Returns:
+          dict: Data structure specified by *infile*
+        """
+        import ruamel.yaml as yaml
+        from os import fstat, remove
+        from os.path import join
+        from six.moves import cPickle as pickle
+
+        with open(infile, "rb") as source_file:
+            content = source_file.read()
+        path = join(self.directory, "{0}{1}.pickle".format(
+          self.get_key(content), "-plain" if plain else ""))
+
+        # Load from cache, if entry may be trusted
+        try:
+            with open(path, "rb") as cachefile:
+                if not self.is_trusted(fstat(cachefile.fileno())):
+                    raise IOError("untrusted entry")
+                spec = pickle.load(cachefile)
+            self.hits += 1
+            return spec
+        except (IOError, OSError):
+            pass
+        except Exception:
+            # Entry is corrupt; discard it
+            try:
+                remove(path)
+            except OSError:
+                pass
+
+        # Parse and store in cache
+        self.misses += 1
+        if plain:
+            from .YSpecYaml import YSpecPlainLoader as loader
+        else:
+            loader = yaml.RoundTripLoader
+        spec = yaml.load(content.decode("utf-8"), Loader=loader)
+        self.store(path, spec)
+        return spec
+
+    def store(self, path, spec):
+        """
+        Writes an entry to cache atomically
+
+        Arguments:
+          path (str): Path of entry
+          spec (dict): Parsed source spec
+        """
+        import os
+        from tempfile import mkstemp
+        from warnings import warn
+        from six.moves import cPickle as pickle
+
+        replace = getattr(os, "replace", os.rename)
+        try:
+            descriptor, temp_path = mkstemp(dir=self.directory,
+              suffix=".tmp")
+        except (IOError, OSError) as error:
+            warn("yspec source cache could not be written: {0}".format(
+              error))
+            return
+        try:
+            with os.fdopen(descriptor, "wb") as tempfile:
+                pickle.dump(spec, tempfile, pickle.HIGHEST_PROTOCOL)
+            replace(temp_path, path)
+        except Exception as error:
+            warn("yspec source cache could not be written: {0}".format(
+              error))
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Removes all entries from cache
+        """
+        from os import listdir, remove
+        from os.path import join
+
+        for filename in listdir(self.directory):
+            if filename.endswith(".pickle"):
+                try:
+                    remove(join(self.directory, filename))
+                except OSError:
+                    pass
\ No newline at end of file
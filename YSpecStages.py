@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecStages.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Records immutable snapshots of a nascent spec between stages of
+construction
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from collections import namedtuple
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+from . import is_immutable, is_same
+
+
+################################### CLASSES ###################################
+class YSpecFrozenLevel(Mapping):
+    """
+    Immutable level of a spec snapshot
+
+    Levels of successive snapshots are structurally shared; a level
+    whose contents did not change between two stages is stored once,
+    and referenced by both snapshots.
+
+    Attributes:
+      level_type (type): Class of the level from which this level was
+        frozen, with which it is thawed
+      keys_ (tuple): Keys, in order
+      values_ (dict): Values, keyed by key; levels below this level
+        are themselves frozen
+    """
+    __slots__ = ("level_type", "keys_", "values_")
+
+    def __init__(self, level_type, keys, values):
+        """
+        Arguments:
+          level_type (type): Class of the level being frozen
+          keys (list): Keys, in order
+          values (dict): Values, keyed by key
+        """
+        self.level_type = level_type
+        self.keys_ = tuple(keys)
+        self.values_ = values
+
+    def __getitem__(self, key):
+        """object: Value of key"""
+        return self.values_[key]
+
+    def __iter__(self):
+        """iterator: Keys, in order"""
+        return iter(self.keys_)
+
+    def __len__(self):
+        """int: Number of keys"""
+        return len(self.keys_)
+
+
+class YSpecStage(namedtuple("YSpecStage",
+  ["name", "spec", "added", "removed"])):
+    """
+    Snapshot of a nascent spec after one stage of construction
+
+    Attributes:
+      name (str): Name of stage, generally that of the plugin run
+      spec (YSpecFrozenLevel): Frozen spec
+      added (dict): Origins recorded or changed during this stage,
+        keyed by path
+      removed (tuple): Paths whose origins were discarded during this
+        stage
+    """
+
+
+class YSpecStages(object):
+    """
+    Records immutable snapshots of a nascent spec between stages of
+    construction
+
+    Plugins modify a single nascent spec in place; rather than copying
+    the spec after each stage, each snapshot is frozen against the one
+    before it, so that only the levels that changed during a stage are
+    stored anew and the remainder are shared. Origins are likewise
+    stored as the changes made during each stage. Snapshots may be
+    formatted, compared, or thawed into a spec to roll back to.
+
+    Values other than levels are referenced rather than copied if they
+    are immutable or recorded as shared, and must be owned before being
+    modified in place (see :meth:`YSpecSharedValues.own`); other
+    mutable values are copied once, when first frozen.
+
+    Attributes:
+      stages (list): Snapshot after each stage, in order
+      shared_values (YSpecSharedValues): Values stored within spec
+        without being copied, which are referenced by snapshots
+      frozen (dict): Shared levels already frozen, and the levels
+        themselves, keyed by id of level; shared levels are never
+        modified in place, and are frozen once for all stages
+      paths (dict): Origins as of the last snapshot
+    """
+
+    def __init__(self, shared_values=None):
+        """
+        Arguments:
+          shared_values (YSpecSharedValues, optional): Table of values
+            stored within spec without being copied
+        """
+        self.stages = []
+        self.shared_values = shared_values
+        self.frozen = {}
+        self.paths = {}
+
+    def __getitem__(self, stage):
+        """YSpecStage: Snapshot of stage, by name or position"""
+        return self.stages[self.get_position(stage)]
+
+    def __iter__(self):
+        """iterator: Snapshots, in order"""
+        return iter(self.stages)
+
+    def __len__(self):
+        """int: Number of snapshots"""
+        return len(self.stages)
+
+    @property
+    def names(self):
+        """list: Names of stages, in order"""
+        return [stage.name for stage in self.stages]
+
+    def get_position(self, stage):
+        """
+        Locates a stage
+
+        Arguments:
+          stage (str, int): Name or position of stage; if a name is
+            shared by several stages, the last is used
+
+        Returns:
+          int: Position of stage
+        """
+        if isinstance(stage, int):
+            if stage < 0:
+                stage += len(self.stages)
+            if stage < 0 or stage >= len(self.stages):
+                raise IndexError(stage)
+            return stage
+        for position in range(len(self.stages) - 1, -1, -1):
+            if self.stages[position].name == stage:
+                return position
+        raise KeyError(stage)
+
+    def record(self, name, spec, provenance=None):
+        """
+        Records a snapshot of a nascent spec
+
+        Arguments:
+          name (str): Name of stage
+          spec (dict): Nascent spec after stage
+          provenance (YSpecProvenance, optional): Origins of arguments
+            within spec after stage
+
+        Returns:
+          YSpecStage: Snapshot
+        """
+        if len(self.stages) > 0:
+            previous = self.stages[-1].spec
+        else:
+            previous = None
+        frozen = self.freeze(spec, previous)
+
+        added = {}
+        removed = ()
+        if provenance is not None:
+            paths = provenance.paths
+            added = dict([(p, o) for p, o in paths.items() if
+                self.paths.get(p) != o])
+            removed = tuple([p for p in self.paths if p not in paths])
+            self.paths = dict(paths)
+
+        stage = YSpecStage(name, frozen, added, removed)
+        self.stages.append(stage)
+        return stage
+
+    def freeze(self, level, previous=None):
+        """
+        Freezes a level of nascent spec, sharing unchanged levels with
+        its previous snapshot
+
+        Arguments:
+          level (dict): Level of nascent spec
+          previous (YSpecFrozenLevel, optional): Snapshot of level
+            after previous stage
+
+        Returns:
+          YSpecFrozenLevel: Frozen level; *previous* itself if level
+          is unchanged
+        """
+        shared = (self.shared_values is not None and
+          level in self.shared_values)
+        if shared:
+            cached = self.frozen.get(id(level))
+            if cached is not None:
+                return cached[1]
+        if not isinstance(previous, YSpecFrozenLevel):
+            previous = None
+
+        values = {}
+        unchanged = (previous is not None and
+          previous.level_type is type(level) and len(previous) == len(level))
+        for position, (key, value) in enumerate(level.items()):
+            if previous is not None and key in previous.values_:
+                previous_value = previous.values_[key]
+            else:
+                previous_value = None
+                unchanged = False
+            if isinstance(value, dict):
+                value = self.freeze(value, previous_value)
+            elif not self.is_same_value(value, previous_value):
+                value = self.freeze_value(value)
+            else:
+                value = previous_value
+            if unchanged and (value is not previous_value or
+              previous.keys_[position] != key):
+                unchanged = False
+            values[key] = value
+        if unchanged:
+            frozen = previous
+        else:
+            frozen = YSpecFrozenLevel(type(level), level.keys(), values)
+
+        if shared:
+            self.frozen[id(level)] = (level, frozen)
+        return frozen
+
+    def freeze_value(self, value):
+        """
+        Freezes an argument of nascent spec
+
+        Arguments:
+          value (object): Argument
+
+        Returns:
+          object: *value* if it is immutable or shared; otherwise a copy
+        """
+        from copy import deepcopy
+
+        if is_immutable(value):
+            return value
+        if self.shared_values is not None and value in self.shared_values:
+            return value
+        return deepcopy(value)
+
+    @staticmethod
+    def is_same_value(value, previous_value):
+        """
+        Determines whether an argument is unchanged since its previous
+        snapshot
+
+        Arguments:
+          value (object): Argument of nascent spec
+          previous_value (object): Argument of previous snapshot
+
+        Returns:
+          bool: True if argument is unchanged
+        """
+        if isinstance(previous_value, YSpecFrozenLevel):
+            return False
+        return is_same(value, previous_value)
+
+    def thaw(self, stage, plain=False, share=True):
+        """
+        Thaws a snapshot into a spec that may be modified
+
+        Levels are copied; other values are shared with the snapshot,
+        and must be owned before being modified in place.
+
+        Arguments:
+          stage (str, int): Name or position of stage
+          plain (bool): Thaw levels as plain ordered dicts, regardless
+            of the classes from which they were frozen
+          share (bool): Record values as shared, so that they are copied
+            before being modified in place; may be disabled if spec will
+            not be modified
+
+        Returns:
+          dict: Spec
+        """
+        return self.thaw_level(self[stage].spec, plain=plain, share=share)
+
+    def thaw_level(self, frozen, plain=False, share=True):
+        """
+        Thaws one level of a snapshot
+
+        Arguments:
+          frozen (YSpecFrozenLevel): Frozen level
+          plain (bool): Thaw levels as plain ordered dicts
+          share (bool): Record values as shared
+
+        Returns:
+          dict: Level
+        """
+        from collections import OrderedDict
+
+        level = OrderedDict() if plain else frozen.level_type()
+        for key in frozen.keys_:
+            value = frozen.values_[key]
+            if isinstance(value, YSpecFrozenLevel):
+                value = self.thaw_level(value, plain=plain, share=share)
+            elif share and self.shared_values is not None:
+                value = self.shared_values.share(value)
+            level[key] = value
+        return level
+
+    def rollback(self, stage, plain=False):
+        """
+        Thaws a snapshot and discards the snapshots of later stages
+
+        Arguments:
+          stage (str, int): Name or position of stage
+          plain (bool): Thaw levels as plain ordered dicts
+
+        Returns:
+          tuple: Spec and origins of its arguments after stage
+        """
+        position = self.get_position(stage)
+        spec = self.thaw(position, plain=plain)
+        provenance = self.get_provenance(position)
+        del self.stages[position + 1:]
+        self.paths = dict(provenance.paths)
+        return spec, provenance
+
+    def get_provenance(self, stage):
+        """
+        Reconstructs the origins of arguments after a stage
+
+        Arguments:
+          stage (str, int): Name or position of stage
+
+        Returns:
+          YSpecProvenance: Origins of arguments after stage
+        """
+        from .YSpecProvenance import YSpecProvenance
+
+        provenance = YSpecProvenance()
+        for snapshot in self.stages[:self.get_position(stage) + 1]:
+            for path in snapshot.removed:
+                provenance.paths.pop(path, None)
+            for path, origin in snapshot.added.items():
+                provenance.record(path, origin)
+        return provenance
+
+    def dump(self, stage, **kwargs):
+        """
+        Formats a snapshot as yaml, annotated with the origin of each
+        argument
+
+        Arguments:
+          stage (str, int): Name or position of stage
+          kwargs (dict): Additional keyword arguments passed to
+            :func:`yaml_dump`
+
+        Returns:
+          str: Formatted snapshot
+        """
+        from . import yaml_dump
+
+        return yaml_dump(self.thaw(stage, share=False),
+          provenance=self.get_provenance(stage), **kwargs)
+
+    def diff(self, stage, other=None, **kwargs):
+        """
+        Formats the changes between two snapshots as a unified diff
+
+        Arguments:
+          stage (str, int): Name or position of later stage
+          other (str, int, optional): Name or position of earlier stage;
+            if None, the stage immediately preceding *stage* is used,
+            or an empty spec if *stage* is the first
+          kwargs (dict): Additional keyword arguments passed to
+            :func:`yaml_dump`
+
+        Returns:
+          str: Unified diff; empty if snapshots are identical
+        """
+        from difflib import unified_diff
+
+        kwargs["colored"] = False
+        position = self.get_position(stage)
+        if other is None:
+            other = position - 1
+        else:
+            other = self.get_position(other)
+        after = self.dump(position, **kwargs)
+        if other < 0:
+            before = ""
+            fromfile = "empty"
+        elif self.stages[other].spec is self.stages[position].spec:
+            before = after
+            fromfile = self.stages[other].name
+        else:
+            before = self.dump(other, **kwargs)
+            fromfile = self.stages[other].name
+        return "\n".join(unified_diff(before.split("\n"), after.split("\n"),
+          fromfile=fromfile, tofile=self.stages[position].name,
+          lineterm=""))
\ No newline at end of file
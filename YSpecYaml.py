@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#   yspec.YSpecYaml.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+yaml dumper and loader classes
+
+These classes derive from ruamel's, which is slow to import; this
+module is imported only once yaml is first loaded or dumped, so that
+tools that never do so (e.g. to output help) start quickly.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+import ruamel.yaml as yaml
+from collections import OrderedDict
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.representer import RoundTripRepresenter
+from ruamel.yaml.resolver import VersionedResolver
+try:
+    from ruamel.yaml.cyaml import CParser
+except ImportError:
+    CParser = None
+
+
+################################### CLASSES ###################################
+class YSpecDumper(yaml.RoundTripDumper):
+    """
+    Round-trip yaml dumper that writes shared values in full
+
+    Constructed specs may share a single value among several arguments
+    (see :class:`YSpecSharedValues`); each occurrence is written out in
+    full rather than as an alias, unless the value carries an anchor
+    of its own from the source spec.
+    """
+
+    def ignore_aliases(self, data):
+        """
+        Determines whether a value may be written without an alias
+
+        Arguments:
+          data (object): Value
+
+        Returns:
+          bool: False if *data* carries an anchor; True otherwise
+        """
+        anchor = getattr(data, "anchor", None)
+        return anchor is None or anchor.value is None
+
+    def represent(self, data):
+        """
+        Represents and serializes a document
+
+        Arguments:
+          data (object): Document
+        """
+        self.document = data
+        try:
+            super(YSpecDumper, self).represent(data)
+        finally:
+            self.document = None
+
+    def represent_none(self, data):
+        """
+        Represents an empty value
+
+        ruamel writes 'null' for the first value represented within a
+        document, expecting it to be the document itself; since values
+        written in full are not recorded as represented, every empty
+        value would then be written as 'null'. 'null' is written only
+        if the document itself is empty; otherwise an empty scalar is.
+
+        Arguments:
+          data (None): Empty value
+
+        Returns:
+          ScalarNode: Node of empty value
+        """
+        if (getattr(self, "document", None) is None and
+          not self.serializer.use_explicit_start):
+            return self.represent_scalar("tag:yaml.org,2002:null", "null")
+        return self.represent_scalar("tag:yaml.org,2002:null", "")
+
+
+if CParser is not None:
+    class YSpecPlainLoader(CParser, SafeConstructor, VersionedResolver):
+        """
+        Fast yaml loader yielding plain data structures
+
+        Parses using libyaml, without retaining comments; resolves
+        scalars in the same manner (YAML 1.2) as the round-trip loader,
+        so that loaded values match.
+        """
+
+        def __init__(self, stream, version=None, preserve_quotes=None):
+            """
+            Arguments:
+              stream (str, file): yaml input
+              version (tuple, optional): YAML version
+              preserve_quotes (bool): Ignored
+            """
+            CParser.__init__(self, stream)
+            self._parser = self._composer = self
+            SafeConstructor.__init__(self, loader=self)
+            VersionedResolver.__init__(self, version, loader=self)
+else:
+    YSpecPlainLoader = yaml.SafeLoader
+
+
+################################ REPRESENTERS #################################
+YSpecDumper.add_representer(OrderedDict, RoundTripRepresenter.represent_dict)
+YSpecDumper.add_representer(type(None), YSpecDumper.represent_none)
\ No newline at end of file
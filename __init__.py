@@ -23,8 +23,9 @@ from __future__ import (absolute_import, division, print_function,
     unicode_literals)
 
 import re
-import ruamel.yaml as yaml
 import six
+import sys
+from collections import OrderedDict
 
 
 ################################## FUNCTIONS ##################################
@@ -71,56 +72,369 @@ def strfmt(text, width=None, subsequent_indent="  ", **kwargs):
         return (tw.fill(re.sub(r"\s+", " ", text).strip()))
 
 
-def merge_dicts(dict_1, dict_2):
+def format_help_table(entries):
     """
-    Recursively merges two dictionaries
+    Formats a two-level table of names and help text
+
+    Each entry is listed with its help text wrapped alongside it; the
+    children of each entry are listed below it, joined to it by a
+    tree of box-drawing characters. Names too long for their column
+    are given a line of their own.
+
+    Arguments:
+      entries (list): Entries, each a tuple of name, help text (or
+        None), and list of children; each child is a tuple of name and
+        help text (or None)
+
+    Returns:
+      str: Formatted table, ending in a newline
+    """
+    from textwrap import wrap
+
+    table = ""
+    for name, help_text, children in entries:
+        symbol = "│" if len(children) > 0 else " "
+        if help_text is not None:
+            wrapped = wrap(help_text, 54)
+            if len(name) > 20:
+                table += "  {0}\n".format(name)
+                table += "  {0} {1:19}".format(symbol, " ")
+            else:
+                table += "  {0:18s}".format(name)
+            table += "{0}\n".format(wrapped.pop(0))
+            for line in wrapped:
+                table += "   {0} {1:19}{2}\n".format(symbol, " ", line)
+        else:
+            table += "  {0}\n".format(name)
+        for i, (child_name, child_help_text) in enumerate(children, 1):
+            symbol = "└" if i == len(children) else "├"
+            if child_help_text is not None:
+                wrapped = wrap(child_help_text, 51)
+                if len(child_name) > 16:
+                    table += "   {0} {1}\n".format(symbol, child_name)
+                    symbol = "│" if i != len(children) else " "
+                    table += "   {0} {1:15}".format(symbol, " ")
+                else:
+                    table += "   {0} {1:15}".format(symbol, child_name)
+                table += "{0}\n".format(wrapped.pop(0))
+                symbol = "│" if i != len(children) else " "
+                for line in wrapped:
+                    table += "   {0} {1:19}{2}\n".format(symbol, " ", line)
+            else:
+                table += " {0} {1}\n".format(symbol, child_name)
+    return table
+
+
+def is_index(key):
+    """
+    Determines whether a key is an index
+
+    Arguments:
+      key (int, str): Key
+
+    Returns:
+      bool: Whether *key* is an index; i.e. an int or a string of digits
+    """
+    return six.text_type(key).isdigit()
+
+
+def is_index_range(key):
+    """
+    Determines whether a key is a range of indexes
+
+    Arguments:
+      key (int, str): Key
+
+    Returns:
+      bool: Whether *key* is a range of indexes; i.e. a string of the
+      form 'first-last' or 'start:stop[:step]'
+    """
+    return (isinstance(key, six.string_types) and
+      re_index_range.match(key) is not None)
+
+
+def index_range(key):
+    """
+    Expands a range of indexes
+
+    Ranges of the form 'first-last' include both *first* and *last*;
+    ranges of the form 'start:stop[:step]' follow the conventions of
+    Python's slices, and exclude *stop*.
 
     Arguments:
-      dict_1 (dict): First dictionary
-      dict_2 (dict): Second dictionary; values for keys shared by both
-        dictionaries are drawn from dict_2
+      key (str): Range of indexes
 
     Returns:
-      dict: Merged dictionary
+      range: Indexes within range, which are not generated until
+      iterated over
 
     Raises:
-      AttributeError: Either dict_1 or dict_2 lacks 'keys' function
+      ValueError: *key* is not a range of indexes, or its step is zero
     """
+    from six.moves import range
 
-    def merge(dict_1, dict_2):
-        """
-        Generator used to recursively merge two dictionaries
+    match = re_index_range.match(key) if isinstance(key,
+      six.string_types) else None
+    if match is None:
+        raise ValueError("'{0}' is not a range of indexes".format(key))
+    if match.group("last") is not None:
+        return range(int(match.group("first")), int(match.group("last")) + 1)
+    step = match.group("step")
+    return range(int(match.group("start")), int(match.group("stop")),
+      int(step) if step is not None else 1)
 
-        Arguments:
-          dict_1 (dict): First dictionary
-          dict_2 (dict): Second dictionary; values for keys shared by
-            both dictionaries are drawn from dict_2
 
-        Yields:
-          tuple: Merged (key, value) pair
-        """
-        for key in set(dict_1.keys()).union(dict_2.keys()):
-            if key in dict_1 and key in dict_2:
-                if (isinstance(dict_1[key], dict) and isinstance(dict_2[key],
-                  dict)):
-                    yield (key, dict(merge(dict_1[key], dict_2[key])))
+def index_key(key):
+    """
+    Normalizes an index
+
+    Arguments:
+      key (int, str): Index, as either int or string of digits
+
+    Returns:
+      int: Index
+    """
+    return int(key)
+
+
+def sort_indexes(keys):
+    """
+    Sorts the indexes among a collection of keys
+
+    Indexes provided as ints and as strings of digits are sorted
+    together by their integer value
+
+    Arguments:
+      keys (iterable): Keys
+
+    Returns:
+      list: Indexes within *keys*, in their original types, sorted
+    """
+    return sorted([k for k in keys if is_index(k)], key=index_key)
+
+
+def is_immutable(value):
+    """
+    Determines whether a value may be shared without being copied
+
+    Arguments:
+      value (object): Value
+
+    Returns:
+      bool: True if *value* is None, a boolean, a number, a string, or a
+      tuple or frozenset of such values
+    """
+    if value is None or isinstance(value, six.string_types + (bool, float,
+      complex, bytes) + six.integer_types):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all([is_immutable(v) for v in value])
+    return False
+
+
+def copy_attributes(value, copied, memo=None):
+    """
+    Copies the comments and formatting of a ruamel round-trip container
+
+    Formatting, line and column, anchor, and tag, which consist of
+    scalars, are copied shallowly; comments are copied in full.
+
+    Arguments:
+      value (object): Container from which to copy
+      copied (object): Container to which to copy
+      memo (dict, optional): Copies already made, keyed by id of
+        original, as used by :func:`copy.deepcopy`
+    """
+    from copy import copy, deepcopy
+    from ruamel.yaml.comments import Anchor, Comment, Format, LineCol, Tag
+
+    for attrib in (Format.attrib, LineCol.attrib, Anchor.attrib, Tag.attrib):
+        if hasattr(value, attrib):
+            attribute = copy(getattr(value, attrib))
+            if isinstance(getattr(attribute, "data", None), dict):
+                attribute.data = dict([(k, copy(v)) for k, v in
+                    attribute.data.items()])
+            setattr(copied, attrib, attribute)
+    for attrib in (Comment.attrib, "_yaml_merge"):
+        if hasattr(value, attrib):
+            setattr(copied, attrib, deepcopy(getattr(value, attrib), memo))
+
+
+def copy_level(level):
+    """
+    Copies one level of a spec, without copying the values within it
+
+    Arguments:
+      level (dict): Level
+
+    Returns:
+      dict: Copy of *level*, of the same class and retaining its
+      comments, whose values are those of *level* itself
+    """
+    copied = type(level)()
+    for key, value in level.items():
+        copied[key] = value
+    copy_attributes(level, copied)
+    return copied
+
+
+def copy_value(value, memo=None):
+    """
+    Copies a value, such as an argument of a spec, in full
+
+    Equivalent to :func:`copy.deepcopy`, but faster for the dicts and
+    lists of which specs are composed; ruamel's round-trip containers
+    deep-copy their comments and formatting once for each item they
+    contain, while here they are copied once for each container (see
+    :func:`copy_attributes`).
+
+    Arguments:
+      value (object): Value
+      memo (dict, optional): Copies already made, keyed by id of
+        original, as used by :func:`copy.deepcopy`
+
+    Returns:
+      object: Copy of *value*; *value* itself if it is immutable
+    """
+    from copy import deepcopy
+    from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+    if is_immutable(value):
+        return value
+    if memo is None:
+        memo = {}
+    elif id(value) in memo:
+        return memo[id(value)]
+    if type(value) in (dict, OrderedDict, CommentedMap):
+        copied = memo[id(value)] = type(value)()
+        for key, item in value.items():
+            copied[key] = copy_value(item, memo)
+    elif type(value) in (list, CommentedSeq):
+        copied = memo[id(value)] = type(value)()
+        for item in value:
+            copied.append(copy_value(item, memo))
+    else:
+        return deepcopy(value, memo)
+    copy_attributes(value, copied, memo)
+    return copied
+
+
+def is_same(value_1, value_2):
+    """
+    Determines whether two values are identical in content and type
+
+    Unlike ``==``, distinguishes between values of different types that
+    compare equal (e.g. ``1`` and ``True``), which yield different
+    yaml; the order of keys within dicts is not considered.
+
+    Arguments:
+      value_1 (object): First value
+      value_2 (object): Second value
+
+    Returns:
+      bool: True if values are identical
+    """
+    if value_1 is value_2:
+        return True
+    if isinstance(value_1, dict) and isinstance(value_2, dict):
+        return (len(value_1) == len(value_2) and
+          all([k in value_2 and is_same(v, value_2[k]) for k, v in
+              value_1.items()]))
+    if isinstance(value_1, list) and isinstance(value_2, list):
+        return (len(value_1) == len(value_2) and
+          all([is_same(v_1, v_2) for v_1, v_2 in zip(value_1, value_2)]))
+    return type(value_1) is type(value_2) and value_1 == value_2
+
+
+def merge_dicts(*dicts):
+    """
+    Recursively merges dictionaries
+
+    All dictionaries are merged in a single pass, iteratively rather
+    than recursively. Keys retain the order in which they first appear.
+    For keys present in several dictionaries, values are drawn from the
+    last; where that value and those before it are all dictionaries,
+    they are merged in turn. Each merged level takes the type of the
+    first dictionary merged into it (e.g. CommentedMap), without its
+    comments. Values drawn from a single dictionary, including levels,
+    are shared rather than copied, and must not be modified in place.
+
+    Arguments:
+      dicts (dict): Dictionaries to merge, in increasing order of
+        precedence
+
+    Returns:
+      dict: Merged dictionary; a new dictionary unless only one is
+      provided
+
+    Raises:
+      TypeError: An argument is not a dictionary
+    """
+    for value in dicts:
+        if not isinstance(value, dict):
+            raise TypeError(strfmt("""Function yspec.merge_dicts() requires
+              arguments to be dictionaries; argument of type '{0}'
+              provided""".format(value.__class__.__name__)))
+    if len(dicts) == 0:
+        return {}
+    if len(dicts) == 1:
+        return dicts[0]
+
+    merged = type(dicts[0])()
+    stack = [(merged, dicts)]
+    while len(stack) > 0:
+        destination, sources = stack.pop()
+
+        # Two dictionaries, as merged most often, may be merged directly
+        if len(sources) == 2:
+            source_1, source_2 = sources
+            for key, value in source_1.items():
+                if key not in source_2:
+                    destination[key] = value
+                    continue
+                value_2 = source_2[key]
+                if isinstance(value, dict) and isinstance(value_2, dict):
+                    destination[key] = type(value)()
+                    stack.append((destination[key], (value, value_2)))
                 else:
-                    yield (key, dict_2[key])
-            elif key in dict_1:
-                yield (key, dict_1[key])
-            else:
-                yield (key, dict_2[key])
+                    destination[key] = value_2
+            for key, value in source_2.items():
+                if key not in source_1:
+                    destination[key] = value
+            continue
+
+        # Gather the values of each key, in order of first appearance
+        keys = []
+        values = {}
+        for source in sources:
+            for key, value in source.items():
+                key_values = values.get(key)
+                if key_values is None:
+                    keys.append(key)
+                    values[key] = [value]
+                else:
+                    key_values.append(value)
 
-    if not isinstance(dict_1, dict) or not isinstance(dict_2, dict):
-        raise Exception(strfmt("""Function yspec.merge_dicts() requires
-          arguments 'dict_1' and 'dict_2' to be dictionaries; arguments
-          of types '{0}' and '{1}' provided""".format(
-          dict_1.__class__.__name__, dict_2.__class__.__name__)))
+        # Merge the trailing dictionaries among the values of each key
+        for key in keys:
+            key_values = values[key]
+            if len(key_values) == 1:
+                destination[key] = key_values[0]
+                continue
+            first = len(key_values) - 1
+            while first > 0 and isinstance(key_values[first], dict) and \
+              isinstance(key_values[first - 1], dict):
+                first -= 1
+            if first == len(key_values) - 1:
+                destination[key] = key_values[-1]
+            else:
+                destination[key] = type(key_values[first])()
+                stack.append((destination[key], key_values[first:]))
 
-    return dict(merge(dict_1, dict_2))
+    return merged
 
 
-def yaml_load(input_):
+def yaml_load(input_, cache=None, plain=False):
     """
     Generates data structure from yaml input. 
 
@@ -129,6 +443,11 @@ def yaml_load(input_):
         a path to a yaml file. If it is, the file is loaded using yaml;
         if it is not a file, the string itself is loaded using yaml. If
         dict, returned without modification
+      cache (str, YSpecSourceCache, optional): Persistent cache, or
+        path to cache directory, from which yaml files are loaded if
+        previously parsed
+      plain (bool): Load yaml into plain data structures, without
+        comments, using the libyaml-based loader if available
 
     Returns:
       dict: Data structure specified by *input_*
@@ -149,11 +468,21 @@ def yaml_load(input_):
         open_yaml = open
 
     if isinstance(input_, six.string_types):
+        if isfile(input_) and cache is not None:
+            if isinstance(cache, six.string_types):
+                from .YSpecSourceCache import YSpecSourceCache
+
+                cache = YSpecSourceCache(cache)
+            return cache.load(input_, plain=plain)
+        import ruamel.yaml as yaml
+        from .YSpecYaml import YSpecPlainLoader
+
+        loader = YSpecPlainLoader if plain else yaml.RoundTripLoader
         if isfile(input_):
             with open_yaml(input_, "r") as infile:
-                return yaml.load(infile, Loader=yaml.RoundTripLoader)
+                return yaml.load(infile, Loader=loader)
         else:
-            output = yaml.load(input_, Loader=yaml.RoundTripLoader)
+            output = yaml.load(input_, Loader=loader)
             if isinstance(output, six.string_types):
                 warn("""yspec.yaml_load() has loaded input '{0}' as a string
                   rather than a dictionary or other data structure; if input
@@ -173,39 +502,228 @@ def yaml_load(input_):
           dict.""".format(input.__class__.__name__))
 
 
-def yaml_dump(spec, colored=True, **kwargs):
+def yaml_dump(spec, colored=True, provenance=None, stream=None, **kwargs):
     """
+    Formats a spec as yaml
+
+    Arguments:
+      spec (dict): Spec to format
+      colored (bool): Color each line according to the plugin named in
+        its annotation
+      provenance (YSpecProvenance, optional): Table of argument origins
+        to render into annotations before formatting
+      stream (file, optional): File-like object to which lines are
+        written as they are formatted, rather than being returned; the
+        spec is formatted in chunks (see :func:`yaml_dump_lines`)
+      kwargs (dict): Additional keyword arguments passed to
+        :func:`ruamel.yaml.dump`
+
+    Returns:
+      str: Formatted spec, or None if *stream* is provided
     """
-    dump_kw = dict(Dumper=yaml.RoundTripDumper, block_seq_indent=2, indent=4)
+    import ruamel.yaml as yaml
+    from .YSpecYaml import YSpecDumper
+
+    if stream is not None:
+        for line in yaml_dump_lines(spec, colored=colored,
+          provenance=provenance, **kwargs):
+            stream.write(line + "\n")
+        return None
+
+    if provenance is not None:
+        spec = provenance.annotate(spec)
+    dump_kw = dict(Dumper=YSpecDumper, block_seq_indent=2, indent=4)
     dump_kw.update(kwargs)
-    output = yaml.dump(spec, **dump_kw).strip()
+
+    lines = []
+    writer = YSpecLineWriter(lines.append, colored=colored)
+    yaml.dump(spec, writer, **dump_kw)
+    writer.close()
     if colored:
-        import re
-        from termcolor import colored
-
-        colored_output = ""
-        available_colors = ["red", "green", "yellow", "blue", "magenta",
-            "cyan"]
-        selected_colors = {}
-        for line in output.split("\n"):
-            re_comment = re.compile(
-              "^(?P<line>.*)#[\s]*?(?P<plugin>[^\s:]+):?(?P<subplugin>["
-              "^\s]+)?$")
-            match = re.match(re_comment, line)
-            if match:
-                plugin = match.groupdict()["plugin"]
-                subplugin = match.groupdict()["subplugin"]
-                if plugin not in selected_colors:
-                    selected_colors[plugin] = available_colors.pop(0)
-                if subplugin is not None:
-                    pass
-                color = selected_colors[plugin]
-                colored_output += colored(line, color) + "\n"
-            else:
-                colored_output += colored(line, "white") + "\n"
-        return colored_output
+        return "".join([line + "\n" for line in lines])
     else:
-        return output
+        return "\n".join(lines).strip()
+
+
+def yaml_dump_lines(spec, colored=True, provenance=None, chunk_size=1000,
+  **kwargs):
+    """
+    Formats a spec as yaml, yielding one line at a time
+
+    The spec is formatted in chunks (see :func:`yaml_dump_chunks`), so
+    that only the lines of one chunk are held in memory at once.
+
+    Arguments:
+      spec (dict): Spec to format
+      colored (bool): Color each line according to the plugin named in
+        its annotation
+      provenance (YSpecProvenance, optional): Table of argument origins
+        to render into annotations before formatting
+      chunk_size (int): Approximate number of keys and values formatted
+        at once
+      kwargs (dict): Additional keyword arguments passed to
+        :func:`ruamel.yaml.dump`
+
+    Yields:
+      str: Line of formatted spec, without newline
+    """
+    import ruamel.yaml as yaml
+    from .YSpecYaml import YSpecDumper
+
+    if provenance is not None:
+        spec = provenance.annotate(spec)
+    dump_kw = dict(Dumper=YSpecDumper, block_seq_indent=2, indent=4)
+    dump_kw.update(kwargs)
+
+    lines = []
+    writer = YSpecLineWriter(lines.append, colored=colored)
+    for chunk, skip in yaml_dump_chunks(spec, chunk_size):
+        yaml.dump(chunk, writer, **dump_kw)
+        for line in lines[skip:]:
+            yield line
+        del lines[:]
+    writer.close()
+    for line in lines:
+        yield line
+
+
+def yaml_dump_chunks(spec, chunk_size=1000):
+    """
+    Divides a spec into chunks that may be formatted separately
+
+    Consecutive keys of a level are grouped into chunks of about
+    *chunk_size* keys and values, including those within nested levels.
+    A nested level larger than this, such as an indexed level with
+    many indexes, is itself divided, at any depth. Each chunk is a
+    document holding its keys within the levels leading to them; the
+    lines of these levels that were already formatted as part of an
+    earlier chunk are to be skipped, so that the chunks' lines join to
+    form the same output as the whole spec. Levels formatted in flow
+    style, or carrying an anchor, are not divided. A spec containing
+    anchors is not divided at all, since its aliases must be formatted
+    within the same document as their anchors.
+
+    Arguments:
+      spec (dict): Spec to divide
+      chunk_size (int): Approximate number of keys and values within
+        each chunk
+
+    Yields:
+      tuple: Chunk, and number of its initial lines to skip
+    """
+    from ruamel.yaml.comments import CommentedMap
+
+    sizes = {}
+    anchored = []
+
+    def get_size(value):
+        """Counts value and the keys and values within it"""
+        anchor = getattr(value, "anchor", None)
+        if anchor is not None and anchor.value is not None:
+            anchored.append(value)
+        if isinstance(value, dict):
+            values = value.values()
+        elif isinstance(value, list):
+            values = value
+        else:
+            return 1
+        if id(value) not in sizes:
+            sizes[id(value)] = 1 + sum([get_size(v) for v in values])
+        return sizes[id(value)]
+
+    def is_divisible(level):
+        """Determines whether a level may be divided among chunks"""
+        if not isinstance(level, dict) or len(level) == 0:
+            return False
+        if hasattr(level, "fa") and level.fa.flow_style():
+            return False
+        anchor = getattr(level, "anchor", None)
+        return anchor is None or anchor.value is None
+
+    def get_runs(level, path):
+        """Yields path to level, level, and keys of each chunk"""
+        keys = []
+        size = 0
+        for key, value in level.items():
+            value_size = get_size(value)
+            if (value_size > chunk_size and is_divisible(value) and
+              isinstance(key, six.string_types + six.integer_types)):
+                if len(keys) > 0:
+                    yield path, level, keys
+                    keys, size = [], 0
+                for run in get_runs(value, path + [(level, key)]):
+                    yield run
+            else:
+                keys.append(key)
+                size += value_size
+                if size >= chunk_size:
+                    yield path, level, keys
+                    keys, size = [], 0
+        if len(keys) > 0 or (len(path) == 0 and len(level) == 0):
+            yield path, level, keys
+
+    def get_chunk(level, keys, first):
+        """Copies keys of level, and comments if first chunk of level"""
+        if hasattr(level, "ca"):
+            chunk = CommentedMap([(k, level[k]) for k in keys])
+            for key in [k for k in keys if k in level.ca.items]:
+                chunk.ca.items[key] = level.ca.items[key]
+            if first:
+                chunk.ca.comment = level.ca.comment
+        else:
+            chunk = OrderedDict([(k, level[k]) for k in keys])
+        return chunk
+
+    if not isinstance(spec, dict) or get_size(spec) <= chunk_size:
+        yield spec, 0
+        return
+    if len(anchored) > 0:
+        yield spec, 0
+        return
+
+    started = set()
+    for path, level, keys in get_runs(spec, []):
+        levels = [parent for parent, key in path] + [level]
+        skip = 0
+        while skip < len(path) and id(levels[skip + 1]) in started:
+            skip += 1
+        chunk = get_chunk(level, keys, id(level) not in started)
+        for parent, key in reversed(path):
+            wrapper = get_chunk(parent, [key], id(parent) not in started)
+            wrapper[key] = chunk
+            chunk = wrapper
+        started.update([id(l) for l in levels])
+        yield chunk, skip
+
+
+def __getattr__(name):
+    """
+    Imports yaml dumper and loader classes on first access
+
+    These classes derive from ruamel's, which is slow to import; they
+    are defined in :mod:`YSpecYaml`, and are available here only on
+    demand (Python 3.7 and later) so that importing yspec is fast.
+
+    Arguments:
+      name (str): Name of attribute
+
+    Returns:
+      type: Dumper or loader class
+
+    Raises:
+      AttributeError: *name* is not a dumper or loader class
+    """
+    if name in ("YSpecDumper", "YSpecPlainLoader"):
+        from . import YSpecYaml
+
+        return getattr(YSpecYaml, name)
+    raise AttributeError("module '{0}' has no attribute '{1}'".format(
+      __name__, name))
+
+
+################################## PATTERNS ###################################
+re_index_range = re.compile(r"^(?:(?P<first>\d+)-(?P<last>\d+)|"
+  r"(?P<start>\d+):(?P<stop>\d+)(?::(?P<step>\d+))?)$")
 
 
 ################################### CLASSES ###################################
@@ -321,6 +839,7 @@ class YSpecCLTool(object):
         """
         import argparse
         from . import strfmt
+        from .YSpecHelpFormatter import YSpecHelpFormatter
 
         if name is None:
             if hasattr(cls, "name"):
@@ -342,8 +861,7 @@ class YSpecCLTool(object):
         elif parser is None:
             if grouped_help:
                 parser = argparse.ArgumentParser(description=description,
-                  formatter_class=argparse.RawDescriptionHelpFormatter,
-                  add_help=False)
+                  formatter_class=YSpecHelpFormatter, add_help=False)
                 parser.add_argument("-h", "--help", "--full-help",
                   action="help", help="""show this help message and exit;
                     detailed help
@@ -353,6 +871,211 @@ class YSpecCLTool(object):
                     str(map(str, cls.help_groups)).replace("'", "")))
             else:
                 parser = argparse.ArgumentParser(description=description,
-                  formatter_class=argparse.RawDescriptionHelpFormatter)
+                  formatter_class=YSpecHelpFormatter)
+
+        return parser
+
+
+class YSpecConfigCache(object):
+    """
+    Cache of yaml configuration parsed from constructor class attributes
+
+    Constructor classes store their configuration as yaml strings in
+    class attributes (e.g. ``indexed_levels`` and ``plugin_config``).
+    Each string is parsed once per owning class and is reused by every
+    subsequent plugin and construction until explicitly invalidated.
+    Parsed configuration is shared, and must not be modified in place.
+    Values derived from a class's configuration (such as its presets,
+    after inheritance and extension) may be cached alongside it.
+
+    Attributes:
+      entries (dict): Parsed configuration, keyed by (owning class,
+        source string)
+      derived (dict): Values derived from configuration, keyed by
+        (owning class, name)
+      hits (int): Number of loads served from the cache
+      misses (int): Number of loads that required parsing
+    """
+
+    def __init__(self):
+        """
+        Initializes empty cache
+        """
+        self.entries = {}
+        self.derived = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, owner, source):
+        """
+        Loads yaml configuration, parsing only if not already cached
+
+        Arguments:
+          owner (type, object): Class (or instance of class) to which
+            configuration belongs
+          source (str, dict): yaml configuration, in any form accepted
+            by :func:`yaml_load`
+
+        Returns:
+          object: Parsed configuration
+        """
+        if not isinstance(owner, type):
+            owner = type(owner)
+        if not isinstance(source, six.string_types):
+            return yaml_load(source)
+
+        key = (owner, source)
+        if key in self.entries:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.entries[key] = yaml_load(source)
+        return self.entries[key]
+
+    def derive(self, owner, name, function):
+        """
+        Computes a value derived from configuration, only if not
+        already cached
+
+        Arguments:
+          owner (type, object): Class (or instance of class) to which
+            derived value belongs
+          name (object): Hashable name of derived value
+          function (callable): Function computing derived value
+
+        Returns:
+          object: Derived value
+        """
+        if not isinstance(owner, type):
+            owner = type(owner)
+
+        key = (owner, name)
+        if key in self.derived:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.derived[key] = function()
+        return self.derived[key]
+
+    def invalidate(self, owner=None):
+        """
+        Removes cached configuration
+
+        Arguments:
+          owner (type, object, optional): Class (or instance of class)
+            whose configuration will be removed; if None, all cached
+            configuration is removed
+        """
+        if owner is None:
+            self.entries.clear()
+            self.derived.clear()
+            return
+        if not isinstance(owner, type):
+            owner = type(owner)
+        for key in [k for k in self.entries if k[0] is owner]:
+            del self.entries[key]
+        # Values derived by subclasses may draw on owner's configuration
+        for key in [k for k in self.derived if issubclass(k[0], owner)]:
+            del self.derived[key]
+
+
+class YSpecLineWriter(object):
+    """
+    File-like object that splits yaml output into lines
+
+    Text written by the yaml dumper is divided into lines, each of
+    which is optionally colored according to the plugin named in its
+    annotation and passed on as soon as it is complete. Each plugin
+    is assigned the next of a cycle of colors.
+
+    Attributes:
+      output (callable): Function to which each line is passed,
+        without newline
+      colored (bool): Color each line
+      selected_colors (dict): Color assigned to each plugin
+      partial (list): Text of incomplete line
+    """
+    available_colors = ("red", "green", "yellow", "blue", "magenta", "cyan")
+    re_comment = re.compile(
+      r"^(?P<line>.*)#[\s]*?(?P<plugin>[^\s:]+):?(?P<subplugin>[^\s]+)?$")
+
+    def __init__(self, output, colored=True):
+        """
+        Arguments:
+          output (callable): Function to which each line is passed,
+            without newline
+          colored (bool): Color each line
+        """
+        self.output = output
+        self.colored = colored
+        self.selected_colors = {}
+        self.partial = []
+        if colored:
+            from termcolor import colored as colorize
+
+            self.colorize = colorize
+
+    def write(self, text):
+        """
+        Writes text, passing on each line that is completed
+
+        Arguments:
+          text (str): Text
+        """
+        if "\n" not in text:
+            self.partial.append(text)
+            return
+        lines = text.split("\n")
+        self.partial.append(lines[0])
+        self.output(self.format("".join(self.partial)))
+        for line in lines[1:-1]:
+            self.output(self.format(line))
+        self.partial = [lines[-1]] if lines[-1] else []
+
+    def flush(self):
+        """
+        Does nothing; lines are passed on only once complete
+        """
+        pass
+
+    def close(self):
+        """
+        Passes on final line, if incomplete
+        """
+        if len(self.partial) > 0:
+            self.output(self.format("".join(self.partial)))
+            self.partial = []
+
+    def format(self, line):
+        """
+        Colors a line according to the plugin named in its annotation
+
+        Arguments:
+          line (str): Line
+
+        Returns:
+          str: Line, colored if this writer is colored
+        """
+        if not self.colored:
+            return line
+
+        match = self.re_comment.match(line)
+        if match is None:
+            return self.colorize(line, "white")
+        plugin = match.group("plugin")
+        color = self.selected_colors.get(plugin)
+        if color is None:
+            color = self.available_colors[
+              len(self.selected_colors) % len(self.available_colors)]
+            self.selected_colors[plugin] = color
+        return self.colorize(line, color)
+
+
+################################### CACHES ####################################
+config_cache = YSpecConfigCache()
+
 
-        return parser
\ No newline at end of file
+################################ COMPATIBILITY ################################
+# Module-level __getattr__ is not supported prior to Python 3.7
+if sys.version_info < (3, 7):
+    from .YSpecYaml import YSpecDumper, YSpecPlainLoader
\ No newline at end of file
@@ -0,0 +1,485 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   yspec.benchmark.YSpecBenchmark.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Benchmarks spec construction using synthetic constructors and specs
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+if __name__ == "__main__":
+    __package__ = str("yspec.benchmark")
+    import yspec.benchmark
+from collections import OrderedDict
+from .. import YSpecCLTool
+
+
+################################### CLASSES ###################################
+class YSpecBenchmark(YSpecCLTool):
+    """
+    Benchmarks spec construction using synthetic constructors and specs
+
+    Each case generates a synthetic constructor and source spec (see
+    :mod:`YSpecSynthetic`), and times loading the source spec,
+    compiling the constructor's plan, running each plugin, and dumping
+    the constructed spec; the fastest of several repeats of each stage
+    is recorded. Results may be saved as a JSON baseline, and compared
+    to an earlier baseline to identify regressions.
+
+    Attributes:
+      cases (OrderedDict): Parameters of each standard case
+      results_version (int): Version of format of saved results
+    """
+    cases = OrderedDict([
+      ("small", dict(indexes=10, subindexes=2, depth=2, presets=2,
+          extends=1, leaf_size=1)),
+      ("wide", dict(indexes=1000, subindexes=2, depth=2, presets=4,
+          extends=1, leaf_size=1)),
+      ("deep", dict(indexes=20, subindexes=3, depth=4, presets=4,
+          extends=1, leaf_size=1)),
+      ("presets", dict(indexes=100, subindexes=2, depth=2, presets=50,
+          extends=5, leaf_size=1)),
+      ("leaves", dict(indexes=100, subindexes=2, depth=2, presets=4,
+          extends=1, leaf_size=1000)),
+    ])
+    results_version = 1
+
+    @classmethod
+    def construct_argparser(cls, **kwargs):
+        """
+        Adds arguments to a nascent argument parser
+
+        Arguments:
+          kwargs (dict): Additional keyword arguments
+
+        Returns:
+          ArgumentParser: Argument parser or subparser
+        """
+        parser = cls.get_argparser(**kwargs)
+
+        cls.add_argument(parser, "-cases", type=str, nargs="+",
+          metavar="CASE", choices=list(cls.cases),
+          help="standard cases to run; available cases: {0} (default: "
+            "all)".format(", ".join(cls.cases)))
+        cls.add_argument(parser, "-repeat", type=int, default=3,
+          help="number of repeats of each case, of which the fastest is "
+            "recorded (default: %(default)s)")
+        cls.add_argument(parser, "-save", type=str, metavar="JSON",
+          help="file to which to save results")
+        cls.add_argument(parser, "-compare", type=str, metavar="JSON",
+          help="file of earlier results to which to compare results")
+        cls.add_argument(parser, "-threshold", type=float, default=1.25,
+          help="ratio of time to earlier time above which a stage is "
+            "reported as a regression (default: %(default)s)")
+        cls.add_argument(parser, "-startup", action="store_true",
+          help="""also time startup of short-lived processes that import
+            yspec, or output a constructor's help""")
+        cls.add_argument(parser, "-memory", action="store_true",
+          help="""also measure memory occupied by each index of constructed
+            spec, with indexes stored as compact nodes and as full levels""")
+        cls.add_argument(parser, "-fused", action="store_true",
+          help="apply default plugins in a single pass over spec")
+        cls.add_argument(parser, "-plain", action="store_true",
+          help="construct spec as plain data structures without annotation")
+
+        custom = parser.add_argument_group("custom case",
+          "if any of these arguments are provided, a single case with "
+          "these parameters is run, rather than the standard cases")
+        for param, default in [("indexes", 100), ("subindexes", 2),
+          ("depth", 2), ("presets", 4), ("extends", 1), ("leaf_size", 1)]:
+            cls.add_argument(custom, "-{0}".format(param.replace("_", "-")),
+              dest=param, type=int,
+              help="{0} (default: {1})".format(param.replace("_", " "),
+                default))
+
+        parser.set_defaults(cls=cls)
+        return parser
+
+    @classmethod
+    def run_case(cls, indexes=100, subindexes=2, depth=2, presets=4,
+      extends=1, leaf_size=1, repeat=3, **kwargs):
+        """
+        Times the stages of constructing one synthetic spec
+
+        Arguments:
+          indexes (int): Number of indexes within top indexed level
+          subindexes (int): Number of indexes within each lower
+            indexed level
+          depth (int): Number of nested indexed levels
+          presets (int): Number of base presets
+          extends (int): Length of chain of presets extending each
+            base preset
+          leaf_size (int): Number of items in each leaf value
+          repeat (int): Number of repeats, of which the fastest is
+            recorded
+          kwargs (dict): Additional keyword arguments passed to
+            constructor
+
+        Returns:
+          OrderedDict: Time in seconds of each stage
+        """
+        from os import close, remove
+        from tempfile import mkstemp
+        from timeit import default_timer
+        from .. import config_cache, yaml_load
+        from ..YSpecPlan import YSpecPlan
+        from .YSpecSynthetic import generate_constructor, generate_source_spec
+
+        constructor = generate_constructor(depth=depth, presets=presets,
+          extends=extends, leaf_size=leaf_size)
+        timings = OrderedDict()
+        constructor = cls.time_plugins(constructor, timings)
+        descriptor, infile = mkstemp(suffix=".yml")
+        close(descriptor)
+        with open(infile, "w") as outfile:
+            outfile.write(generate_source_spec(indexes=indexes,
+              subindexes=subindexes, depth=depth, presets=presets,
+              extends=extends, leaf_size=leaf_size))
+
+        kwargs = dict(kwargs, verbose=0)
+        best = OrderedDict()
+        try:
+            for i in range(repeat):
+                for stage in timings:
+                    timings[stage] = 0.0
+
+                start = default_timer()
+                source_spec = yaml_load(infile, plain=kwargs.get("plain",
+                  False))
+                timings["yaml_load"] = default_timer() - start
+
+                config_cache.invalidate(constructor)
+                start = default_timer()
+                plan = YSpecPlan.compile(constructor, recompile=True)
+                timings["compile"] = default_timer() - start
+
+                start = default_timer()
+                spec = constructor(source_spec=source_spec, plan=plan,
+                  **kwargs)
+                timings["construct"] = default_timer() - start
+
+                start = default_timer()
+                spec.dump(colored=False)
+                timings["yaml_dump"] = default_timer() - start
+
+                for stage, elapsed in timings.items():
+                    best[stage] = min(best.get(stage, elapsed), elapsed)
+        finally:
+            remove(infile)
+        return best
+
+    @classmethod
+    def run_memory(cls, indexes=100, subindexes=2, depth=2, presets=4,
+      extends=1, leaf_size=1, **kwargs):
+        """
+        Measures memory occupied by constructed spec, per index
+
+        The spec is constructed twice: with the indexes of indexed
+        levels stored as compact nodes, and as full levels.
+
+        Arguments:
+          indexes (int): Number of indexes within top indexed level
+          subindexes (int): Number of indexes within each lower
+            indexed level
+          depth (int): Number of nested indexed levels
+          presets (int): Number of base presets
+          extends (int): Length of chain of presets extending each
+            base preset
+          leaf_size (int): Number of items in each leaf value
+          kwargs (dict): Additional keyword arguments passed to
+            constructor
+
+        Returns:
+          OrderedDict: Bytes allocated in constructing spec, divided by
+          number of indexes within top indexed level, for each
+          representation; empty if memory cannot be traced
+        """
+        import gc
+        try:
+            import tracemalloc
+        except ImportError:
+            return OrderedDict()
+        from .. import yaml_load
+        from .YSpecSynthetic import generate_constructor, generate_source_spec
+
+        constructor = generate_constructor(depth=depth, presets=presets,
+          extends=extends, leaf_size=leaf_size)
+        source_spec = yaml_load(generate_source_spec(indexes=indexes,
+          subindexes=subindexes, depth=depth, presets=presets,
+          extends=extends, leaf_size=leaf_size),
+          plain=kwargs.get("plain", False))
+        plan = constructor.compile()
+
+        kwargs = dict(kwargs, verbose=0)
+        usage = OrderedDict()
+        for name, compact in [("compact", True), ("full", False)]:
+            gc.collect()
+            tracemalloc.start()
+            try:
+                spec = constructor(source_spec=source_spec, plan=plan,
+                  compact=compact, **kwargs)
+                usage[name] = tracemalloc.get_traced_memory()[0] / max(
+                  indexes, 1)
+            finally:
+                tracemalloc.stop()
+            del spec
+        return usage
+
+    @classmethod
+    def run_startup(cls, repeat=3):
+        """
+        Times startup of short-lived processes
+
+        Each stage is timed as a separate Python process: starting the
+        interpreter alone, importing yspec, importing the constructor,
+        and outputting the constructor's help.
+
+        Arguments:
+          repeat (int): Number of repeats, of which the fastest is
+            recorded
+
+        Returns:
+          OrderedDict: Time in seconds of each stage
+        """
+        import os
+        import subprocess
+        import sys
+        from timeit import default_timer
+        import yspec
+
+        # Make this copy of yspec importable by each process
+        env = dict(os.environ)
+        path = os.path.dirname(os.path.dirname(os.path.abspath(
+          yspec.__file__)))
+        env["PYTHONPATH"] = os.pathsep.join([path] + [p for p in
+          env.get("PYTHONPATH", "").split(os.pathsep) if p])
+
+        stages = OrderedDict([
+          ("interpreter", ["-c", "pass"]),
+          ("import_yspec", ["-c", "import yspec"]),
+          ("import_constructor", ["-c", "import yspec.YSpecConstructor"]),
+          ("help", ["-W", "ignore", "-m", "yspec.YSpecConstructor", "-h"])])
+        best = OrderedDict()
+        with open(os.devnull, "w") as devnull:
+            for stage, args in stages.items():
+                for i in range(repeat):
+                    start = default_timer()
+                    subprocess.check_call([sys.executable] + args, env=env,
+                      stdout=devnull)
+                    elapsed = default_timer() - start
+                    best[stage] = min(best.get(stage, elapsed), elapsed)
+        return best
+
+    @staticmethod
+    def time_plugins(constructor, timings):
+        """
+        Prepares a constructor whose plugins record their run times
+
+        Arguments:
+          constructor (type): Constructor class
+          timings (dict): Dict to which the run time of each plugin is
+            added, keyed by plugin name
+
+        Returns:
+          type: Subclass of *constructor* with timed plugins
+        """
+        from timeit import default_timer
+
+        def time_plugin(name, plugin):
+            def __call__(self, spec, source_spec=None, **kwargs):
+                start = default_timer()
+                spec = plugin.__call__(self, spec, source_spec, **kwargs)
+                timings[name] = timings.get(name, 0.0) + (default_timer() -
+                  start)
+                return spec
+
+            return type(str(plugin.__name__), (plugin,),
+              dict(__call__=__call__))
+
+        available_plugins = OrderedDict([(name, time_plugin(name, plugin))
+          for name, plugin in constructor.available_plugins.items()])
+        return type(str(constructor.__name__), (constructor,),
+          dict(available_plugins=available_plugins))
+
+    @classmethod
+    def compare(cls, results, baseline, threshold=1.25, min_delta=0.001):
+        """
+        Compares results to an earlier baseline
+
+        Arguments:
+          results (dict): Results
+          baseline (dict): Earlier results
+          threshold (float): Ratio of time to earlier time above which a
+            stage is considered a regression
+          min_delta (float): Difference in seconds below which a stage
+            is not considered a regression, regardless of ratio
+
+        Returns:
+          list: (case, stage, earlier time, time, ratio) of each stage
+          considered a regression
+        """
+        regressions = []
+        for case, result in results["cases"].items():
+            earlier = baseline.get("cases", {}).get(case)
+            if earlier is None:
+                continue
+            if earlier.get("params") != result.get("params"):
+                continue
+            for stage, elapsed in result["timings"].items():
+                earlier_elapsed = earlier["timings"].get(stage)
+                if earlier_elapsed is None or earlier_elapsed <= 0:
+                    continue
+                ratio = elapsed / earlier_elapsed
+                if ratio > threshold and elapsed - earlier_elapsed > min_delta:
+                    regressions.append((case, stage, earlier_elapsed,
+                      elapsed, ratio))
+        return regressions
+
+    @classmethod
+    def format_results(cls, results, baseline=None):
+        """
+        Formats results as a table
+
+        Arguments:
+          results (dict): Results
+          baseline (dict, optional): Earlier results, to which each time
+            is compared
+
+        Returns:
+          str: Table of results
+        """
+        lines = []
+        for case, result in results["cases"].items():
+            earlier = None
+            if baseline is not None:
+                earlier = baseline.get("cases", {}).get(case)
+                if (earlier is not None and
+                  earlier.get("params") != result.get("params")):
+                    earlier = None
+            lines.append("{0}:{1}".format(case, "".join(
+              [" {0}={1},".format(k, v) for k, v in
+                  result["params"].items()]).rstrip(",")))
+            for stage, elapsed in result["timings"].items():
+                line = "  {0:18s} {1:10.4f} s".format(stage, elapsed)
+                if earlier is not None and stage in earlier["timings"]:
+                    earlier_elapsed = earlier["timings"][stage]
+                    line += "  (was {0:10.4f} s".format(earlier_elapsed)
+                    if earlier_elapsed > 0:
+                        line += ", x{0:.2f}".format(elapsed / earlier_elapsed)
+                    line += ")"
+                lines.append(line)
+            for name, usage in result.get("memory", {}).items():
+                line = "  {0:18s} {1:10.0f} B".format("index ({0})".format(
+                  name), usage)
+                if earlier is not None and name in earlier.get("memory", {}):
+                    line += "  (was {0:10.0f} B)".format(
+                      earlier["memory"][name])
+                lines.append(line)
+        return "\n".join(lines)
+
+    @classmethod
+    def run(cls, cases=None, repeat=3, startup=False, memory=False,
+      **kwargs):
+        """
+        Runs benchmark cases
+
+        Arguments:
+          cases (list, optional): Names of standard cases to run; if
+            None, all standard cases are run
+          repeat (int): Number of repeats of each case
+          startup (bool): Also time startup of short-lived processes
+          memory (bool): Also measure memory occupied by each index
+          kwargs (dict): Additional keyword arguments; parameters of a
+            custom case (indexes, subindexes, depth, presets, extends,
+            leaf_size), and keyword arguments passed to constructor
+
+        Returns:
+          dict: Results, including versions, options, and the
+          parameters and timings of each case
+        """
+        import sys
+        import ruamel.yaml
+
+        params = ["indexes", "subindexes", "depth", "presets", "extends",
+          "leaf_size"]
+        custom = dict([(k, kwargs.pop(k)) for k in params if k in kwargs])
+        custom = dict([(k, v) for k, v in custom.items() if v is not None])
+        if len(custom) > 0:
+            case_params = OrderedDict([("custom", custom)])
+        elif cases is None:
+            case_params = cls.cases
+        else:
+            case_params = OrderedDict([(k, cls.cases[k]) for k in cases])
+        options = dict([(k, kwargs.get(k, False)) for k in ["fused",
+          "plain"]])
+
+        results = OrderedDict([
+          ("version", cls.results_version),
+          ("python", "{0}.{1}.{2}".format(*sys.version_info[:3])),
+          ("ruamel", ruamel.yaml.__version__),
+          ("options", options),
+          ("cases", OrderedDict())])
+        for case, params in case_params.items():
+            timings = cls.run_case(repeat=repeat, **dict(params, **options))
+            results["cases"][case] = OrderedDict([
+              ("params", params), ("timings", timings)])
+            if memory:
+                results["cases"][case]["memory"] = cls.run_memory(
+                  **dict(params, **options))
+        if startup:
+            results["cases"]["startup"] = OrderedDict([("params", {}),
+              ("timings", cls.run_startup(repeat=max(repeat, 5)))])
+        return results
+
+    @classmethod
+    def main(cls):
+        """
+        Runs benchmark cases from the command line
+
+        Returns:
+          int: Exit status; 1 if any regression is found
+        """
+        import json
+
+        parser = cls.construct_argparser()
+        kwargs = vars(parser.parse_args())
+        kwargs.pop("cls")
+        save = kwargs.pop("save")
+        compare = kwargs.pop("compare")
+        threshold = kwargs.pop("threshold")
+
+        results = cls.run(**kwargs)
+        baseline = None
+        if compare is not None:
+            with open(compare, "r") as infile:
+                baseline = json.load(infile)
+            if baseline.get("options") != results["options"]:
+                print("Warning: options differ from those of baseline")
+        print(cls.format_results(results, baseline))
+        if save is not None:
+            with open(save, "w") as outfile:
+                json.dump(results, outfile, indent=2)
+
+        if baseline is not None:
+            regressions = cls.compare(results, baseline, threshold)
+            if len(regressions) > 0:
+                print("\nRegressions:")
+                for case, stage, earlier, elapsed, ratio in regressions:
+                    print("  {0} {1}: {2:.4f} s -> {3:.4f} s (x{4:.2f})".format(
+                      case, stage, earlier, elapsed, ratio))
+                return 1
+        return 0
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(YSpecBenchmark.main())
\ No newline at end of file
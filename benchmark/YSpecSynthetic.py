@@ -0,0 +1,206 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   yspec.benchmark.YSpecSynthetic.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Generates synthetic spec constructors and source specs
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+if __name__ == "__main__":
+    __package__ = str("yspec.benchmark")
+    import yspec.benchmark
+from collections import OrderedDict
+
+
+################################## FUNCTIONS ##################################
+def format_yaml(data):
+    """
+    Formats a data structure as a yaml string
+
+    Arguments:
+      data (dict): Data structure
+
+    Returns:
+      str: yaml string
+    """
+    import ruamel.yaml as yaml
+
+    return yaml.dump(to_commented(data), Dumper=yaml.RoundTripDumper,
+      default_flow_style=False)
+
+
+def to_commented(data):
+    """
+    Converts nested ordered dicts to CommentedMaps, preserving order
+
+    Arguments:
+      data (object): Data structure
+
+    Returns:
+      object: Data structure, with dicts replaced by CommentedMaps
+    """
+    from ruamel.yaml.comments import CommentedMap
+
+    if isinstance(data, dict):
+        return CommentedMap([(k, to_commented(v)) for k, v in data.items()])
+    return data
+
+
+def generate_leaf(leaf_size, seed=0):
+    """
+    Generates a leaf value
+
+    Arguments:
+      leaf_size (int): Number of items in leaf value; if 1, a single
+        int is generated rather than a list
+      seed (int): Offset of generated values
+
+    Returns:
+      int, list: Leaf value
+    """
+    if leaf_size <= 1:
+        return seed
+    return list(range(seed, seed + leaf_size))
+
+
+def generate_constructor(depth=2, presets=4, extends=1, leaf_size=1,
+  defaults=3, name=None):
+    """
+    Generates a synthetic spec constructor class
+
+    The constructor's indexed levels are nested *depth* deep, named
+    'level_1', 'level_2', etc. Each level, including the top level,
+    includes *defaults* default arguments and a nested group of
+    default parameters. Each of *presets* presets sets arguments at
+    every level, and is the base of a chain of *extends* presets, each
+    extending the last.
+
+    Arguments:
+      depth (int): Number of nested indexed levels
+      presets (int): Number of base presets
+      extends (int): Length of chain of presets extending each base
+        preset
+      leaf_size (int): Number of items in each leaf value
+      defaults (int): Number of default arguments at each level
+      name (str, optional): Name of class
+
+    Returns:
+      type: Constructor class
+    """
+    from ..YSpecConstructor import YSpecConstructor
+
+    # Indexed levels
+    indexed_levels = None
+    for level in range(depth, 0, -1):
+        indexed_levels = OrderedDict([("level_{0}".format(level),
+          indexed_levels)])
+
+    # Default arguments
+    default_levels = None
+    for level in range(depth, -1, -1):
+        default_level = OrderedDict()
+        for i in range(defaults):
+            default_level["default_{0}_{1}".format(level, i)] = \
+                generate_leaf(leaf_size, i)
+        default_level["params_{0}".format(level)] = OrderedDict(
+          [("a", generate_leaf(leaf_size)), ("b", generate_leaf(leaf_size))])
+        if default_levels is not None:
+            default_level["level_{0}".format(level + 1)] = default_levels
+        default_levels = default_level
+
+    # Presets and chains of extensions
+    available_presets = OrderedDict()
+    for preset in range(presets):
+        preset_name = "preset_{0}".format(preset)
+        preset_levels = None
+        for level in range(depth, -1, -1):
+            preset_level = OrderedDict()
+            preset_level["preset_{0}_{1}".format(preset, level)] = \
+                generate_leaf(leaf_size, preset)
+            preset_level["params_{0}".format(level)] = OrderedDict(
+              [("b", generate_leaf(leaf_size, preset))])
+            if preset_levels is not None:
+                preset_level["level_{0}".format(level + 1)] = preset_levels
+            preset_levels = preset_level
+        available_presets[preset_name] = OrderedDict(
+          [("_help", "Synthetic preset {0}".format(preset))])
+        available_presets[preset_name].update(preset_levels)
+        parent_name = preset_name
+        for extension in range(1, extends + 1):
+            extension_name = "{0}_{1}".format(preset_name, extension)
+            available_presets[extension_name] = OrderedDict(
+              [("_extends", parent_name),
+                  ("_help", "Extension {0} of synthetic preset {1}".format(
+                    extension, preset)),
+                  ("extension_{0}".format(extension),
+                    generate_leaf(leaf_size, extension))])
+            parent_name = extension_name
+
+    if name is None:
+        name = "YSpecSynthetic_{0}_{1}_{2}_{3}".format(depth, presets,
+          extends, leaf_size)
+    return type(str(name), (YSpecConstructor,), dict(
+      __doc__="Synthetic spec constructor",
+      indexed_levels=format_yaml(indexed_levels),
+      plugin_config=dict(defaults=format_yaml(dict(defaults=default_levels)),
+        presets=format_yaml(dict(available_presets=available_presets)))))
+
+
+def generate_source_spec(indexes=100, subindexes=2, depth=2, presets=4,
+  extends=1, leaf_size=1):
+    """
+    Generates a synthetic source spec, as a yaml string
+
+    The top indexed level includes *indexes* indexes, and each level
+    below it *subindexes* indexes; each index sets manual arguments.
+    Each top-level index selects the last extension of one of the
+    presets, while arguments are applied to all top-level indexes.
+
+    Arguments:
+      indexes (int): Number of indexes within top indexed level
+      subindexes (int): Number of indexes within each lower indexed
+        level
+      depth (int): Number of nested indexed levels
+      presets (int): Number of base presets
+      extends (int): Length of chain of presets extending each base
+        preset
+      leaf_size (int): Number of items in each leaf value
+
+    Returns:
+      str: Source spec, in yaml
+    """
+
+    def generate_level(level, index):
+        source_level = OrderedDict()
+        source_level["manual_{0}".format(level)] = generate_leaf(leaf_size,
+          index)
+        if level == 1 and presets > 0:
+            preset_name = "preset_{0}".format(index % presets)
+            if extends > 0:
+                preset_name += "_{0}".format(extends)
+            source_level["presets"] = [preset_name]
+        if level < depth:
+            source_level["level_{0}".format(level + 1)] = OrderedDict(
+              [(i, generate_level(level + 1, i)) for i in
+                  range(subindexes)])
+        return source_level
+
+    source_spec = OrderedDict()
+    source_spec["manual_0"] = generate_leaf(leaf_size)
+    if presets > 0:
+        source_spec["presets"] = ["preset_0"]
+    if depth > 0:
+        level_1 = OrderedDict()
+        level_1["all"] = OrderedDict([("all_1", generate_leaf(leaf_size))])
+        for i in range(indexes):
+            level_1[i] = generate_level(1, i)
+        source_spec["level_1"] = level_1
+    return format_yaml(source_spec)
\ No newline at end of file
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+#   yspec.benchmark.__init__.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Benchmarks spec construction using synthetic constructors and specs
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
\ No newline at end of file
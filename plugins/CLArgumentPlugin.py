@@ -35,6 +35,7 @@ class CLArgumentPlugin(YSpecPlugin):
     def __init__(self, **kwargs):
         """
         """
+        super(CLArgumentPlugin, self).__init__(**kwargs)
         exclude = self.get_config("exclude", **kwargs)
         if exclude is None:
             self.exclude = []
@@ -55,5 +56,6 @@ class CLArgumentPlugin(YSpecPlugin):
         for cl_key, cl_val in kwargs.items():
             if cl_key not in self.exclude:
                 if cl_val is not None:
-                    self.set(spec, cl_key, cl_val, comment=self.name)
+                    self.set(spec, cl_key, cl_val, comment=self.name,
+                      path=[])
         return spec
\ No newline at end of file
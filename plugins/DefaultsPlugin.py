@@ -31,6 +31,8 @@ class DefaultsPlugin(YSpecPlugin):
       indexed_levels (dict): Levels of spec hierarchy that include an
         additional layer of indexes below them
       defaults (dict): Default arguments
+      compiled_defaults (YSpecDefaultsLevel): Default arguments
+        flattened by the constructor's compiled plan, if available
     """
     name = "defaults"
     description = """adds default arguments to nascent spec"""
@@ -38,9 +40,15 @@ class DefaultsPlugin(YSpecPlugin):
     def __init__(self, **kwargs):
         """
         """
+        super(DefaultsPlugin, self).__init__(**kwargs)
         self.indexed_levels = self.get_config("indexed_levels",
           attr_of_constructor=True, **kwargs)
         self.defaults = self.get_config("defaults", **kwargs)
+        plan = kwargs.get("plan")
+        if plan is not None and kwargs.get("defaults") is None:
+            self.compiled_defaults = plan.defaults
+        else:
+            self.compiled_defaults = None
 
     def __call__(self, spec, source_spec=None, **kwargs):
         """
@@ -55,11 +63,57 @@ class DefaultsPlugin(YSpecPlugin):
           CommentedMap: Updated spec including default arguments
         """
         if source_spec is not None:
-            self.process_level(spec, source_spec, self.indexed_levels,
-              self.defaults)
+            if self.compiled_defaults is not None:
+                self.apply_level(spec, self.compiled_defaults)
+            else:
+                self.process_level(spec, source_spec, self.indexed_levels,
+                  self.defaults)
         return spec
 
-    def process_level(self, spec, source_spec, indexed_levels, defaults):
+    def apply_level(self, spec, defaults_level, path=None, recurse=True):
+        """
+        Adds compiled default arguments to one level of spec hierarchy
+
+        Arguments:
+          spec (CommentedMap): Nascent spec at current level
+          defaults_level (YSpecDefaultsLevel): Flattened defaults within
+            current level
+          path (list): List of keys leading to current level
+          recurse (bool): Add default arguments to indexed levels below
+            current level
+        """
+        if self.profile is not None:
+            self.profile.count_visited()
+
+        if path is None:
+            path = []
+
+        # Apply default arguments at this level
+        for step_path, default_val, is_level in defaults_level.steps:
+            destination = spec
+            for key in step_path[:-1]:
+                destination = destination[key]
+            destination_path = path + list(step_path[:-1])
+            if is_level:
+                if step_path[-1] not in destination:
+                    self.initialize(destination, step_path[-1],
+                      path=destination_path)
+            else:
+                self.set(destination, step_path[-1], default_val,
+                  path=destination_path)
+
+        # Loop over indexed levels below this level, and their indexes
+        if not recurse:
+            return
+        for default_key, sublevel in defaults_level.sublevels:
+            if default_key not in spec:
+                continue
+            for index in self.get_indexes(spec[default_key]):
+                self.apply_level(spec[default_key][index], sublevel,
+                  path=path + [default_key, index])
+
+    def process_level(self, spec, source_spec, indexed_levels, defaults,
+      path=None, recurse=True):
         """
         Adds default arguments to one level of spec hierarchy
 
@@ -68,7 +122,12 @@ class DefaultsPlugin(YSpecPlugin):
           source_spec (dict): Source spec at current level
           indexed_levels (dict): Indexed levels within current level
           defaults (dict): Defaults within current level
+          path (list): List of keys leading to current level
+          recurse (bool): Add default arguments to indexed levels within
+            current level
         """
+        if self.profile is not None:
+            self.profile.count_visited()
 
         # Process arguments
         if defaults is None:
@@ -77,29 +136,31 @@ class DefaultsPlugin(YSpecPlugin):
             indexed_levels = {}
         if source_spec is None:
             source_spec = {}
+        if path is None:
+            path = []
 
         # Loop over default argument keys and values at this level
         for default_key, default_val in defaults.items():
 
             # This level is indexed; loop over indexes as well
             if default_key in indexed_levels:
-                if default_key not in spec:
+                if not recurse or default_key not in spec:
                     continue
-                indexes = sorted(
-                  [k for k in spec[default_key] if str(k).isdigit()])
-                for index in indexes:
+                for index in self.get_indexes(spec[default_key]):
                     self.process_level(spec[default_key][index],
-                      source_spec.get(default_key, {}).get(index, {}),
-                      indexed_levels.get(default_key, {}), default_val)
+                      self.get_index(source_spec.get(default_key, {}), index,
+                        {}), indexed_levels.get(default_key, {}), default_val,
+                      path=path + [default_key, index])
             # This level is not indexed
             else:
                 # default_val is a dict; recurse
                 if isinstance(default_val, dict):
                     if default_key not in spec:
-                        self.initialize(spec, default_key)
+                        self.initialize(spec, default_key, path=path)
                     self.process_level(spec[default_key],
                       source_spec.get(default_key, {}),
-                      indexed_levels.get(default_key, {}), default_val)
+                      indexed_levels.get(default_key, {}), default_val,
+                      path=path + [default_key])
                 # default_val is singular; store and continue loop
                 else:
-                    self.set(spec, default_key, default_val)
\ No newline at end of file
+                    self.set(spec, default_key, default_val, path=path)
\ No newline at end of file
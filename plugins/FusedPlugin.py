@@ -0,0 +1,289 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   yspec.plugins.FusedPlugin.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Constructs a nascent spec in a single pass
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+if __name__ == "__main__":
+    __package__ = str("yspec.plugins")
+    import yspec.plugins
+from . import YSpecPlugin
+from .. import index_key
+
+
+################################### CLASSES ###################################
+class FusedPlugin(YSpecPlugin):
+    """
+    Constructs a nascent spec in a single pass
+
+    Applies the initialize, defaults, presets, manual, and sort plugins,
+    in that order, within a single depth-first traversal of the spec
+    hierarchy. At each level, each plugin adds the arguments that are
+    local to that level, after which the level is sorted and each
+    index of the indexed levels below it is visited in turn. The
+    resulting spec, including annotations, is identical to that
+    yielded by applying each plugin in sequence.
+
+    Attributes
+      name (str): Name of this plugin
+      description (str): Description of this plugin
+      indexed_levels (dict): Levels of spec hierarchy that include an
+        additional layer of indexes below them
+      fused_plugins (list): Names of plugins applied by this plugin,
+        in order
+      initialize_plugin (InitializePlugin): Plugin used to initialize
+        levels
+      defaults_plugin (DefaultsPlugin): Plugin used to add default
+        arguments
+      presets_plugin (PresetsPlugin): Plugin used to add preset
+        arguments
+      manual_plugin (ManualPlugin): Plugin used to add manually-set
+        arguments
+      sort_plugin (SortPlugin): Plugin used to sort levels
+    """
+    name = "fused"
+    description = """applies initialize, defaults, presets, manual, and sort
+      plugins in a single pass over nascent spec"""
+    fused_plugins = ["initialize", "defaults", "presets", "manual", "sort"]
+
+    def __init__(self, **kwargs):
+        """
+        """
+        from .InitializePlugin import InitializePlugin
+        from .DefaultsPlugin import DefaultsPlugin
+        from .PresetsPlugin import PresetsPlugin
+        from .ManualPlugin import ManualPlugin
+        from .SortPlugin import SortPlugin
+
+        super(FusedPlugin, self).__init__(**kwargs)
+        self.indexed_levels = self.get_config("indexed_levels",
+          attr_of_constructor=True, **kwargs)
+        if self.indexed_levels is None:
+            self.indexed_levels = {}
+
+        # Use constructor's plugins, which may extend the default plugins
+        available_plugins = dict(initialize=InitializePlugin,
+          defaults=DefaultsPlugin, presets=PresetsPlugin, manual=ManualPlugin,
+          sort=SortPlugin)
+        constructor = kwargs.get("constructor")
+        if constructor is not None and hasattr(constructor,
+          "available_plugins"):
+            for name in self.fused_plugins:
+                if name in constructor.available_plugins:
+                    available_plugins[name] = constructor.available_plugins[
+                        name]
+        self.initialize_plugin = available_plugins["initialize"](**kwargs)
+        self.defaults_plugin = available_plugins["defaults"](**kwargs)
+        self.presets_plugin = available_plugins["presets"](**kwargs)
+        self.manual_plugin = available_plugins["manual"](**kwargs)
+        self.sort_plugin = available_plugins["sort"](**kwargs)
+
+    def __call__(self, spec, source_spec=None, **kwargs):
+        """
+        Constructs a nascent spec in a single pass
+
+        Arguments:
+          spec (CommentedMap): Nascent spec (typically empty at this time)
+          source_spec (dict): Source spec
+          kwargs (dict): Additional keyword arguments
+
+        Returns:
+          CommentedMap: Constructed and sorted spec
+        """
+        if source_spec is None:
+            source_layers = []
+            defaults = None
+        else:
+            source_layers = [source_spec]
+            defaults = self.defaults_plugin.compiled_defaults
+            if defaults is None:
+                defaults = self.defaults_plugin.defaults
+        presets = (self.presets_plugin.available_presets,
+          kwargs.get("selected_presets", []), source_spec, None, ())
+
+        self.shared_layers = set()
+        self.process_level(spec, self.indexed_levels, source_layers, defaults,
+          presets, source_layers)
+        return spec
+
+    def process_level(self, spec, indexed_levels, init_layers, defaults,
+      presets, manual_layers, path=None):
+        """
+        Constructs and sorts one level of spec hierarchy
+
+        Arguments:
+          spec (CommentedMap): Nascent spec at current level, which is
+            sorted in place
+          indexed_levels (dict): Indexed levels within current level
+          init_layers (list): Source specs at current level from which
+            indexed levels are initialized, in order
+          defaults (dict, YSpecDefaultsLevel): Default arguments within
+            current level, or None if the defaults plugin does not reach
+            this level
+          presets (tuple): Available presets, presets selected above
+            current level, source spec, path, and tuple of non-index
+            keys leading to current level; or None if the presets plugin
+            does not reach this level
+          manual_layers (list): Source specs at current level from which
+            manually-set arguments are copied, in order
+          path (list): List of keys leading to this level
+        """
+        if self.profile is not None:
+            self.profile.count_visited()
+
+        if indexed_levels is None:
+            indexed_levels = {}
+        if path is None:
+            path = []
+
+        # Initialize indexed levels, tracking the sources of each index
+        init_children = self.initialize_level(spec, indexed_levels,
+          init_layers, path)
+
+        # Add default arguments local to this level
+        if defaults is not None:
+            if hasattr(defaults, "sublevels"):
+                self.defaults_plugin.apply_level(spec, defaults, path=path,
+                  recurse=False)
+            else:
+                self.defaults_plugin.process_level(spec, None, indexed_levels,
+                  defaults, path=path, recurse=False)
+
+        # Add preset arguments local to this level
+        if presets is not None:
+            (available_presets, selected_presets, source_spec, presets_path,
+            level_path) = presets
+            selected_presets = self.presets_plugin.process_level(spec,
+              source_spec, indexed_levels, available_presets,
+              selected_presets, path=presets_path, level_path=level_path,
+              recurse=False)
+            if available_presets is None:
+                presets = None
+            elif source_spec is None:
+                source_spec = {}
+
+        # Add manually-set arguments local to this level
+        manual_layers = [l for l in manual_layers if l is not None]
+        for manual_layer in manual_layers:
+            self.manual_plugin.process_level(spec, manual_layer,
+              indexed_levels, path=path, recurse=False,
+              share=id(manual_layer) in self.shared_layers)
+
+        # Sort this level, descending into indexes of indexed levels
+        self.sort_plugin.sort_level(spec, indexed_levels)
+        for key, val in spec.items():
+            if not isinstance(val, dict):
+                continue
+            if key not in indexed_levels:
+                if self.sort_plugin.is_shared(val):
+                    spec[key] = self.sort_plugin.share_level(val,
+                      indexed_levels)
+                else:
+                    self.sort_plugin.process_level(val, indexed_levels)
+                continue
+
+            # Determine which plugins reach the indexes of this level
+            sub_levels = indexed_levels.get(key)
+            if sub_levels is None:
+                sub_levels = {}
+            sub_defaults = None
+            if defaults is not None:
+                if hasattr(defaults, "sublevels"):
+                    sub_defaults = dict(defaults.sublevels).get(key)
+                else:
+                    sub_defaults = defaults.get(key)
+            sub_presets = None
+            if presets is not None and any(
+              [key in available_presets[p] for p in selected_presets if
+                  p in available_presets]):
+                sub_presets = self.presets_plugin.get_level_presets(
+                  available_presets, key, level_path)
+
+            self.sort_plugin.sort_level(val, sub_levels)
+            for index, index_val in val.items():
+                if not isinstance(index_val, dict):
+                    continue
+                if sub_presets is None:
+                    index_presets = None
+                else:
+                    index_presets = (sub_presets, selected_presets,
+                      self.get_index(source_spec.get(key) or {}, index, {}),
+                      path + [key, index], level_path + (key,))
+                # Arguments from "all" are copied before index-specific
+                index_manual = []
+                for manual_layer in manual_layers:
+                    if manual_layer.get(key) is None:
+                        continue
+                    if "all" in manual_layer[key]:
+                        index_manual.append(manual_layer[key]["all"])
+                        self.shared_layers.add(id(manual_layer[key]["all"]))
+                    # Then from ranges of indexes merged with
+                    # index-specific
+                    index_layer, shared = self.get_index_value(
+                      manual_layer[key], index)
+                    index_manual.append(index_layer)
+                    if shared:
+                        self.shared_layers.add(id(index_layer))
+                self.process_level(index_val, sub_levels,
+                  init_children.get(key, {}).get(index, []),
+                  sub_defaults, index_presets, index_manual,
+                  path=path + [key, index])
+
+    def initialize_level(self, spec, indexed_levels, init_layers, path=None):
+        """
+        Initializes the indexed levels within one level of spec hierarchy
+
+        Arguments:
+          spec (CommentedMap): Nascent spec at current level
+          indexed_levels (dict): Indexed levels within current level
+          init_layers (list): Source specs at current level from which
+            indexed levels are initialized, in order
+          path (list): List of keys leading to current level
+
+        Returns:
+          dict: Source specs from which each index is initialized, in
+          order; outer keys are indexed levels and inner keys are
+          indexes
+        """
+        if path is None:
+            path = []
+
+        init_children = {}
+        for init_layer in [l for l in init_layers if l is not None]:
+            for level in [k for k in indexed_levels if k in init_layer]:
+                if init_layer.get(level) is None:
+                    continue
+                level_children = init_children.setdefault(level, {})
+                if level not in spec:
+                    self.initialize_plugin.initialize(spec, level,
+                      indexed=True, path=path)
+                indexes = self.get_indexes(init_layer[level])
+                # Apply "all" to all indexes
+                if "all" in init_layer[level]:
+                    all_indexes = sorted(set([index_key(k) for k in
+                        indexes]).union(self.get_indexes(spec[level])))
+                    for index in all_indexes:
+                        if index not in spec[level]:
+                            self.initialize_plugin.initialize(spec[level],
+                              index, path=path + [level])
+                        level_children.setdefault(index, []).append(
+                          init_layer[level]["all"])
+                # Loop over specific indexes
+                for source_index in indexes:
+                    index = index_key(source_index)
+                    if index not in spec[level]:
+                        self.initialize_plugin.initialize(spec[level], index,
+                          path=path + [level])
+                    level_children.setdefault(index, []).append(
+                      self.get_index(init_layer[level], source_index, {}))
+        return init_children
\ No newline at end of file
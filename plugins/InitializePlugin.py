@@ -18,6 +18,7 @@ if __name__ == "__main__":
     __package__ = str("yspec.plugins")
     import yspec.plugins
 from . import YSpecPlugin
+from .. import index_key
 
 
 ################################### CLASSES ###################################
@@ -38,6 +39,7 @@ class InitializePlugin(YSpecPlugin):
     def __init__(self, **kwargs):
         """
         """
+        super(InitializePlugin, self).__init__(**kwargs)
         self.indexed_levels = self.get_config("indexed_levels",
           attr_of_constructor=True, **kwargs)
 
@@ -67,6 +69,8 @@ class InitializePlugin(YSpecPlugin):
           indexed_levels (dict): Indexed levels below current level
           path (list): List of keys leading to this level
         """
+        if self.profile is not None:
+            self.profile.count_visited()
 
         # Process arguments
         if indexed_levels is None or source_spec is None:
@@ -79,24 +83,25 @@ class InitializePlugin(YSpecPlugin):
             if source_spec.get(level) is None:
                 continue
             if level not in spec:
-                self.initialize(spec, level)
-            indexes = sorted(
-              [k for k in source_spec[level] if str(k).isdigit()])
+                self.initialize(spec, level, indexed=True, path=path)
+            indexes = self.get_indexes(source_spec[level])
             # Apply "all" to all indexes
             if "all" in source_spec.get(level, {}):
-                all_indexes = sorted(list(
-                  set(indexes + [k for k in spec[level] if str(k).isdigit()])))
+                all_indexes = sorted(set([index_key(k) for k in
+                    indexes]).union(self.get_indexes(spec[level])))
                 for index in all_indexes:
                     if index not in spec[level]:
-                        self.initialize(spec[level], index)
+                        self.initialize(spec[level], index,
+                          path=path + [level])
                     self.process_level(spec[level][index],
                       source_spec[level]["all"], indexed_levels.get(level, {}),
                       path=path + [level, index])
             # Loop over specific indexes
-            for index in indexes:
+            for source_index in indexes:
                 # Add dict in which to store lower levels
+                index = index_key(source_index)
                 if index not in spec[level]:
-                    self.initialize(spec[level], index)
+                    self.initialize(spec[level], index, path=path + [level])
                 self.process_level(spec[level][index],
-                  source_spec[level].get(index, {}),
+                  self.get_index(source_spec[level], source_index, {}),
                   indexed_levels.get(level, {}), path=path + [level, index])
\ No newline at end of file
@@ -30,6 +30,11 @@ class ManualPlugin(YSpecPlugin):
       description (str): Description of this plugin
       indexed_levels (dict): Levels of spec hierarchy that include an
         additional layer of indexes below them
+      templates (dict): Levels built from the arguments applied to
+        'all' indexes or to ranges of indexes, each shared by every
+        index to which it is applied, the paths within each, and the
+        source from which each was built; keyed by id of source, and
+        discarded once the spec has been processed
     """
     name = "manual"
     description = """copies arguments to nascent spec from source spec"""
@@ -37,8 +42,10 @@ class ManualPlugin(YSpecPlugin):
     def __init__(self, **kwargs):
         """
         """
+        super(ManualPlugin, self).__init__(**kwargs)
         self.indexed_levels = self.get_config("indexed_levels",
           attr_of_constructor=True, **kwargs)
+        self.templates = {}
 
     def __call__(self, spec, source_spec=None, **kwargs):
         """
@@ -53,10 +60,14 @@ class ManualPlugin(YSpecPlugin):
           CommentedMap: Updated spec including maually-set arguments
         """
         if source_spec is not None:
-            self.process_level(spec, source_spec, self.indexed_levels)
+            try:
+                self.process_level(spec, source_spec, self.indexed_levels)
+            finally:
+                self.templates = {}
         return spec
 
-    def process_level(self, spec, source_spec, indexed_levels, path=None):
+    def process_level(self, spec, source_spec, indexed_levels, path=None,
+      recurse=True, share=False):
         """
         Adds manually-set arguments to one level of spec hierarchy
 
@@ -65,7 +76,15 @@ class ManualPlugin(YSpecPlugin):
           source_spec (dict): Source spec at current level
           indexed_levels (dict): Indexed levels within current level
           path (list): List of keys leading to this level
+          recurse (bool): Add manually-set arguments to indexed levels
+            within current level
+          share (bool): *source_spec* holds the arguments applied to
+            'all' indexes, or to a range of indexes; levels within it
+            that are not already present are shared among indexes
+            rather than built for each (see :meth:`share_template`)
         """
+        if self.profile is not None:
+            self.profile.count_visited()
 
         # Process arguments
         if source_spec is None:
@@ -80,34 +99,108 @@ class ManualPlugin(YSpecPlugin):
 
             # This level is indexed; loop over indexes as well
             if source_key in indexed_levels:
+                if not recurse:
+                    continue
                 if source_spec.get(source_key) is None:
                     # Not clear if this is the appropriate behavior here or not
                     continue
+                # Indexes are modified in place; copy any that are shared
+                self.own(spec, source_key)
+                indexes = self.get_indexes(spec[source_key])
+                for index in indexes:
+                    self.own(spec[source_key], index)
                 # Apply arguments from "all" first
                 if "all" in source_spec.get(source_key, {}):
-                    for index in sorted(
-                      [k for k in spec[source_key] if str(k).isdigit()]):
+                    for index in indexes:
                         self.process_level(spec[source_key][index],
                           source_spec[source_key]["all"],
                           indexed_levels.get(source_key, {}),
-                          path=path + [source_key, index])
-                # Apply index-specific arguments second
-                for index in sorted(
-                  [k for k in spec[source_key] if str(k).isdigit()]):
-                    self.process_level(spec[source_key][index],
-                      source_spec.get(source_key, {}).get(index, {}),
+                          path=path + [source_key, index], share=True)
+                # Apply arguments from ranges of indexes, merged with
+                # index-specific arguments, second
+                for index in indexes:
+                    index_val, share_index = self.get_index_value(
+                      source_spec[source_key], index)
+                    self.process_level(spec[source_key][index], index_val,
                       indexed_levels.get(source_key, {}),
-                      path=path + [source_key, index])
+                      path=path + [source_key, index], share=share_index)
             # This level is not indexed
             else:
                 # source_val is a dict; recurse
                 if isinstance(source_val, dict):
                     if source_key not in spec or spec[source_key] is None:
-                        self.initialize(spec, source_key)
+                        if share and self.shared_values is not None:
+                            self.share_template(spec, source_key, source_val,
+                              path=path)
+                            continue
+                        self.initialize(spec, source_key, path=path)
+                    else:
+                        self.own(spec, source_key)
                     self.process_level(spec[source_key],
                       source_spec.get(source_key, {}),
                       indexed_levels.get(source_key, {}),
                       path=path + [source_key])
                 # source_val is singular; store and continue loop
                 else:
-                    self.set(spec, source_key, source_val)
\ No newline at end of file
+                    self.set(spec, source_key, source_val, path=path)
+
+    def share_template(self, spec, key, source_val, path=None):
+        """
+        Adds a level shared among indexes to a nascent spec
+
+        Arguments applied to 'all' indexes, or to a range of indexes,
+        are identical for each index; rather than building a copy of
+        each level within them for every index, each is built once, as
+        a template, and stored within each index as a shared value.
+        Like any shared value, a template must be copied through
+        :meth:`own` before being modified in place (e.g. by arguments
+        specific to one index), and is shared only within a single
+        construction: templates are discarded once the spec has been
+        processed, and the constructor gives each place at which one
+        remains its own copy (see :meth:`YSpecSharedValues.release`).
+
+        Arguments:
+          spec (CommentedMap): Nascent spec at current level
+          key (str): Key of level
+          source_val (dict): Source spec of level
+          path (list, optional): List of keys leading to *spec*;
+            required to record origin of level in provenance table
+        """
+        template = self.templates.get(id(source_val))
+        if template is None:
+            holder = self.create_level()
+            relpaths = []
+            self.build_template(holder, key, source_val, relpaths)
+            template = self.templates[id(source_val)] = (holder[key],
+              relpaths, source_val)
+        level, relpaths, source_val = template
+
+        spec[key] = self.shared_values.share(level)
+        if self.annotate and self.provenance is not None and path is not None:
+            prefix = tuple(path) + (key,)
+            for relpath in relpaths:
+                self.provenance.record(prefix + relpath, self.name)
+
+    def build_template(self, destination, key, source_val, relpaths,
+      relpath=()):
+        """
+        Builds a level to be shared among indexes
+
+        Arguments:
+          destination (CommentedMap): Level within which to build level
+          key (str): Key of level
+          source_val (dict): Source spec of level
+          relpaths (list): List to which paths of level and of the
+            arguments and levels within it, relative to level, are
+            added
+          relpath (tuple): Path of level relative to template
+        """
+        self.initialize(destination, key)
+        relpaths.append(relpath)
+        for source_key, source_sub_val in source_val.items():
+            if isinstance(source_sub_val, dict):
+                self.build_template(destination[key], source_key,
+                  source_sub_val, relpaths, relpath + (source_key,))
+            else:
+                self.set(destination[key], source_key, source_sub_val)
+                relpaths.append(relpath + (source_key,))
\ No newline at end of file
@@ -33,6 +33,9 @@ class PresetsPlugin(YSpecPlugin):
       available_presets (dict): Available presets; outermost keys are
         the preset names, while the values are the arguments associated
         with each preset
+      preset_levels (dict): Available presets projected onto each level
+        of spec hierarchy, drawn from the constructor's compiled plan if
+        available
     """
     name = "presets"
     description = """adds selected 'preset' arguments to nascent spec"""
@@ -50,8 +53,7 @@ class PresetsPlugin(YSpecPlugin):
         Returns:
           ArgumentParser: Argument parser
         """
-        from collections import OrderedDict
-        from textwrap import wrap
+        from ..YSpecHelpFormatter import YSpecHelpFormatter
 
         # Arguments unique to this plugin
         arg_group = parser.add_argument_group(
@@ -60,73 +62,130 @@ class PresetsPlugin(YSpecPlugin):
           type=str, nargs="+", metavar="PRESET",
           help="selected presets to apply to entire spec")
 
-        # Format preset help text and extension pattern
-        available_presets = cls.initialize_available_presets(**kwargs)
-        if len(available_presets) == 0:
-            description = "no presets available\n"
+        # Format preset help text only if help is output
+        if isinstance(parser.formatter_class, type) and issubclass(
+          parser.formatter_class, YSpecHelpFormatter):
+            arg_group.description = lambda: cls.get_presets_help(**kwargs)
         else:
-            description = "available presets:\n"
-            base_presets = OrderedDict(sorted(
-              [(k, v) for k, v in available_presets.items() if
-                  "_extends" not in v]))
-            for preset_name, preset in base_presets.items():
-                extensions = sorted(
-                  [(k, v) for k, v in available_presets.items() if
-                      v.get("_extends") == preset_name])
-                symbol = "│" if len(extensions) > 0 else " "
-                if "_help" in preset:
-                    wrapped = wrap(preset["_help"], 54)
-                    if len(preset_name) > 20:
-                        description += "  {0}\n".format(preset_name)
-                        description += "  {0} {1:19}".format(symbol, " ")
-                    else:
-                        description += "  {0:18s}".format(preset_name)
-                    description += "{0}\n".format(wrapped.pop(0))
-                    for line in wrapped:
-                        description += "   {0} {1:19}{2}\n".format(symbol, " ",
-                          line)
-                else:
-                    description += "  {0}\n".format(preset_name)
-                for i, (extension_name, extension) in enumerate(extensions, 1):
-                    symbol = "└" if i == len(extensions) else "├"
-                    if "_help" in extension:
-                        wrapped = wrap(extension["_help"], 51)
-                        if len(extension_name) > 16:
-                            description += "   {0} {1}\n".format(symbol,
-                              extension_name)
-                            symbol = "│" if i != len(extensions) else " "
-                            description += "   {0} {1:15}".format(symbol, " ")
-                        else:
-                            description += "   {0} {1:15}".format(symbol,
-                              extension_name)
-                        description += "{0}\n".format(wrapped.pop(0))
-                        symbol = "│" if i != len(extensions) else " "
-                        for line in wrapped:
-                            description += "   {0} {1:19}{2}\n".format(symbol,
-                              " ", line)
-                    else:
-                        description += " {0} {1}\n".format(symbol,
-                          extension_name)
-        arg_group.description = description
+            arg_group.description = cls.get_presets_help(**kwargs)
 
         # Arguments inherited from superclass
         super(PresetsPlugin, cls).add_arguments(parser=parser, **kwargs)
 
         return parser
 
+    @classmethod
+    def get_presets_help(cls, **kwargs):
+        """
+        Formats table of available presets and their extensions
+
+        The table is formatted once per constructor class and cached
+        alongside its resolved presets.
+
+        Arguments:
+          constructor (YSpecConstructor): Constructor for which parser
+            is being built
+          available_presets (dict, optional): Presets to list in place
+            of the constructor's; not cached
+
+        Returns:
+          str: Table of available presets
+        """
+        from .. import config_cache
+
+        constructor = kwargs.get("constructor", None)
+        if kwargs.get("available_presets") is not None or constructor is None:
+            return cls.format_presets_help(
+              cls.initialize_available_presets(**kwargs))
+        return config_cache.derive(constructor, (cls, "presets_help"),
+          lambda: cls.format_presets_help(cls.initialize_available_presets(
+            constructor=constructor)))
+
+    @staticmethod
+    def format_presets_help(available_presets):
+        """
+        Formats table of presets and their extensions
+
+        Extensions are listed below the base preset from which they
+        descend, including extensions of other extensions.
+
+        Arguments:
+          available_presets (dict): Presets, after inheritance and
+            extension
+
+        Returns:
+          str: Table of presets
+        """
+        from .. import format_help_table
+
+        if len(available_presets) == 0:
+            return "no presets available\n"
+
+        # Determine base preset of each extension
+        bases = {}
+        for name in available_presets:
+            chain = []
+            while (name not in bases and name not in chain and
+              "_extends" in available_presets[name]):
+                chain.append(name)
+                name = available_presets[name]["_extends"]
+                if name not in available_presets:
+                    name = None
+                    break
+            base = bases.get(name, name)
+            for extension in chain:
+                bases[extension] = base
+
+        entries = []
+        for name, preset in sorted([(k, v) for k, v in
+          available_presets.items() if "_extends" not in v]):
+            extensions = [(k, v.get("_help")) for k, v in
+              sorted(available_presets.items()) if bases.get(k) == name]
+            entries.append((name, preset.get("_help"), extensions))
+        return "available presets:\n" + format_help_table(entries)
+
     @classmethod
     def initialize_available_presets(cls, **kwargs):
         """
         Initializes available presets, carrying out inheritance and
         extension
 
+        Presets are resolved once per constructor class and cached; the
+        resolved presets are shared, and must not be modified in place.
+
         Arguments:
           constructor (YSpecConstructor): Constructor for which parser
             is being built
+          available_presets (dict, optional): Presets to resolve in
+            place of the constructor's; not cached
 
         returns:
            dict: Available presets, after inheritance and extension
         """
+        from .. import config_cache
+
+        constructor = kwargs.get("constructor", None)
+        if kwargs.get("available_presets") is not None or constructor is None:
+            return cls.resolve_available_presets(**kwargs)
+        return config_cache.derive(constructor, (cls, "available_presets"),
+          lambda: cls.resolve_available_presets(constructor=constructor))
+
+    @classmethod
+    def resolve_available_presets(cls, **kwargs):
+        """
+        Resolves available presets, carrying out inheritance and
+        extension
+
+        Arguments:
+          constructor (YSpecConstructor): Constructor whose presets are
+            resolved
+
+        returns:
+           dict: Available presets, after inheritance and extension
+
+        Raises:
+          ValueError: Presets extend one another in a cycle
+        """
         from inspect import getmro
         from .. import merge_dicts
 
@@ -134,6 +193,8 @@ class PresetsPlugin(YSpecPlugin):
         available_presets = cls.get_config("available_presets", **kwargs)
         if available_presets is None:
             return {}
+        # Configuration is shared through cache; do not modify in place
+        available_presets = available_presets.copy()
 
         # Cannot figure out how to use super() here
         if isinstance(constructor, type):
@@ -153,21 +214,73 @@ class PresetsPlugin(YSpecPlugin):
                     available_presets[name] = merge_dicts(
                       super_presets[parent_name], preset)
 
-        for name, preset in available_presets.items():
-            if "_extends" in preset:
-                parent_name = preset["_extends"]
+        return cls.resolve_extensions(available_presets)
+
+    @staticmethod
+    def resolve_extensions(available_presets):
+        """
+        Carries out extension of presets, in order of dependency
+
+        Each preset is merged with the preset it extends only once that
+        preset has itself been resolved, so that chains of extension of
+        any length are resolved in a single pass; each preset is merged
+        exactly once.
+
+        Arguments:
+          available_presets (dict): Available presets, after
+            inheritance; extended presets are replaced in place
+
+        Returns:
+          dict: Available presets, after extension
+
+        Raises:
+          ValueError: Presets extend one another in a cycle
+        """
+        from .. import merge_dicts
+
+        resolved = set()
+        for name in list(available_presets):
+            # Follow chain of extension to first resolved preset
+            chain = []
+            chained = set()
+            while name not in resolved:
+                if name in chained:
+                    cycle = chain[chain.index(name):] + [name]
+                    raise ValueError("Presets extend one another in a "
+                      "cycle: {0}".format(" → ".join(cycle)))
+                chain.append(name)
+                chained.add(name)
+                name = available_presets[name].get("_extends")
+                if name not in available_presets:
+                    break
+
+            # Resolve chain, starting from the preset furthest up
+            for name in reversed(chain):
+                parent_name = available_presets[name].get("_extends")
                 if parent_name in available_presets:
                     available_presets[name] = merge_dicts(
-                      available_presets[parent_name], preset)
+                      available_presets[parent_name], available_presets[name])
+                resolved.add(name)
 
         return available_presets
 
     def __init__(self, **kwargs):
         """
         """
+        from ..YSpecPlan import YSpecPlan
+
+        super(PresetsPlugin, self).__init__(**kwargs)
         self.indexed_levels = self.get_config("indexed_levels",
           attr_of_constructor=True, **kwargs)
-        self.available_presets = self.initialize_available_presets(**kwargs)
+        plan = kwargs.get("plan")
+        if plan is not None and kwargs.get("available_presets") is None:
+            self.available_presets = plan.available_presets
+            self.preset_levels = plan.preset_levels
+        else:
+            self.available_presets = self.initialize_available_presets(
+              **kwargs)
+            self.preset_levels = YSpecPlan.project_presets(
+              self.available_presets)
 
     def __call__(self, spec, source_spec=None, **kwargs):
         """
@@ -188,7 +301,8 @@ class PresetsPlugin(YSpecPlugin):
         return spec
 
     def process_level(self, spec, source_spec, indexed_levels,
-      available_presets, selected_presets=None, path=None):
+      available_presets, selected_presets=None, path=None, level_path=None,
+      recurse=True):
         """
         Adds selected preset arguments to one level of spec hierarchy
 
@@ -200,12 +314,22 @@ class PresetsPlugin(YSpecPlugin):
             level
           selected_presets (list): Presets selected above current level
           path (list): List of keys leading to this level
+          level_path (tuple): Tuple of keys leading to this level,
+            excluding indexes
+          recurse (bool): Add selected preset arguments to indexed levels
+            below current level
+
+        Returns:
+          list: Presets selected at current level
         """
         import six
 
+        if self.profile is not None:
+            self.profile.count_visited()
+
         # Process arguments
         if available_presets is None:
-            return
+            return selected_presets
         if indexed_levels is None:
             indexed_levels = {}
         if selected_presets is None:
@@ -214,6 +338,8 @@ class PresetsPlugin(YSpecPlugin):
             selected_presets = selected_presets[:]
         if source_spec is None:
             source_spec = {}
+        if level_path is None:
+            level_path = ()
         if path is None:
             # At base level of file, presets passed at command line override
             # presets read from file
@@ -249,39 +375,63 @@ class PresetsPlugin(YSpecPlugin):
                 not k.startswith("_")]:
                 # This level is indexed; loop over indexes as well
                 if preset_key in indexed_levels:
+                    if not recurse or preset_key not in spec:
+                        continue
                     # Make new dict of available_presets including only
                     # those applicable to the next level
-                    if preset_key not in spec:
-                        continue
-                    for index in sorted(
-                      [k for k in spec[preset_key] if str(k).isdigit()]):
-                        # Make new dict of available_presets including only
-                        # those applicable to the next level
-                        level_available_presets = {k: v[preset_key] for k, v in
-                            available_presets.items() if preset_key in v}
+                    level_available_presets = self.get_level_presets(
+                      available_presets, preset_key, level_path)
+                    for index in self.get_indexes(spec[preset_key]):
                         self.process_level(spec[preset_key][index],
-                          source_spec.get(preset_key, {}).get(index, {}),
+                          self.get_index(source_spec.get(preset_key, {}),
+                            index, {}),
                           indexed_levels.get(preset_key, {}),
                           level_available_presets, selected_presets,
-                          path=path + [preset_key, index])
+                          path=path + [preset_key, index],
+                          level_path=level_path + (preset_key,))
                 # This level is not indexed
                 else:
                     # preset_val is a dict; recurse
                     if isinstance(preset_val, dict):
                         # Make new dict of available_presets including only
                         # those applicable to the next level
-                        level_available_presets = {k: v[preset_key] for k, v in
-                            available_presets.items() if preset_key in v}
+                        level_available_presets = self.get_level_presets(
+                          available_presets, preset_key, level_path)
                         if preset_key not in spec:
                             self.initialize(spec, preset_key,
                               comment="{0}:{1}".format(self.name,
-                                selected_preset))
+                                selected_preset), path=path)
                         self.process_level(spec[preset_key],
                           source_spec.get(preset_key, {}),
                           indexed_levels.get(preset_key, {}),
                           level_available_presets, selected_presets,
-                          path=path + [preset_key])
+                          path=path + [preset_key],
+                          level_path=level_path + (preset_key,))
                     # preset_val is singular; store and continue loop
                     else:
                         self.set(spec, preset_key, preset_val,
-                          comment="{0}:{1}".format(self.name, selected_preset))
\ No newline at end of file
+                          comment="{0}:{1}".format(self.name, selected_preset),
+                          path=path)
+
+        return selected_presets
+
+    def get_level_presets(self, available_presets, key, level_path):
+        """
+        Projects available presets onto the level below a key
+
+        Arguments:
+          available_presets (dict): Available presets within current
+            level
+          key (str): Key of level below current level
+          level_path (tuple): Tuple of keys leading to current level,
+            excluding indexes
+
+        Returns:
+          dict: Available presets applicable to level below *key*; drawn
+          from precomputed projections if available
+        """
+        level_available_presets = self.preset_levels.get(level_path + (key,))
+        if level_available_presets is None:
+            level_available_presets = {k: v[key] for k, v in
+                available_presets.items() if key in v}
+        return level_available_presets
\ No newline at end of file
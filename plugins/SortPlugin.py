@@ -25,106 +25,271 @@ class SortPlugin(YSpecPlugin):
     """
     Sorts nascent spec
 
+    Levels are reordered in place, retaining their annotations; levels
+    that are already in order are left unchanged. Levels shared among
+    several places in the spec are never modified in place, as they may
+    also be referenced by cached snapshots (see :class:`YSpecStages`);
+    a shared level that is out of order is instead replaced by a sorted
+    copy, which is itself shared.
+
     Attributes
       name (str): Name of this plugin
       description (str): Description of this plugin
       indexed_levels (dict): Levels of spec hierarchy that include an
         additional layer of indexes below them
+      header (list, frozenset): Keys sorted to the top of each level
+      footer (list, frozenset): Keys sorted to the bottom of each level
+      ranks (dict): Rank of each header and footer key within each
+        level, drawn from the constructor's compiled plan if available
+      sorted_levels (dict): Shared levels already sorted, and their
+        sorted replacements, keyed by id of level
     """
     name = "sort"
     description = """sorts nascent spec"""
 
-    def __init__(self, indexed_levels=None, header=None, footer=None,
-      constructor=None, **kwargs):
+    @staticmethod
+    def compile_ranks(header, footer):
         """
+        Compiles the rank of each header and footer key within each
+        level
+
+        Header keys are ranked 0 and footer keys 3; other keys are
+        ranked 1, or 2 if they are indexed levels (see
+        :meth:`rank_key`). As in earlier versions, a key that is both
+        header and footer is ranked as header, and a footer key that is
+        also an indexed level is ranked as an indexed level.
+
+        Arguments:
+          header (list, frozenset): Keys sorted to the top of each level
+          footer (list, frozenset): Keys sorted to the bottom of each
+            level
+
+        Returns:
+          dict: Rank of each header and footer key
         """
-        from .. import yaml_load
+        ranks = dict([(k, 3) for k in footer])
+        ranks.update([(k, 0) for k in header])
+        return ranks
 
-        if indexed_levels is not None:
-            self.indexed_levels = indexed_levels
-        elif (constructor is not None and hasattr(constructor,
-          "indexed_levels")):
-            self.indexed_levels = yaml_load(constructor.indexed_levels)
-        else:
+    def __init__(self, **kwargs):
+        """
+        """
+        super(SortPlugin, self).__init__(**kwargs)
+        self.indexed_levels = self.get_config("indexed_levels",
+          attr_of_constructor=True, **kwargs)
+        if self.indexed_levels is None:
             self.indexed_levels = {}
-
-        if header is not None:
-            self.header = header
-        elif (constructor is not None and hasattr(constructor,
-          "plugin_config") and "sort" in constructor.plugin_config and
-                "header" in
-            constructor.plugin_config["sort"]):
-            self.header = yaml_load(constructor.plugin_config["sort"])[
-                "header"]
-        else:
+        self.header = self.get_config("header", **kwargs)
+        if self.header is None:
             self.header = []
-
-        if footer is not None:
-            self.footer = footer
-        elif (constructor is not None and hasattr(constructor,
-          "plugin_config") and "sort" in constructor.plugin_config and
-                "footer" in
-            constructor.plugin_config["sort"]):
-            self.footer = yaml_load(constructor.plugin_config["sort"])[
-                "footer"]
-        else:
+        self.footer = self.get_config("footer", **kwargs)
+        if self.footer is None:
             self.footer = []
+        self.ranks = None
+        self.sorted_levels = {}
+        plan = kwargs.get("plan")
+        if plan is not None:
+            if kwargs.get("header") is None:
+                self.header = plan.header
+            if kwargs.get("footer") is None:
+                self.footer = plan.footer
+            if kwargs.get("header") is None and kwargs.get("footer") is None:
+                self.ranks = plan.ranks
+        if self.ranks is None:
+            self.ranks = self.compile_ranks(self.header, self.footer)
 
     def __call__(self, spec, source_spec, **kwargs):
         """
-        Adds default arguments to a nascent spec.
+        Sorts a nascent spec in place
 
         Arguments:
-          source_spec (CommentedMap): Nascent spec
+          spec (CommentedMap): Nascent spec
 
         Returns:
           CommentedMap: Sorted spec
         """
-        from ruamel.yaml.comments import CommentedMap
-
-        source_spec = spec
-        spec = CommentedMap()
-
-        self.process_level(spec, source_spec, self.indexed_levels)
+        self.process_level(spec, self.indexed_levels)
         return spec
 
-    def process_level(self, spec, source_spec, indexed_levels):
+    def process_level(self, spec, indexed_levels):
         """
-        Sorts one level of spec hierarchy
+        Sorts one level of spec hierarchy in place, and the levels below
+        it
 
         Arguments:
           spec (CommentedMap): Nascent spec at current level
-          source_spec (CommentedMap): Source spec at current level
+          indexed_levels (dict): Indexed levels within current level
         """
+        if self.profile is not None:
+            self.profile.count_visited()
 
         # Process arguments
         if indexed_levels is None:
             indexed_levels = {}
-        if source_spec is None:
-            source_spec = {}
-
-        # Loop over source argument keys and values at this level
-        source_keys = sorted([k for k in source_spec if k in self.header])
-        source_keys += sorted([k for k in source_spec if
-            k not in self.header and k not in indexed_levels and k not in
-                                                                 self.footer])
-        source_keys += sorted([k for k in source_spec if k in indexed_levels])
-        source_keys += sorted([k for k in source_spec if k in self.footer])
-        for source_key in source_keys:
-            source_val = source_spec[source_key]
-            # source_val is a dict; recurse
-            if isinstance(source_val, dict):
-                if source_key not in spec:
-                    self.initialize(spec, source_key,
-                      comment=source_val._yaml_comment.comment[0].value)
-                if source_key in indexed_levels:
-                    self.process_level(spec[source_key],
-                      source_spec.get(source_key, {}),
-                      indexed_levels.get(source_key, {}))
-                else:
-                    self.process_level(spec[source_key],
-                      source_spec.get(source_key, {}), indexed_levels)
-            # source_val is singular; store and continue loop
+
+        self.sort_level(spec, indexed_levels)
+
+        # Loop over levels below this level
+        for key, val in spec.items():
+            if not isinstance(val, dict):
+                continue
+            if key in indexed_levels:
+                sub_levels = indexed_levels.get(key, {})
             else:
-                self.set(spec, source_key, source_val,
-                  comment=source_spec._yaml_comment.items[source_key][2].value)
\ No newline at end of file
+                sub_levels = indexed_levels
+            if self.is_shared(val):
+                spec[key] = self.share_level(val, sub_levels)
+            else:
+                self.process_level(val, sub_levels)
+
+    def share_level(self, level, indexed_levels):
+        """
+        Sorts a level shared among several places in nascent spec
+
+        The level and the levels below it are left unmodified. If any
+        of them is out of order, a sorted copy of the level is prepared,
+        within which the levels below it are likewise replaced by sorted
+        copies; levels that are already in order are reused. Each
+        shared level is sorted only once, wherever it appears.
+
+        Arguments:
+          level (CommentedMap): Shared level to be sorted
+          indexed_levels (dict): Indexed levels within level
+
+        Returns:
+          CommentedMap: *level* if it is already in order; otherwise a
+          sorted copy, which is shared
+        """
+        from .. import copy_level
+
+        sorted_level = self.sorted_levels.get(id(level))
+        if sorted_level is not None:
+            return sorted_level[1]
+        if self.profile is not None:
+            self.profile.count_visited()
+
+        sorted_keys = self.get_order(level, indexed_levels)
+        if sorted_keys is None:
+            replacement = level
+        else:
+            replacement = copy_level(level)
+            self.reorder(replacement, sorted_keys)
+        for key, val in level.items():
+            if not isinstance(val, dict):
+                continue
+            if key in indexed_levels:
+                sub_levels = indexed_levels.get(key, {})
+            else:
+                sub_levels = indexed_levels
+            sorted_val = self.share_level(val, sub_levels)
+            if sorted_val is not val:
+                if replacement is level:
+                    replacement = copy_level(level)
+                replacement[key] = sorted_val
+
+        if replacement is not level:
+            self.shared_values.share(replacement)
+        self.sorted_levels[id(level)] = (level, replacement)
+        return replacement
+
+    def sort_level(self, level, indexed_levels):
+        """
+        Sorts the keys of one level of spec hierarchy in place
+
+        Annotations of the level's keys are retained.
+
+        Arguments:
+          level (CommentedMap): Level to be sorted
+          indexed_levels (dict): Indexed levels within level
+
+        Returns:
+          bool: True if level was reordered; False if already in order
+        """
+        sorted_keys = self.get_order(level, indexed_levels)
+        if sorted_keys is None:
+            return False
+        self.reorder(level, sorted_keys)
+        return True
+
+    def get_order(self, level, indexed_levels):
+        """
+        Determines whether one level of spec hierarchy is in order, and
+        if not, the order of its keys
+
+        Arguments:
+          level (CommentedMap): Level
+          indexed_levels (dict): Indexed levels within level
+
+        Returns:
+          list: Sorted keys, or None if level is already in order
+        """
+        keys = list(level)
+        if len(keys) < 2:
+            return None
+
+        # Level includes only indexes, whose order is already known
+        indexes = getattr(level, "indexes", None)
+        if indexes is not None and len(indexes) == len(keys):
+            if keys == indexes:
+                return None
+            return indexes
+
+        ranks = [self.rank_key(k, indexed_levels) for k in keys]
+        if all([ranks[i] <= ranks[i + 1] for i in range(len(keys) - 1)]):
+            return None
+        return [k for r, k in sorted(zip(ranks, keys))]
+
+    @staticmethod
+    def reorder(level, sorted_keys):
+        """
+        Reorders the keys of a level in place
+
+        Arguments:
+          level (CommentedMap): Level
+          sorted_keys (list): Keys of level, in order
+        """
+        if hasattr(level, "move_to_end"):
+            for key in sorted_keys:
+                level.move_to_end(key)
+        else:
+            for key in sorted_keys:
+                level[key] = level.pop(key)
+
+    def rank_key(self, key, indexed_levels):
+        """
+        Ranks a key within one level of spec hierarchy
+
+        Arguments:
+          key (str, int): Key
+          indexed_levels (dict): Indexed levels within level
+
+        Returns:
+          tuple: Rank of key's group (header, other, indexed level, or
+          footer), and key itself
+        """
+        rank = self.ranks.get(key, 1)
+        if rank != 0 and key in indexed_levels:
+            rank = 2
+        return rank, key
+
+    def sort_keys(self, source_spec, indexed_levels):
+        """
+        Determines order of keys within one level of spec hierarchy
+
+        Header keys are placed first, followed by other keys, indexed
+        levels, and footer keys; each group is sorted
+
+        Arguments:
+          source_spec (CommentedMap): Source spec at current level
+          indexed_levels (dict): Indexed levels within current level
+
+        Returns:
+          list: Sorted keys
+        """
+        # Level includes only indexes, whose order is already known
+        indexes = getattr(source_spec, "indexes", None)
+        if indexes is not None and len(indexes) == len(source_spec):
+            return list(indexes)
+
+        return sorted(source_spec,
+          key=lambda k: self.rank_key(k, indexed_levels))
\ No newline at end of file
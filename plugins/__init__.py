@@ -17,15 +17,69 @@ from __future__ import (absolute_import, division, print_function,
 if __name__ == "__main__":
     __package__ = str("yspec.plugins")
     import yspec.plugins
-from .. import YSpecCLTool
+import six
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+from .. import (YSpecCLTool, index_key, index_range, is_immutable,
+    is_index_range, sort_indexes)
 
 
 ################################### CLASSES ###################################
 class YSpecPlugin(YSpecCLTool):
     """
     Base class for YSpec plugins
+
+    Attributes
+      annotate (bool): Record the origin of each argument set by this
+        plugin
+      provenance (YSpecProvenance): Table in which origins are
+        recorded; if None, origins are instead added to the nascent
+        spec as comments
+      shared_values (YSpecSharedValues): Table of values stored without
+        being copied; if None, mutable values are copied when stored
+      plain (bool): Construct levels as plain ordered dicts, without
+        annotation
+      profile (YSpecProfile): Profile in which calls, visits, and
+        creations are counted; if None, nothing is counted
+      compact (bool): Create the indexes of indexed levels as compact
+        nodes, if origins are not to be added to them as comments
+      index_ranges (dict): Ranges of indexes within each indexed level
+        of source spec, and the level itself, keyed by id of level
     """
     annotate = True
+    provenance = None
+    shared_values = None
+    plain = False
+    profile = None
+    compact = True
+    index_ranges = None
+    range_merges = None
+
+    def __init__(self, provenance=None, shared_values=None, plain=False,
+      profile=None, compact=True, **kwargs):
+        """
+        Arguments:
+          provenance (YSpecProvenance, optional): Table in which to
+            record origin of each argument
+          shared_values (YSpecSharedValues, optional): Table in which to
+            record values stored without being copied
+          plain (bool): Construct levels as plain ordered dicts, and
+            do not record origin of arguments
+          profile (YSpecProfile, optional): Profile in which to count
+            calls, visits, and creations
+          compact (bool): Create the indexes of indexed levels as
+            compact nodes where possible
+          kwargs (dict): Additional keyword arguments
+        """
+        self.provenance = provenance
+        self.profile = profile
+        self.shared_values = shared_values
+        self.plain = plain
+        self.compact = compact
+        if plain:
+            self.annotate = False
 
     @classmethod
     def add_arguments(cls, parser, name=None, description=None, **kwargs):
@@ -67,8 +121,28 @@ class YSpecPlugin(YSpecCLTool):
     def get_config(cls, attr, constructor=None, attr_of_constructor=False,
       **kwargs):
         """
+        Retrieves configuration of this plugin
+
+        Configuration is drawn first from keyword arguments; if not
+        present there, it is loaded from the constructor's
+        ``plugin_config`` (or from an attribute of the constructor)
+        through the shared configuration cache, so that each class's
+        configuration is parsed only once
+
+        Arguments:
+          attr (str): Name of configuration value to retrieve
+          constructor (YSpecConstructor, type, optional): Constructor
+            (or constructor class) from which to load configuration
+          attr_of_constructor (bool): Load configuration from attribute
+            *attr* of constructor, rather than from constructor's
+            ``plugin_config``
+          kwargs (dict): Additional keyword arguments; if *attr* is
+            present, its value is returned directly
+
+        Returns:
+          object: Configuration value, or None if not found
         """
-        from .. import yaml_load
+        from .. import config_cache
 
         if hasattr(cls, "name"):
             plugin_name = cls.name
@@ -80,42 +154,359 @@ class YSpecPlugin(YSpecCLTool):
         elif constructor is not None:
             if attr_of_constructor:
                 if hasattr(constructor, attr):
-                    return yaml_load(getattr(constructor, attr))
+                    return config_cache.load(constructor,
+                      getattr(constructor, attr))
             else:
                 if (hasattr(constructor,
                   "plugin_config") and plugin_name in
                     constructor.plugin_config):
-                    config = yaml_load(constructor.plugin_config[plugin_name])
-                    if attr in config:
+                    config = config_cache.load(constructor,
+                      constructor.plugin_config[plugin_name])
+                    if config is not None and attr in config:
                         return config[attr]
         return None
 
-    def initialize(self, destination, key, comment=None):
+    def get_indexes(self, level):
         """
-        Initializes a level within a nascent spec
+        Lists the indexes within an indexed level
+
+        Indexes within ranges of indexes (e.g. '0-999' or '0:1000:2')
+        are included, as ints.
+
+        Arguments:
+          level (dict): Indexed level of spec hierarchy
+
+        Returns:
+          list: Indexes within *level*, sorted; if *level* maintains a
+          table of its indexes, that table is returned and must not be
+          modified
         """
+        indexes = getattr(level, "indexes", None)
+        if indexes is None:
+            indexes = sort_indexes(level)
+            index_ranges = self.get_index_ranges(level)
+            if len(index_ranges) > 0:
+                explicit = set([index_key(k) for k in indexes])
+                extra = set()
+                for indexes_in_range, value in index_ranges:
+                    extra.update([i for i in indexes_in_range if
+                        i not in explicit])
+                indexes = sorted(indexes + list(extra), key=index_key)
+        return indexes
+
+    def get_index(self, level, index, default=None, ranges=True):
+        """
+        Retrieves the value of one index within an indexed level
+
+        If *index* falls within any ranges of indexes within *level*, the
+        values of those ranges, in order, and of *index* itself are
+        merged, with later values taking precedence.
+
+        Arguments:
+          level (dict): Indexed level of spec hierarchy
+          index (int, str): Index, which may be present within *level*
+            as either an int or a string of digits
+          default (object): Value returned if *index* is not present
+          ranges (bool): Include values of ranges that include *index*
+
+        Returns:
+          object: Value of *index* within *level*, or *default*
+        """
+        from .. import merge_dicts
+
+        if index in level:
+            value = level[index]
+        elif isinstance(index, six.integer_types):
+            value = level.get(six.text_type(index), default)
+        else:
+            value = level.get(index_key(index), default)
+        if not ranges:
+            return value
+
+        layers = self.get_range_values(level, index)
+        if len(layers) == 0:
+            return value
+        if value is not default:
+            layers.append(value)
+        # Layers after the last that is not a dict are merged
+        first = len(layers) - 1
+        while first > 0 and isinstance(layers[first], dict) and isinstance(
+          layers[first - 1], dict):
+            first -= 1
+        if first == len(layers) - 1:
+            return layers[-1]
+        return merge_dicts(*layers[first:])
+
+    def get_index_value(self, level, index):
+        """
+        Retrieves the arguments applied to one index of an indexed level,
+        from the ranges of indexes that include it and from the index
+        itself
+
+        These are merged once, as by :meth:`get_index`, so that
+        overlapping ranges take effect the same way whether they are
+        applied to a spec or read as the value of an index. Where only
+        ranges apply to an index, the merge of those ranges is built
+        once and returned for every index within all of them, and so may
+        be shared among those indexes.
+
+        Arguments:
+          level (dict): Indexed level of spec hierarchy
+          index (int, str): Index
+
+        Returns:
+          tuple: Value applied to *index*, or an empty dict if none, and
+          whether that value is drawn only from ranges of indexes
+        """
+        missing = object()
+        value = self.get_index(level, index, missing, ranges=False)
+        layers = self.get_range_values(level, index)
+        if len(layers) == 0:
+            return ({} if value is missing else value), False
+        if value is not missing:
+            return self.get_index(level, index, {}), False
+        if len(layers) == 1:
+            return layers[0], True
+
+        if self.range_merges is None:
+            self.range_merges = {}
+        key = tuple(id(layer) for layer in layers)
+        cached = self.range_merges.get(key)
+        if cached is None:
+            cached = self.range_merges[key] = (layers,
+              self.get_index(level, index, {}))
+        return cached[1], True
+
+    def get_range_values(self, level, index):
+        """
+        Retrieves the values of the ranges of indexes that include one
+        index within an indexed level
+
+        Arguments:
+          level (dict): Indexed level of spec hierarchy
+          index (int, str): Index
+
+        Returns:
+          list: Values of ranges that include *index*, in order
+        """
+        index_ranges = self.get_index_ranges(level)
+        if len(index_ranges) == 0:
+            return []
+        index = index_key(index)
+        return [value for indexes_in_range, value in index_ranges if
+            index in indexes_in_range]
+
+    def get_index_ranges(self, level):
+        """
+        Lists the ranges of indexes within an indexed level
+
+        Ranges are identified once per level and reused; they are not
+        expanded into the indexes within them.
+
+        Arguments:
+          level (dict): Indexed level of spec hierarchy
+
+        Returns:
+          list: (range, value) of each range, in order
+        """
+        if len(level) == 0 or hasattr(level, "indexes"):
+            return []
+        if self.index_ranges is None:
+            self.index_ranges = {}
+        cached = self.index_ranges.get(id(level))
+        if cached is not None and cached[0] is level:
+            return cached[1]
+        index_ranges = [(index_range(k), v) for k, v in level.items() if
+            is_index_range(k)]
+        self.index_ranges[id(level)] = (level, index_ranges)
+        return index_ranges
+
+    def create_level(self, indexed=False, index=False):
+        """
+        Creates an empty level of spec hierarchy
+
+        Arguments:
+          indexed (bool): Level is an indexed level, and maintains a
+            table of its indexes
+          index (bool): Level is an index of an indexed level, and may
+            be created as a compact node
+
+        Returns:
+          dict: New level; a compact node if level is an index and no
+          comments will be added to it, an ordered dict if this plugin
+          is plain, or a CommentedMap otherwise
+        """
+        from collections import OrderedDict
         from ruamel.yaml.comments import CommentedMap
+        from ..YSpecIndexedLevel import (YSpecIndexedLevel, YSpecIndexNode,
+          YSpecPlainIndexedLevel)
+
+        if self.profile is not None:
+            self.profile.count_created()
+        if (index and not indexed and self.compact and (self.plain or
+          self.provenance is not None or not self.annotate)):
+            return YSpecIndexNode()
+        if self.plain:
+            return YSpecPlainIndexedLevel() if indexed else OrderedDict()
+        return YSpecIndexedLevel() if indexed else CommentedMap()
+
+    def initialize(self, destination, key, comment=None, indexed=False,
+      path=None):
+        """
+        Initializes a level within a nascent spec
 
-        destination[key] = CommentedMap()
+        Arguments:
+          destination (CommentedMap): Level within which to initialize
+            new level
+          key (str, int): Key of new level; indexes are stored as ints
+          comment (str, optional): Annotation of new level
+          indexed (bool): New level is an indexed level, and maintains
+            a table of its indexes
+          path (list, optional): List of keys leading to *destination*;
+            required to record origin of new level in provenance table
+        """
+        from ..YSpecIndexedLevel import YSpecIndexTable
+
+        if self.profile is not None:
+            self.profile.count_initialize()
+        index = isinstance(destination, YSpecIndexTable)
+        if index:
+            key = index_key(key)
+        destination[key] = self.create_level(indexed=indexed, index=index)
         if self.annotate:
             if comment is None:
                 if hasattr(self, "name"):
                     comment = self.name
                 else:
                     comment = self.__class__.__name__
-            destination[key].yaml_add_eol_comment(comment, column=80)
+            if self.provenance is None:
+                destination[key].yaml_add_eol_comment(comment, column=80)
+            elif path is not None:
+                self.provenance.record(tuple(path) + (key,), comment)
 
-    def set(self, destination, key, value, comment=None):
+    def set(self, destination, key, value, comment=None, path=None):
         """
         Sets a value within a nascent spec
+
+        Arguments:
+          destination (CommentedMap): Level within which to set value
+          key (str, int): Key of value
+          value (object): Value
+          comment (str, optional): Annotation of value
+          path (list, optional): List of keys leading to *destination*;
+            required to record origin of value in provenance table
+
+        .. note:
+          If a table of shared values is available, *value* is stored
+          without being copied, and must be prepared using :meth:`own`
+          before being modified in place
         """
         from copy import deepcopy
 
-        destination[key] = deepcopy(value)
+        if self.profile is not None:
+            self.profile.count_set()
+        if self.shared_values is not None:
+            destination[key] = self.shared_values.share(value)
+        elif is_immutable(value):
+            destination[key] = value
+        else:
+            destination[key] = deepcopy(value)
         if self.annotate:
             if comment is None:
                 if hasattr(self, "name"):
                     comment = self.name
                 else:
                     comment = self.__class__.__name__
-            destination.yaml_add_eol_comment(comment, key, column=80)
\ No newline at end of file
+            if self.provenance is None:
+                destination.yaml_add_eol_comment(comment, key, column=80)
+            elif path is not None:
+                self.provenance.record(tuple(path) + (key,), comment)
+
+    def own(self, destination, key):
+        """
+        Prepares a value within a nascent spec to be modified in place
+
+        Arguments:
+          destination (CommentedMap): Level containing value
+          key (str, int): Key of value
+
+        Returns:
+          object: Value, copied first if it is shared with the source
+          spec, presets, or defaults
+        """
+        if self.shared_values is None:
+            return destination[key]
+        return self.shared_values.own(destination, key)
+
+    def is_shared(self, value):
+        """
+        Determines whether a value within a nascent spec is shared
+
+        Arguments:
+          value (object): Value
+
+        Returns:
+          bool: True if *value* is stored without being copied, and may
+          appear at several places within spec
+        """
+        return self.shared_values is not None and value in self.shared_values
+
+
+class YSpecPluginRegistry(Mapping):
+    """
+    Registry of available plugins, imported by name on first use
+
+    Each plugin may be registered either as a class or as a string of
+    the form 'module:class'; modules given as relative names (e.g.
+    '.plugins.SortPlugin') are resolved relative to *package*. A plugin
+    registered as a string is imported only when first looked up, so
+    that constructors import only the plugins they actually run.
+
+    Attributes:
+      entries (OrderedDict): Class, or 'module:class' string, of each
+        plugin, keyed by name
+      package (str): Package relative to which module names are
+        resolved
+    """
+
+    def __init__(self, entries=None, package=None):
+        """
+        Arguments:
+          entries (list, dict, optional): Pairs of plugin name and
+            class or 'module:class' string
+          package (str, optional): Package relative to which module
+            names are resolved
+        """
+        from collections import OrderedDict
+
+        self.entries = OrderedDict(entries or [])
+        self.package = package
+
+    def __getitem__(self, name):
+        """type: Plugin class, imported if necessary"""
+        from importlib import import_module
+
+        plugin = self.entries[name]
+        if isinstance(plugin, six.string_types):
+            module_name, class_name = plugin.split(":")
+            plugin = getattr(import_module(module_name, self.package),
+              class_name)
+            self.entries[name] = plugin
+        return plugin
+
+    def __contains__(self, name):
+        """bool: Whether a plugin is registered as *name*"""
+        return name in self.entries
+
+    def __iter__(self):
+        """iterator: Names of plugins, in order"""
+        return iter(self.entries)
+
+    def __len__(self):
+        """int: Number of plugins"""
+        return len(self.entries)
+
+    def __repr__(self):
+        """str: Representation of registry"""
+        return "{0}({1!r})".format(self.__class__.__name__,
+          list(self.entries.items()))
\ No newline at end of file
@@ -0,0 +1,126 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   TestYSpecAsync.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Tests asyncio construction of specs
+
+Constructs the test source specs using the event loop's default
+executor and a pool of worker processes, and compares each result to
+the spec constructed alone. Requires Python 3.5 or later.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+import asyncio
+from os.path import abspath, dirname, join
+from yspec import yaml_dump
+from yspec.YSpecAsync import YSpecAsyncConstructor
+from TestYSpecConstructor import TestYSpecConstructor
+
+directory = dirname(abspath(__file__))
+sources = [join(directory, f) for f in ["test.yml", "test_ranges.yml",
+  "missing.yml", "test_rebuild.yml"]]
+
+
+################################## FUNCTIONS ##################################
+async def test_construct(constructor, outfile, **kwargs):
+    """
+    Constructs spec from test.yml, and writes it to an outfile
+
+    Arguments:
+      constructor (YSpecAsyncConstructor): Asynchronous constructor
+      outfile (str): Path to outfile
+      kwargs (dict): Additional keyword arguments passed to constructor
+    """
+    result = await constructor.construct(sources[0], **kwargs)
+    assert result.ok, result.traceback
+    expected = TestYSpecConstructor(source_spec=sources[0], verbose=0,
+      **kwargs)
+    text = await constructor.dump(result, outfile, colored=False)
+    assert text == expected.dump(colored=False), "constructed spec differs"
+    with open(outfile, "r") as infile:
+        assert infile.read() == text, "written spec differs"
+
+
+async def test_construct_many(constructor, **kwargs):
+    """
+    Constructs each source spec within a batch
+
+    Arguments:
+      constructor (YSpecAsyncConstructor): Asynchronous constructor
+      kwargs (dict): Additional keyword arguments passed to constructor
+    """
+    from os.path import isfile
+
+    results = await constructor.construct_many(sources, **kwargs)
+    assert [r.index for r in results] == list(range(len(sources))), \
+      "results out of order"
+    for source_spec, result in zip(sources, results):
+        if not isfile(source_spec):
+            assert not result.ok, "missing source spec not reported"
+            continue
+        assert result.ok, result.traceback
+        expected = TestYSpecConstructor(source_spec=source_spec, verbose=0,
+          **kwargs)
+        assert yaml_dump(result.spec, colored=False,
+          provenance=result.provenance) == expected.dump(colored=False), \
+          "spec constructed within batch differs"
+
+
+async def test_timeout(constructor):
+    """
+    Reports construction that exceeds its timeout
+
+    Arguments:
+      constructor (YSpecAsyncConstructor): Asynchronous constructor
+    """
+    try:
+        await constructor.construct(sources[0], timeout=0)
+    except asyncio.TimeoutError:
+        pass
+    else:
+        raise AssertionError("timeout not raised")
+
+    results = await constructor.construct_many(sources, timeout=0)
+    assert all(isinstance(r.error, asyncio.TimeoutError) for r in results), \
+      "timeout not recorded"
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    from shutil import rmtree
+    from tempfile import mkdtemp
+    from warnings import simplefilter
+
+    # yaml_load warns that missing.yml is loaded as a string
+    simplefilter("ignore", UserWarning)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    temp_directory = mkdtemp()
+    executor = YSpecAsyncConstructor.get_process_executor(
+      TestYSpecConstructor, workers=2)
+    try:
+        for name, pool in [("default executor", None),
+          ("process executor", executor)]:
+            constructor = YSpecAsyncConstructor(TestYSpecConstructor,
+              executor=pool)
+            for kwargs in [{}, dict(plain=True), dict(fused=True)]:
+                loop.run_until_complete(test_construct(constructor,
+                  join(temp_directory, "spec.yml"), **kwargs))
+                loop.run_until_complete(test_construct_many(constructor,
+                  **kwargs))
+                print("{0} {1}: passed".format(name, kwargs))
+        loop.run_until_complete(test_timeout(YSpecAsyncConstructor(
+          TestYSpecConstructor)))
+        print("timeout: passed")
+    finally:
+        executor.shutdown()
+        rmtree(temp_directory)
+        loop.close()
\ No newline at end of file
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   TestYSpecBatch.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Tests batch construction of specs
+
+Constructs a batch of the test source specs, serially and in worker
+processes, and compares each result to the spec constructed alone; a
+missing source spec within the batch is reported in its own result.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from os.path import abspath, dirname, join
+from yspec import yaml_dump
+from TestYSpecConstructor import TestYSpecConstructor
+
+directory = dirname(abspath(__file__))
+sources = [join(directory, f) for f in ["test.yml", "test_ranges.yml",
+  "missing.yml", "test_rebuild.yml"]]
+
+
+################################## FUNCTIONS ##################################
+def test_construct_many(workers=None, **kwargs):
+    """
+    Constructs each source spec within a batch
+
+    Arguments:
+      workers (int, optional): Number of worker processes
+      kwargs (dict): Additional keyword arguments passed to constructor
+    """
+    from os.path import isfile
+
+    results = TestYSpecConstructor.construct_many(sources, workers=workers,
+      **kwargs)
+    assert [r.index for r in results] == list(range(len(sources))), \
+      "results out of order"
+    for source_spec, result in zip(sources, results):
+        if not isfile(source_spec):
+            assert not result.ok, "missing source spec not reported"
+            assert result.spec is None and result.traceback is not None
+            continue
+        assert result.ok, result.traceback
+        expected = TestYSpecConstructor(source_spec=source_spec, verbose=0,
+          **kwargs)
+        assert yaml_dump(result.spec, colored=False,
+          provenance=result.provenance) == expected.dump(colored=False), \
+          "spec constructed within batch differs"
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    from warnings import simplefilter
+
+    # yaml_load warns that missing.yml is loaded as a string
+    simplefilter("ignore", UserWarning)
+    for workers in [1, 2]:
+        for kwargs in [{}, dict(plain=True), dict(fused=True)]:
+            test_construct_many(workers=workers, **kwargs)
+            print("batch (workers={0}) {1}: passed".format(workers, kwargs))
\ No newline at end of file
@@ -14,6 +14,7 @@ Test constructor
 from __future__ import (absolute_import, division, print_function,
     unicode_literals)
 
+from os.path import abspath, dirname, join
 from yspec.YSpecConstructor import YSpecConstructor
 
 
@@ -26,10 +27,11 @@ class TestYSpecConstructor(YSpecConstructor):
     from yspec.plugins.PresetsPlugin import PresetsPlugin
     from yspec.plugins.ManualPlugin import ManualPlugin
     from yspec.plugins.SortPlugin import SortPlugin
+    from yspec.plugins.FusedPlugin import FusedPlugin
 
     available_plugins = dict(initialize=InitializePlugin,
       defaults=DefaultsPlugin, presets=PresetsPlugin, manual=ManualPlugin,
-      sort=SortPlugin)
+      sort=SortPlugin, fused=FusedPlugin)
     default_plugins = ["initialize", "defaults", "presets", "manual", "sort"]
     indexed_levels = """
       level_1:
@@ -68,6 +70,23 @@ class TestYSpecConstructor(YSpecConstructor):
                   preset_2_3.1: preset_2_3.1_value""")
 
 
+class TestYSpecExtendsConstructor(TestYSpecConstructor):
+    """
+    Test constructor whose presets extend one another in a chain, each
+    listed before the preset it extends
+    """
+    plugin_config = dict(TestYSpecConstructor.plugin_config,
+      presets=join(dirname(abspath(__file__)), "test_extends_available.yml"))
+
+
+class TestYSpecCycleConstructor(TestYSpecConstructor):
+    """
+    Test constructor whose presets extend one another in a cycle
+    """
+    plugin_config = dict(TestYSpecConstructor.plugin_config,
+      presets=join(dirname(abspath(__file__)), "test_extends_cycle.yml"))
+
+
 #################################### MAIN #####################################
 if __name__ == "__main__":
     TestYSpecConstructor.main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   TestYSpecRebuild.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Tests incremental rebuilding of specs, with and without annotation
+
+Constructs a spec from test.yml, rebuilds it from test_rebuild.yml, and
+compares the result to a spec constructed from test_rebuild.yml
+directly and, for plain specs, to test_rebuild_plain.yml.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from os.path import abspath, dirname, join
+from yspec import yaml_dump
+from TestYSpecConstructor import TestYSpecConstructor
+
+directory = dirname(abspath(__file__))
+
+
+################################## FUNCTIONS ##################################
+def test_rebuild(**kwargs):
+    """
+    Rebuilds spec constructed from test.yml using test_rebuild.yml
+
+    Arguments:
+      kwargs (dict): Additional keyword arguments passed to constructor
+    """
+    constructor = TestYSpecConstructor(source_spec=join(directory,
+      "test.yml"), verbose=0, **kwargs)
+    changes = constructor.rebuild(join(directory, "test_rebuild.yml"))
+    assert len(changes.paths) > 0, "no changes found"
+
+    expected = TestYSpecConstructor(source_spec=join(directory,
+      "test_rebuild.yml"), verbose=0, **kwargs)
+    assert constructor.dump(colored=False) == expected.dump(colored=False), \
+      "rebuilt spec differs from constructed spec"
+    if kwargs.get("plain", False):
+        with open(join(directory, "test_rebuild_plain.yml"), "r") as infile:
+            assert yaml_dump(constructor.spec, colored=False) == \
+              infile.read(), "rebuilt spec differs from test_rebuild_plain.yml"
+
+    # Rebuilding again from the same source changes nothing
+    changes = constructor.rebuild(join(directory, "test_rebuild.yml"))
+    assert len(changes.paths) == 0, "unchanged source spec rebuilt"
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    for kwargs in [{}, dict(plain=True), dict(fused=True),
+      dict(fused=True, plain=True)]:
+        test_rebuild(**kwargs)
+        print("rebuild {0}: passed".format(kwargs))
\ No newline at end of file
@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   TestYSpecServer.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Tests spec construction server and client
+
+Starts a server for the test constructor on a socket within a temporary
+directory, submits command lines to it using the client, and compares
+its output to that of constructing within this process.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from os.path import abspath, dirname, join
+from yspec.YSpecClient import YSpecClient
+from yspec.YSpecServer import YSpecServer
+from TestYSpecConstructor import TestYSpecConstructor
+
+directory = dirname(abspath(__file__))
+
+
+################################## FUNCTIONS ##################################
+def start_server(socket_path):
+    """
+    Starts a server for the test constructor within a child process
+
+    Arguments:
+      socket_path (str): Path of socket
+
+    Returns:
+      int: Process id of server
+    """
+    import os
+
+    server = YSpecServer(TestYSpecConstructor, socket_path=socket_path,
+      verbose=0)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            server.serve()
+        finally:
+            os._exit(0)
+    server.socket.close()
+    return pid
+
+
+def stop_server(pid):
+    """
+    Stops a server started by :func:`start_server`
+
+    Arguments:
+      pid (int): Process id of server
+    """
+    import os
+    import signal
+
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+def test_round_trip(socket_path, **kwargs):
+    """
+    Constructs spec from test.yml through server
+
+    Arguments:
+      socket_path (str): Path of server's socket
+      kwargs (dict): Additional keyword arguments passed to constructor,
+        and as the corresponding command-line arguments to server
+    """
+    assert YSpecClient.is_private(socket_path), "socket is not private"
+
+    argv = ["-spec", "test.yml", "-v"]
+    argv += ["-{0}".format(key) for key, value in kwargs.items() if value]
+    response = YSpecClient.submit(YSpecClient.connect(socket_path), argv,
+      cwd=directory)
+    assert response["status"] == 0, response["stderr"]
+
+    expected = TestYSpecConstructor(source_spec=join(directory, "test.yml"),
+      verbose=0, **kwargs)
+    assert response["stdout"] == "\nFinal spec:\n{0}\n".format(
+      expected.dump()), "spec constructed by server differs"
+
+
+def test_error(socket_path):
+    """
+    Reports failure of construction through server
+
+    Arguments:
+      socket_path (str): Path of server's socket
+    """
+    response = YSpecClient.submit(YSpecClient.connect(socket_path),
+      ["-spec", "missing.yml"], cwd=directory)
+    assert response["status"] != 0, "missing source spec not reported"
+    assert "missing.yml" in response["stderr"], "error not returned"
+
+    response = YSpecClient.submit(YSpecClient.connect(socket_path),
+      ["-watch", "-spec", "test.yml"], cwd=directory)
+    assert response["status"] != 0, "-watch not refused"
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    from shutil import rmtree
+    from tempfile import mkdtemp
+
+    temp_directory = mkdtemp()
+    socket_path = join(temp_directory, "server.sock")
+    pid = start_server(socket_path)
+    try:
+        for kwargs in [{}, dict(plain=True), dict(fused=True)]:
+            test_round_trip(socket_path, **kwargs)
+            print("round trip {0}: passed".format(kwargs))
+        test_error(socket_path)
+        print("errors: passed")
+    finally:
+        stop_server(pid)
+        rmtree(temp_directory)
\ No newline at end of file
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#   TestYSpecSourceCache.py
+#
+#   Copyright (C) 2015-2017 Karl T Debiec
+#   All rights reserved.
+#
+#   This software may be modified and distributed under the terms of the
+#   BSD license. See the LICENSE file for details.
+"""
+Tests persistent cache of parsed source specs
+
+Loads test.yml through a cache within a temporary directory, checking
+that a spec is parsed on its first load and loaded from cache on the
+next, that an entry writable by other users is parsed anew and
+replaced, and that a directory writable by other users is refused.
+"""
+################################### MODULES ###################################
+from __future__ import (absolute_import, division, print_function,
+    unicode_literals)
+
+from os.path import abspath, dirname, join
+from yspec import yaml_dump, yaml_load
+from yspec.YSpecSourceCache import YSpecSourceCache
+from TestYSpecConstructor import TestYSpecConstructor
+
+directory = dirname(abspath(__file__))
+
+
+################################## FUNCTIONS ##################################
+def test_source_cache(cache_directory, plain=False):
+    """
+    Loads test.yml through a cache: missing, present, and untrusted
+
+    Arguments:
+      cache_directory (str): Path to cache directory
+      plain (bool): Load yaml into plain data structures
+    """
+    import os
+    import stat
+
+    infile = join(directory, "test.yml")
+    expected = yaml_dump(yaml_load(infile, plain=plain), colored=False)
+
+    # Miss: parsed and stored
+    cache = YSpecSourceCache(cache_directory)
+    spec = cache.load(infile, plain=plain)
+    assert (cache.hits, cache.misses) == (0, 1), "entry not missed"
+    assert yaml_dump(spec, colored=False) == expected, "parsed spec differs"
+    entries = [join(cache_directory, f) for f in os.listdir(cache_directory)
+      if f.endswith(".pickle") and f.endswith("-plain.pickle") == plain]
+    assert len(entries) == 1, "entry not stored"
+    assert cache.is_trusted(os.stat(entries[0])), "stored entry untrusted"
+
+    # Hit: loaded from cache
+    spec = cache.load(infile, plain=plain)
+    assert (cache.hits, cache.misses) == (1, 1), "entry not hit"
+    assert yaml_dump(spec, colored=False) == expected, "cached spec differs"
+
+    # Untrusted entry: parsed anew and replaced
+    os.chmod(entries[0], 0o666)
+    spec = cache.load(infile, plain=plain)
+    assert (cache.hits, cache.misses) == (1, 2), "untrusted entry hit"
+    assert yaml_dump(spec, colored=False) == expected, "reparsed spec differs"
+    assert not os.stat(entries[0]).st_mode & (stat.S_IWGRP | stat.S_IWOTH), \
+      "untrusted entry not replaced"
+    spec = cache.load(infile, plain=plain)
+    assert (cache.hits, cache.misses) == (2, 2), "replaced entry not hit"
+
+    # Constructing through cache yields the same spec
+    cached = TestYSpecConstructor(source_spec=infile, verbose=0,
+      source_cache=cache_directory, plain=plain)
+    uncached = TestYSpecConstructor(source_spec=infile, verbose=0,
+      plain=plain)
+    assert cached.dump(colored=False) == uncached.dump(colored=False), \
+      "spec constructed through cache differs"
+
+
+def test_untrusted_directory(cache_directory):
+    """
+    Refuses a cache directory writable by other users
+
+    Arguments:
+      cache_directory (str): Path to cache directory
+    """
+    import os
+
+    os.mkdir(cache_directory)
+    os.chmod(cache_directory, 0o777)
+    try:
+        YSpecSourceCache(cache_directory)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("untrusted directory accepted")
+
+
+#################################### MAIN #####################################
+if __name__ == "__main__":
+    from shutil import rmtree
+    from tempfile import mkdtemp
+
+    temp_directory = mkdtemp()
+    try:
+        for plain in [False, True]:
+            test_source_cache(join(temp_directory, "cache"), plain=plain)
+            print("source cache (plain={0}): passed".format(plain))
+        test_untrusted_directory(join(temp_directory, "untrusted"))
+        print("untrusted directory: passed")
+    finally:
+        rmtree(temp_directory)
\ No newline at end of file